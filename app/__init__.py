@@ -5,6 +5,10 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from app.config import config_by_name
 from app.database import init_db
+from app.commands import register_commands
+from app.json_provider import init_json_provider
+from app.metrics import init_metrics
+from app.sql_profiler import init_sql_profiler
 import logging
 import os
 
@@ -22,9 +26,6 @@ def create_app(config_name=None):
     # Criar instância do Flask
     app = Flask(__name__)
 
-    # Configurar JSON para não escapar caracteres Unicode (acentos, etc)
-    app.json.ensure_ascii = False
-
     # Determinar ambiente
     if config_name is None:
         config_name = os.getenv('FLASK_ENV', 'development')
@@ -35,6 +36,9 @@ def create_app(config_name=None):
     # Configurar logging
     setup_logging(app)
 
+    # Configurar provider JSON (orjson ou stdlib, sem escapar caracteres Unicode)
+    init_json_provider(app)
+
     # Configurar CORS
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
 
@@ -47,6 +51,15 @@ def create_app(config_name=None):
     # Registrar error handlers
     register_error_handlers(app)
 
+    # Registrar comandos CLI
+    register_commands(app)
+
+    # Métricas por requisição e rota GET /metrics
+    init_metrics(app)
+
+    # Profiler de SQL por requisição (opcional)
+    init_sql_profiler(app)
+
     # Rota raiz de teste
     @app.route('/')
     def index():
@@ -58,7 +71,8 @@ def create_app(config_name=None):
                 'orders': '/api/orders',
                 'cep': '/api/cep',
                 'products': '/api/products',
-                'health': '/health'
+                'health': '/health',
+                'metrics': '/metrics'
             }
         })
 
@@ -70,6 +84,16 @@ def create_app(config_name=None):
             'database': 'connected'
         }), 200
 
+    # Estado do pool de conexões (primário e réplicas)
+    @app.route('/health/db')
+    def health_db():
+        from app.replicas import get_replica_router
+
+        return jsonify({
+            'pool': app.extensions['db_pool_monitor'].stats(),
+            'replicas': get_replica_router().stats()
+        }), 200
+
     logger = logging.getLogger(__name__)
     logger.info(f"Aplicação Flask iniciada no modo: {config_name}")
 
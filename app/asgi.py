@@ -0,0 +1,220 @@
+"""
+Gateway ASGI na frente da aplicação Flask
+
+No servidor WSGI, POST /api/orders ocupa uma thread durante toda a consulta
+ao ViaCEP (até VIACEP_READ_TIMEOUT por tentativa) antes de tocar no banco:
+um ViaCEP lento esgota as threads de todos os workers. Aqui a consulta é
+feita no event loop (httpx) e só depois a requisição segue para o Flask, em
+um pool fixo de ASGI_THREADS threads, com o endereço já resolvido no environ
+WSGI. O payload é validado antes da consulta (pedidos inválidos não custam
+uma chamada ao ViaCEP); a resposta de erro, a transação, as métricas e o
+tratamento de erros continuam na rota create_order. As demais rotas passam
+direto para o Flask.
+
+Uso:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import logging
+
+from marshmallow import ValidationError
+
+from app.services.viacep_service import ViaCEPService
+
+logger = logging.getLogger(__name__)
+
+# Chave do environ WSGI com o CEP já consultado: (CEP informado, resultado)
+CEP_LOOKUP_ENVIRON_KEY = 'ecommerce.cep_lookup'
+
+
+def _order_cep(body):
+    """
+    Valida o payload de criação de pedido e extrai o CEP (requer contexto da aplicação)
+
+    Args:
+        body: Corpo da requisição (bytes)
+
+    Returns:
+        str: CEP informado ou None (payload inválido: a rota responde 400 sem consultar o ViaCEP)
+    """
+    # Import tardio: a rota importa CEP_LOOKUP_ENVIRON_KEY deste módulo
+    from app.routes.orders import load_order_payload
+
+    try:
+        return load_order_payload(json.loads(body))['address']['cep']
+    except (ValueError, ValidationError):
+        # JSON ou dados inválidos: a rota valida de novo e responde 400
+        return None
+
+
+class AsyncOrderGateway:
+    """Aplicação ASGI que resolve o CEP de novos pedidos no event loop e delega ao Flask"""
+
+    def __init__(self, flask_app, threads=10, resolve_cep=True):
+        """
+        Args:
+            flask_app: Instância do Flask
+            threads: Threads que executam a aplicação Flask (limite de requisições no banco ao mesmo tempo)
+            resolve_cep: Se False, apenas repassa as requisições ao Flask (comparação em benchmarks)
+        """
+        self.flask_app = flask_app
+        self.threads = threads
+        self.resolve_cep = resolve_cep
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='flask')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Tipo de conexão ASGI não suportado: {scope['type']}")
+
+        body = await self._read_body(receive)
+
+        extra_environ = {}
+        if self.resolve_cep and scope['method'] == 'POST' and scope['path'].rstrip('/') == '/api/orders':
+            with self.flask_app.app_context():
+                cep = _order_cep(body)
+                if cep is not None:
+                    result = await ViaCEPService.validate_and_get_address_async(cep)
+                    extra_environ[CEP_LOOKUP_ENVIRON_KEY] = (cep, result)
+
+        environ = self._build_environ(scope, body)
+        environ.update(extra_environ)
+        await self._run_flask(environ, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                client = self.flask_app.extensions.get('viacep_async_client')
+                if client is not None:
+                    await client.close()
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    @staticmethod
+    def _build_environ(scope, body):
+        """
+        Converte o escopo ASGI em um environ WSGI (PEP 3333)
+
+        Args:
+            scope: Escopo HTTP da conexão ASGI
+            body: Corpo completo da requisição
+
+        Returns:
+            dict: Environ para a aplicação Flask
+        """
+        script_name = scope.get('root_path', '').encode('utf-8').decode('latin-1')
+        path_info = scope['path'].encode('utf-8').decode('latin-1')
+        if script_name and path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': script_name,
+            'PATH_INFO': path_info,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f"HTTP_{name}"
+            value = value.decode('latin-1')
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+
+        # O corpo já foi lido por inteiro (inclusive uploads chunked): o Flask recebe
+        # o tamanho real e um stream finito
+        environ.pop('HTTP_TRANSFER_ENCODING', None)
+        environ['CONTENT_LENGTH'] = str(len(body))
+        environ['wsgi.input_terminated'] = True
+
+        return environ
+
+    async def _run_flask(self, environ, send):
+        """Executa a aplicação Flask no pool de threads, enviando a resposta em partes (streaming)"""
+        loop = asyncio.get_running_loop()
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def run():
+            response_start = {}
+
+            def start_response(status, headers, exc_info=None):
+                response_start.update({
+                    'type': 'http.response.start',
+                    'status': int(status.split(' ', 1)[0]),
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+                })
+
+            started = False
+            result = self.flask_app(environ, start_response)
+            try:
+                for chunk in result:
+                    if not chunk:
+                        continue
+                    if not started:
+                        send_from_thread(response_start)
+                        started = True
+                    send_from_thread({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+
+            if not started:
+                send_from_thread(response_start)
+            send_from_thread({'type': 'http.response.body', 'body': b''})
+
+        await loop.run_in_executor(self._executor, run)
+
+
+def create_asgi_app(flask_app):
+    """
+    Cria o gateway ASGI com ASGI_THREADS e ASGI_ASYNC_CEP_LOOKUP da aplicação
+
+    Args:
+        flask_app: Instância do Flask
+
+    Returns:
+        AsyncOrderGateway: Aplicação ASGI
+    """
+    return AsyncOrderGateway(
+        flask_app,
+        threads=flask_app.config.get('ASGI_THREADS', 10),
+        # Com validação adiada, a rota não espera o ViaCEP
+        resolve_cep=(flask_app.config.get('ASGI_ASYNC_CEP_LOOKUP', True)
+                     and flask_app.config.get('ORDER_ADDRESS_VALIDATION', 'sync') != 'deferred')
+    )
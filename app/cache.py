@@ -0,0 +1,126 @@
+"""
+Cache em memória com expiração (TTL) e despejo LRU
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Cache limitado em memória com expiração (TTL) e despejo LRU"""
+
+    def __init__(self, max_size=10000, ttl=60):
+        """
+        Inicializa o cache
+
+        Args:
+            max_size: Número máximo de entradas armazenadas
+            ttl: Tempo de vida padrão (segundos) das entradas
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Busca um valor no cache
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor armazenado ou None se ausente/expirado
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Armazena um valor no cache
+
+        Args:
+            key: Chave da entrada
+            value: Valor a ser armazenado
+            ttl: Tempo de vida (segundos); usa o TTL padrão se não informado
+        """
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (expires_at, value)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Remove uma entrada do cache (invalidação)
+
+        Args:
+            key: Chave da entrada
+        """
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Remove todas as entradas e zera os contadores"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+
+    def stats(self):
+        """
+        Retorna estatísticas de uso do cache
+
+        Returns:
+            dict: Contadores de acertos, falhas e despejos
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,110 @@
+"""
+Comandos de linha de comando da aplicação (flask <comando>)
+"""
+import click
+
+from app.services.cep_directory import build_cep_index
+
+
+def register_commands(app):
+    """
+    Registra os comandos CLI da aplicação
+
+    Args:
+        app: Instância do Flask
+    """
+
+    @app.cli.command('build-cep-index')
+    @click.argument('source_path', type=click.Path(exists=True, dir_okay=False))
+    @click.argument('index_path', type=click.Path(dir_okay=False))
+    def build_cep_index_command(source_path, index_path):
+        """Gera o índice offline de CEPs a partir de um dump CSV/JSON"""
+        count = build_cep_index(source_path, index_path)
+        click.echo(f"✓ Índice de CEPs gerado com {count} registros: {index_path}")
+
+    @app.cli.command('upgrade-schema')
+    def upgrade_schema_command():
+        """Aplica as alterações de colunas pendentes em bancos criados por versões anteriores"""
+        from app.database import upgrade_schema
+
+        statements = upgrade_schema()
+        for statement in statements:
+            click.echo(f"✓ {statement}")
+        if not statements:
+            click.echo("✓ Esquema em dia")
+
+    @app.cli.command('outbox-worker')
+    @click.option('--threads', type=int, help='Threads processando lotes (padrão: OUTBOX_WORKER_THREADS)')
+    @click.option('--batch-size', type=int, help='Tarefas por lote (padrão: OUTBOX_BATCH_SIZE)')
+    @click.option('--once', is_flag=True, help='Processa as tarefas disponíveis e termina')
+    @click.option('--metrics-port', type=int, help='Expõe GET /metrics do worker nesta porta')
+    def outbox_worker_command(threads, batch_size, once, metrics_port):
+        """Processa a outbox de enriquecimento de endereços"""
+        from app.services.address_enrichment_service import AddressEnrichmentService
+
+        worker = AddressEnrichmentService.create_worker(app, threads, batch_size)
+
+        if once:
+            total = 0
+            with app.app_context():
+                while True:
+                    processed = worker.run_once()
+                    total += processed
+                    if processed < worker.batch_size:
+                        break
+            click.echo(f"✓ {total} tarefas processadas")
+            return
+
+        if metrics_port:
+            _serve_metrics(app, metrics_port)
+        worker.run()
+
+    @app.cli.command('outbox-requeue-failed')
+    def outbox_requeue_failed_command():
+        """Devolve à fila as tarefas da outbox que esgotaram as tentativas"""
+        from app.services.outbox_service import OutboxService
+
+        count = OutboxService.requeue_failed()
+        click.echo(f"✓ {count} tarefas devolvidas à fila")
+
+    @app.cli.command('rebuild-order-stats')
+    def rebuild_order_stats_command():
+        """Recalcula o resumo de pedidos (GET /api/orders/stats) a partir da tabela orders"""
+        from app.services.order_stats_service import OrderStatsService
+
+        count = OrderStatsService.rebuild()
+        click.echo(f"✓ Resumo de pedidos recalculado: {count} linhas")
+
+
+def _serve_metrics(app, port):
+    """
+    Serve GET /metrics em uma thread (processos sem servidor HTTP, como o worker da outbox)
+
+    Args:
+        app: Instância do Flask
+        port: Porta de escuta
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import threading
+
+    from app.metrics import CONTENT_TYPE, registry
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            with app.app_context():
+                body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    click.echo(f"Métricas em http://0.0.0.0:{port}/metrics")
@@ -8,6 +8,34 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def engine_options(database_url, pool_size=10, max_overflow=20):
+    """
+    Opções do engine SQLAlchemy (pool de conexões) a partir das variáveis DB_POOL_*
+
+    Args:
+        database_url: URL do banco (SQLite em memória usa StaticPool, sem opções de fila)
+        pool_size: Conexões mantidas abertas, se DB_POOL_SIZE não estiver definida
+        max_overflow: Conexões extras sob pico, se DB_MAX_OVERFLOW não estiver definida
+
+    Returns:
+        dict: Valor de SQLALCHEMY_ENGINE_OPTIONS
+    """
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
+
+    if database_url.startswith('sqlite') and (':memory:' in database_url or database_url.rstrip('/') == 'sqlite:'):
+        return options
+
+    options.update({
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),  # Espera máxima (segundos inteiros) por uma conexão livre
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800))  # Abaixo do wait_timeout do MySQL
+    })
+    return options
+
+
 class Config:
     """Configuração base da aplicação"""
 
@@ -24,6 +52,27 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = DEBUG  # Log SQL queries em desenvolvimento
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DATABASE_URL)
+
+    # Réplicas de leitura (URLs separadas por vírgula; vazio = tudo no primário)
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5.0))
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 5.0))
+
+    # Provider JSON das respostas (orjson ou stdlib)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
+    # Métricas no formato Prometheus em GET /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR') or None  # Diretório compartilhado pelos workers
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5.0))
+    METRICS_OUTBOX_CACHE_SECONDS = float(os.getenv('METRICS_OUTBOX_CACHE_SECONDS', 15.0))
+
+    # Profiler de SQL por requisição (cabeçalho X-SQL-Queries e GET /debug/sql)
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', 'false').lower() == 'true'
+    SQL_PROFILER_RAISE = os.getenv('SQL_PROFILER_RAISE', 'false').lower() == 'true'  # Falhar em N+1/limite
+    SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', 3))
+    SQL_PROFILER_HISTORY = int(os.getenv('SQL_PROFILER_HISTORY', 50))
 
     # Configurações de CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -31,6 +80,33 @@ class Config:
     # URLs das APIs externas
     VIACEP_API_URL = os.getenv('VIACEP_API_URL', 'https://viacep.com.br/ws')
 
+    # Cliente HTTP do ViaCEP (timeouts em segundos)
+    VIACEP_CONNECT_TIMEOUT = float(os.getenv('VIACEP_CONNECT_TIMEOUT', 2.0))
+    VIACEP_READ_TIMEOUT = float(os.getenv('VIACEP_READ_TIMEOUT', 3.0))
+    VIACEP_MAX_RETRIES = int(os.getenv('VIACEP_MAX_RETRIES', 2))
+    VIACEP_RETRY_BACKOFF = float(os.getenv('VIACEP_RETRY_BACKOFF', 0.1))
+    VIACEP_POOL_MAXSIZE = int(os.getenv('VIACEP_POOL_MAXSIZE', 20))
+    VIACEP_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('VIACEP_CIRCUIT_FAILURE_THRESHOLD', 5))
+    VIACEP_CIRCUIT_RESET_TIMEOUT = int(os.getenv('VIACEP_CIRCUIT_RESET_TIMEOUT', 30))
+    VIACEP_ASYNC_MAX_CONNECTIONS = int(os.getenv('VIACEP_ASYNC_MAX_CONNECTIONS', 100))  # Cliente httpx do gateway ASGI
+
+    # Gateway ASGI (asgi.py): CEP de novos pedidos consultado no event loop
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 10))  # Threads que executam o Flask (requisições no banco)
+    ASGI_ASYNC_CEP_LOOKUP = os.getenv('ASGI_ASYNC_CEP_LOOKUP', 'true').lower() == 'true'
+
+    # Cache de CEPs em memória (por processo)
+    CEP_CACHE_MAX_SIZE = int(os.getenv('CEP_CACHE_MAX_SIZE', 10000))
+    CEP_CACHE_TTL = int(os.getenv('CEP_CACHE_TTL', 86400))  # 24 horas
+    CEP_CACHE_NEGATIVE_TTL = int(os.getenv('CEP_CACHE_NEGATIVE_TTL', 600))  # 10 minutos
+
+    # Validação de CEPs em lote
+    CEP_BATCH_MAX_SIZE = int(os.getenv('CEP_BATCH_MAX_SIZE', 500))
+    CEP_BATCH_CONCURRENCY = int(os.getenv('CEP_BATCH_CONCURRENCY', 10))
+
+    # Diretório offline de CEPs (índice gerado com "flask build-cep-index")
+    CEP_DIRECTORY_PATH = os.getenv('CEP_DIRECTORY_PATH') or None
+    CEP_DIRECTORY_HTTP_FALLBACK = os.getenv('CEP_DIRECTORY_HTTP_FALLBACK', 'true').lower() == 'true'
+
     # Configurações de frete (valores em reais por região)
     SHIPPING_RATES = {
         'SP': 10.00,  # São Paulo
@@ -40,15 +116,69 @@ class Config:
         'default': 25.00  # Outros estados
     }
 
+    # Prazos de entrega por estado (dias úteis)
+    SHIPPING_DELIVERY_DAYS = {
+        'SP': 2,
+        'RJ': 3,
+        'MG': 3,
+        'ES': 4,
+        'PR': 4,
+        'SC': 5,
+        'RS': 5,
+        'default': 7
+    }
+
+    # Frete grátis a partir deste valor (faixas de CEP podem definir o próprio)
+    SHIPPING_FREE_THRESHOLD = float(os.getenv('SHIPPING_FREE_THRESHOLD', 200.00))
+
+    # Tabela de frete por faixas de CEP (CSV/JSON/JSONL); vazio = apenas por estado
+    SHIPPING_RATE_TABLE_PATH = os.getenv('SHIPPING_RATE_TABLE_PATH') or None
+
     # Paginação
     DEFAULT_PAGE_SIZE = 10
     MAX_PAGE_SIZE = 100
 
+    # Cache do detalhe de pedidos (por processo; o TTL só libera memória de entradas sem uso)
+    ORDER_CACHE_ENABLED = os.getenv('ORDER_CACHE_ENABLED', 'true').lower() == 'true'
+    ORDER_CACHE_MAX_SIZE = int(os.getenv('ORDER_CACHE_MAX_SIZE', 10000))
+    ORDER_CACHE_TTL = int(os.getenv('ORDER_CACHE_TTL', 5))
+    # Janela sem consultar o banco; limita a defasagem de alterações feitas por outros processos
+    ORDER_CACHE_REVALIDATE_SECONDS = float(os.getenv('ORDER_CACHE_REVALIDATE_SECONDS', 1.0))
+
+    # Exportação de pedidos (linhas buscadas por vez no cursor do servidor)
+    ORDERS_EXPORT_BATCH_SIZE = int(os.getenv('ORDERS_EXPORT_BATCH_SIZE', 1000))
+
+    # Geração de números de pedido (block, time ou random)
+    ORDER_NUMBER_ALLOCATOR = os.getenv('ORDER_NUMBER_ALLOCATOR', 'block')
+    ORDER_NUMBER_BLOCK_SIZE = int(os.getenv('ORDER_NUMBER_BLOCK_SIZE', 1000))
+    ORDER_NODE_ID = int(os.getenv('ORDER_NODE_ID', 0))  # Único por processo no alocador "time", sem sobreposição entre servidores (gunicorn soma a posição do worker)
+
+    # Criação de pedidos em lote
+    ORDERS_BULK_MAX_SIZE = int(os.getenv('ORDERS_BULK_MAX_SIZE', 1000))
+    ORDERS_BULK_CHUNK_SIZE = int(os.getenv('ORDERS_BULK_CHUNK_SIZE', 200))
+
+    # Validação do payload de criação de pedido (marshmallow ou fast)
+    ORDER_VALIDATION_BACKEND = os.getenv('ORDER_VALIDATION_BACKEND', 'marshmallow')
+
+    # Validação do endereço na criação do pedido: sync (consulta o ViaCEP na requisição)
+    # ou deferred (grava o pedido e enfileira a consulta na outbox; ver flask outbox-worker)
+    ORDER_ADDRESS_VALIDATION = os.getenv('ORDER_ADDRESS_VALIDATION', 'sync')
+
+    # Workers da outbox (tempos em segundos)
+    OUTBOX_WORKER_THREADS = int(os.getenv('OUTBOX_WORKER_THREADS', 2))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 1.0))
+    OUTBOX_LEASE_SECONDS = int(os.getenv('OUTBOX_LEASE_SECONDS', 60))  # Reserva de um lote; depois volta para a fila
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_RETRY_BACKOFF = float(os.getenv('OUTBOX_RETRY_BACKOFF', 5.0))
+    OUTBOX_RETRY_BACKOFF_MAX = float(os.getenv('OUTBOX_RETRY_BACKOFF_MAX', 600.0))
+
 
 class DevelopmentConfig(Config):
     """Configurações para ambiente de desenvolvimento"""
     DEBUG = True
     TESTING = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.DATABASE_URL, pool_size=5, max_overflow=5)
 
 
 class ProductionConfig(Config):
@@ -61,7 +191,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Configurações para ambiente de testes"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=5)
 
 
 # Dicionário para facilitar a seleção da configuração
@@ -6,12 +6,39 @@ import time
 import logging
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 
-# Instância do SQLAlchemy
-db = SQLAlchemy()
+from app.replicas import RoutingSession
+from app.pool_monitor import PoolMonitor, monitored_engine_options
+
+# Instância do SQLAlchemy (leituras podem ir para réplicas, ver app/replicas.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 logger = logging.getLogger(__name__)
 
+# Alterações de colunas em tabelas criadas por versões anteriores (create_all
+# não altera tabelas existentes): (tabela, coluna, coluna desatualizada?, SQL por banco).
+# Bancos fora do dicionário (ex.: SQLite, que não impõe tamanhos) não precisam de ALTER.
+SCHEMA_UPGRADES = (
+    (
+        'orders', 'status',
+        lambda column: (getattr(column['type'], 'length', None) or 30) < 30,  # pending_address_validation
+        {
+            'mysql': 'ALTER TABLE orders MODIFY status VARCHAR(30) NOT NULL',
+            'mariadb': 'ALTER TABLE orders MODIFY status VARCHAR(30) NOT NULL',
+            'postgresql': 'ALTER TABLE orders ALTER COLUMN status TYPE VARCHAR(30)'
+        }
+    ),
+    (
+        'orders', 'updated_at',
+        lambda column: not getattr(column['type'], 'fsp', None),  # Versão do ETag do detalhe
+        {
+            'mysql': 'ALTER TABLE orders MODIFY updated_at DATETIME(6) NOT NULL',
+            'mariadb': 'ALTER TABLE orders MODIFY updated_at DATETIME(6) NOT NULL'
+        }
+    )
+)
+
 
 def init_db(app):
     """
@@ -20,11 +47,16 @@ def init_db(app):
     Args:
         app: Instância do Flask
     """
+    # Pool de fila instrumentado (espera por conexão; ver app/pool_monitor.py)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = monitored_engine_options(app.config.get('SQLALCHEMY_ENGINE_OPTIONS'))
+
     db.init_app(app)
 
     with app.app_context():
+        app.extensions['db_pool_monitor'] = PoolMonitor(db.engine)
+
         # Importar os modelos para que o SQLAlchemy os reconheça
-        from app.models import Order, Address, OrderItem
+        from app.models import Order, Address, OrderItem, OrderNumberSequence, OutboxJob, OrderDailyStats
 
         # Tentar criar as tabelas com retry
         max_retries = 5
@@ -38,6 +70,9 @@ def init_db(app):
                 # Criar todas as tabelas
                 db.create_all()
                 print("✓ Banco de dados inicializado com sucesso!")
+
+                for statement in pending_schema_upgrades():
+                    logger.warning(f"Esquema desatualizado, execute flask upgrade-schema: {statement}")
                 break
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -57,13 +92,53 @@ def reset_db(app):
     """
     with app.app_context():
         # Importar os modelos para que o SQLAlchemy os reconheça
-        from app.models import Order, Address, OrderItem
+        from app.models import Order, Address, OrderItem, OrderNumberSequence, OutboxJob, OrderDailyStats
 
         db.drop_all()
         db.create_all()
         print("✓ Banco de dados resetado com sucesso!")
 
 
+def pending_schema_upgrades():
+    """
+    Lista os ALTER TABLE pendentes em bancos criados por versões anteriores (requer contexto da aplicação)
+
+    Returns:
+        list: Comandos SQL ainda não aplicados (vazio se o esquema estiver em dia)
+    """
+    dialect = db.engine.dialect.name
+    upgrades = [upgrade for upgrade in SCHEMA_UPGRADES if dialect in upgrade[3]]
+    if not upgrades:
+        return []
+
+    inspector = inspect(db.engine)
+    statements = []
+    for table_name, column_name, outdated, sql in upgrades:
+        column = next(
+            (column for column in inspector.get_columns(table_name) if column['name'] == column_name),
+            None
+        )
+        if column is not None and outdated(column):
+            statements.append(sql[dialect])
+    return statements
+
+
+def upgrade_schema():
+    """
+    Aplica os ALTER TABLE pendentes (ver pending_schema_upgrades)
+
+    Returns:
+        list: Comandos executados
+    """
+    statements = pending_schema_upgrades()
+    if statements:
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+                logger.info(f"Esquema atualizado: {statement}")
+    return statements
+
+
 # Funções auxiliares para timestamps
 def get_current_timestamp():
     """Retorna o timestamp atual"""
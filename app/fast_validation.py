@@ -0,0 +1,226 @@
+"""
+Validação rápida (pré-compilada) do payload de criação de pedido
+
+Reproduz exatamente as regras e as mensagens de erro do CreateOrderSchema
+(Marshmallow), mas com o fluxo especializado para esse payload, sem a
+maquinaria genérica de schemas. Em caso de erro lança a mesma
+marshmallow.ValidationError, com o mesmo dicionário de mensagens.
+"""
+from collections.abc import Mapping
+import decimal
+
+from marshmallow import ValidationError, validate
+
+MISSING_MESSAGE = 'Missing data for required field.'
+NULL_MESSAGE = 'Field may not be null.'
+UNKNOWN_MESSAGE = 'Unknown field.'
+INVALID_INPUT_MESSAGE = 'Invalid input type.'
+INVALID_STRING_MESSAGE = 'Not a valid string.'
+INVALID_UTF8_MESSAGE = 'Not a valid utf-8 string.'
+INVALID_INTEGER_MESSAGE = 'Not a valid integer.'
+INVALID_NUMBER_MESSAGE = 'Not a valid number.'
+TOO_LARGE_MESSAGE = 'Number too large.'
+SPECIAL_NUMBER_MESSAGE = 'Special numeric values (nan or infinity) are not permitted.'
+INVALID_LIST_MESSAGE = 'Not a valid list.'
+INVALID_EMAIL_MESSAGE = 'Not a valid email address.'
+NAME_LENGTH_MESSAGE = 'Length must be between 3 and 100.'
+ITEMS_LENGTH_MESSAGE = 'Shorter than minimum length 1.'
+QUANTITY_RANGE_MESSAGE = 'Must be greater than or equal to 1.'
+
+ORDER_FIELDS = frozenset(['customer_name', 'customer_email', 'customer_phone', 'address', 'items'])
+ADDRESS_FIELDS = frozenset(['cep', 'number', 'complement'])
+ITEM_FIELDS = frozenset(['product_id', 'product_name', 'product_image', 'quantity', 'unit_price'])
+
+_email_validator = validate.Email()
+_missing = object()
+
+
+class _FieldError(Exception):
+    """Erro de um campo (mensagens no formato do Marshmallow)"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+
+def _string(value):
+    """fields.Str"""
+    if not isinstance(value, (str, bytes)):
+        raise _FieldError([INVALID_STRING_MESSAGE])
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            raise _FieldError([INVALID_UTF8_MESSAGE])
+    return value
+
+
+def _integer(value):
+    """fields.Int (não estrito)"""
+    if value is True or value is False:
+        raise _FieldError([INVALID_INTEGER_MESSAGE])
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise _FieldError([INVALID_INTEGER_MESSAGE])
+    except OverflowError:
+        raise _FieldError([TOO_LARGE_MESSAGE])
+
+
+def _decimal(value):
+    """fields.Decimal (sem casas fixas, sem NaN/infinito)"""
+    if value is True or value is False:
+        raise _FieldError([INVALID_NUMBER_MESSAGE])
+    try:
+        number = decimal.Decimal(str(value))
+    except (TypeError, ValueError, decimal.InvalidOperation):
+        raise _FieldError([INVALID_NUMBER_MESSAGE])
+    except OverflowError:
+        raise _FieldError([TOO_LARGE_MESSAGE])
+    if number.is_nan() or number.is_infinite():
+        raise _FieldError([SPECIAL_NUMBER_MESSAGE])
+    return number
+
+
+def _field(data, name, required, allow_none, convert, result, errors):
+    """Lê, converte e armazena um campo (ou o erro correspondente)"""
+    value = data.get(name, _missing)
+
+    if value is _missing:
+        if required:
+            errors[name] = [MISSING_MESSAGE]
+        return _missing
+
+    if value is None:
+        if allow_none:
+            result[name] = None
+        else:
+            errors[name] = [NULL_MESSAGE]
+        return _missing
+
+    try:
+        converted = convert(value)
+    except _FieldError as e:
+        errors[name] = e.messages
+        return _missing
+
+    result[name] = converted
+    return converted
+
+
+def _unknown(data, known, errors):
+    """Marca campos não declarados no schema (unknown=RAISE)"""
+    for key in data:
+        if key not in known:
+            errors[key] = [UNKNOWN_MESSAGE]
+
+
+def _address(value):
+    """AddressSchema"""
+    if not isinstance(value, Mapping):
+        raise _FieldError({'_schema': [INVALID_INPUT_MESSAGE]})
+
+    result = {}
+    errors = {}
+    _field(value, 'cep', True, False, _string, result, errors)
+    _field(value, 'number', False, True, _string, result, errors)
+    _field(value, 'complement', False, True, _string, result, errors)
+    _unknown(value, ADDRESS_FIELDS, errors)
+
+    if errors:
+        raise _FieldError(errors)
+    return result
+
+
+def _item(value):
+    """OrderItemSchema"""
+    if not isinstance(value, Mapping):
+        raise _FieldError({'_schema': [INVALID_INPUT_MESSAGE]})
+
+    result = {}
+    errors = {}
+    _field(value, 'product_id', True, False, _integer, result, errors)
+    _field(value, 'product_name', True, False, _string, result, errors)
+    _field(value, 'product_image', False, True, _string, result, errors)
+    quantity = _field(value, 'quantity', True, False, _integer, result, errors)
+    if quantity is not _missing and quantity < 1:
+        del result['quantity']
+        errors['quantity'] = [QUANTITY_RANGE_MESSAGE]
+    _field(value, 'unit_price', True, False, _decimal, result, errors)
+    _unknown(value, ITEM_FIELDS, errors)
+
+    if errors:
+        raise _FieldError(errors)
+    return result
+
+
+def _items(value):
+    """fields.List(fields.Nested(OrderItemSchema)) com Length(min=1)"""
+    if isinstance(value, (str, Mapping)) or not hasattr(value, '__iter__') or hasattr(value, 'strip'):
+        raise _FieldError([INVALID_LIST_MESSAGE])
+
+    result = []
+    errors = {}
+    for index, each in enumerate(value):
+        if each is None:
+            errors[index] = [NULL_MESSAGE]
+            continue
+        try:
+            result.append(_item(each))
+        except _FieldError as e:
+            errors[index] = e.messages
+
+    if errors:
+        raise _FieldError(errors)
+    if len(result) < 1:
+        raise _FieldError([ITEMS_LENGTH_MESSAGE])
+    return result
+
+
+def _customer_name(value):
+    """fields.Str com Length(min=3, max=100)"""
+    value = _string(value)
+    if not 3 <= len(value) <= 100:
+        raise _FieldError([NAME_LENGTH_MESSAGE])
+    return value
+
+
+def _customer_email(value):
+    """fields.Email (a mensagem de tipo inválido é a de e-mail)"""
+    if not isinstance(value, (str, bytes)):
+        raise _FieldError([INVALID_EMAIL_MESSAGE])
+    value = _string(value)
+    try:
+        _email_validator(value)
+    except ValidationError as e:
+        raise _FieldError(e.messages)
+    return value
+
+
+def load_create_order(data):
+    """
+    Valida o payload de criação de pedido (equivalente a CreateOrderSchema().load)
+
+    Args:
+        data: Payload JSON já decodificado
+
+    Returns:
+        dict: Dados validados e convertidos
+
+    Raises:
+        ValidationError: Com as mesmas mensagens do CreateOrderSchema
+    """
+    if not isinstance(data, Mapping):
+        raise ValidationError({'_schema': [INVALID_INPUT_MESSAGE]})
+
+    result = {}
+    errors = {}
+    _field(data, 'customer_name', True, False, _customer_name, result, errors)
+    _field(data, 'customer_email', True, False, _customer_email, result, errors)
+    _field(data, 'customer_phone', False, True, _string, result, errors)
+    _field(data, 'address', True, False, _address, result, errors)
+    _field(data, 'items', True, False, _items, result, errors)
+    _unknown(data, ORDER_FIELDS, errors)
+
+    if errors:
+        raise ValidationError(errors, data=data, valid_data=result)
+    return result
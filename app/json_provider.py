@@ -0,0 +1,84 @@
+"""
+Providers JSON da aplicação (orjson com fallback para a biblioteca padrão)
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import logging
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider, _default as flask_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj):
+    """
+    Converte tipos não suportados nativamente pelo serializador JSON
+
+    Decimal vira float e datas viram ISO 8601 (mesmo formato dos to_dict dos models).
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return flask_default(obj)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Provider baseado no módulo json da biblioteca padrão"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+
+class OrjsonJSONProvider(JSONProvider):
+    """Provider baseado no orjson (serialização nativa de datetime, sem escapar Unicode)"""
+
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+
+    def _options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """Serializa para string JSON"""
+        return orjson.dumps(obj, default=_default, option=self._options(bool(kwargs.get('indent')))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Desserializa uma string ou bytes JSON"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Cria a resposta JSON sem passar por str intermediária"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        body = orjson.dumps(obj, default=_default, option=self._options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """
+    Configura o provider JSON definido em JSON_PROVIDER (orjson ou stdlib)
+
+    Args:
+        app: Instância do Flask
+    """
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+
+    if name == 'orjson' and orjson is None:
+        logger.warning("orjson não instalado, usando o provider JSON da biblioteca padrão")
+        name = 'stdlib'
+
+    provider_class = OrjsonJSONProvider if name == 'orjson' else StdlibJSONProvider
+    app.json = provider_class(app)
@@ -0,0 +1,644 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (GET /metrics)
+
+Registro em memória, por processo, sem dependências externas. Cada
+observação custa um lock e algumas somas, o que permite deixar a coleta
+ligada em produção. Valores derivados de outros componentes (pool de
+conexões, caches) são lidos apenas no momento da coleta.
+
+Com vários processos (workers do gunicorn), METRICS_MULTIPROC_DIR aponta
+para um diretório compartilhado: cada processo grava ali o seu estado a cada
+METRICS_FLUSH_INTERVAL segundos e GET /metrics soma os arquivos de todos os
+processos. Contadores e histogramas de workers encerrados são acumulados em
+archive.json (hook child_exit), então continuam monotônicos; gauges de
+processos encerrados são descartados.
+"""
+from bisect import bisect_left
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Buckets padrão de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+OUTBOX_LAG_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value):
+    """Escapa o valor de um label"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    """Monta o trecho {nome="valor",...} de uma amostra"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    """Formata um número para a exposição"""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base das métricas: nome, descrição, labels e lock"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """Lista de (sufixo, valores dos labels, label extra, valor)"""
+        raise NotImplementedError
+
+    def state(self):
+        """Valores atuais em formato JSON (para o diretório multiprocesso)"""
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def reset(self):
+        """Zera os valores (processo filho após fork)"""
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        """Texto da métrica no formato de exposição"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, extra, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}"
+            )
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Contador monotônico"""
+
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [('', labels, None, value) for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Valor instantâneo"""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), multiprocess_mode='sum'):
+        """
+        Args:
+            multiprocess_mode: Como combinar os valores dos processos: sum, max ou min
+        """
+        super().__init__(name, documentation, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        with self._lock:
+            return [('', labels, None, value) for labels, value in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Histograma com buckets fixos (contagens por bucket, soma e total)"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def state(self):
+        with self._lock:
+            return [[list(labels), [list(counts), total, count]] for labels, (counts, total, count) in self._values.items()]
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in sorted(self._values.items())]
+
+        samples = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', labels, f'le="{_format_value(float(bound))}"', cumulative))
+            samples.append(('_sum', labels, None, total))
+            samples.append(('_count', labels, None, count))
+        return samples
+
+
+def _describe(metric):
+    """Definição e valores de uma métrica em formato JSON"""
+    entry = {
+        'type': metric.type,
+        'documentation': metric.documentation,
+        'labelnames': list(metric.labelnames),
+        'values': metric.state()
+    }
+    if isinstance(metric, Histogram):
+        entry['buckets'] = list(metric.buckets)
+    if isinstance(metric, Gauge):
+        entry['mode'] = metric.multiprocess_mode
+    return entry
+
+
+def _merge_into(merged, name, entry, include_gauges=True):
+    """
+    Soma os valores de uma métrica gravada por um processo
+
+    Args:
+        merged: {nome: métrica} acumulado
+        name: Nome da métrica
+        entry: Retorno de _describe() lido do arquivo do processo
+        include_gauges: Se False, ignora gauges (processos encerrados)
+    """
+    if entry['type'] == 'gauge' and not include_gauges:
+        return
+
+    metric = merged.get(name)
+    if metric is None:
+        if entry['type'] == 'histogram':
+            metric = Histogram(name, entry['documentation'], entry['labelnames'], entry['buckets'])
+        elif entry['type'] == 'gauge':
+            metric = Gauge(name, entry['documentation'], entry['labelnames'], entry.get('mode', 'sum'))
+        else:
+            metric = Counter(name, entry['documentation'], entry['labelnames'])
+        merged[name] = metric
+
+    for labels, value in entry['values']:
+        labels = tuple(labels)
+        current = metric._values.get(labels)
+        if current is None:
+            metric._values[labels] = value
+        elif entry['type'] == 'histogram':
+            current[0] = [a + b for a, b in zip(current[0], value[0])]
+            current[1] += value[1]
+            current[2] += value[2]
+        elif entry['type'] == 'gauge' and metric.multiprocess_mode == 'max':
+            metric._values[labels] = max(current, value)
+        elif entry['type'] == 'gauge' and metric.multiprocess_mode == 'min':
+            metric._values[labels] = min(current, value)
+        else:
+            metric._values[labels] = current + value
+
+
+def _write_json(path, data):
+    """Grava o arquivo de forma atômica (leitores nunca veem um arquivo pela metade)"""
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # Removido ou substituído durante a leitura
+
+
+class MetricsRegistry:
+    """Conjunto de métricas e coletores avaliados na hora da exposição"""
+
+    ARCHIVE = 'archive.json'
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._shared_collectors = []
+
+        # Modo multiprocesso (enable_multiprocess)
+        self.directory = None
+        self._app = None
+        self._flush_interval = 5.0
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+
+        # Processos filhos (workers) não herdam os valores do master
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def register(self, metric):
+        """Registra uma métrica e a retorna"""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), multiprocess_mode='sum'):
+        return self.register(Gauge(name, documentation, labelnames, multiprocess_mode))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn, shared=False):
+        """
+        Registra uma função chamada a cada coleta
+
+        A função não recebe argumentos e retorna uma lista de métricas já
+        preenchidas (criadas a cada coleta).
+
+        Args:
+            fn: Função coletora
+            shared: Se True, o valor é o mesmo para todos os processos (ex.:
+                lido do banco) e só o processo que responde o calcula
+        """
+        (self._shared_collectors if shared else self._collectors).append(fn)
+        return fn
+
+    def enable_multiprocess(self, app, directory, flush_interval=5.0):
+        """
+        Passa a gravar o estado do processo em `directory` e a somar todos os processos na coleta
+
+        Args:
+            app: Instância do Flask (contexto dos coletores na gravação periódica)
+            directory: Diretório compartilhado pelos processos do servidor
+            flush_interval: Intervalo entre gravações (segundos)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._app = app
+        self._flush_interval = flush_interval
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self):
+        self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self._flush_interval)
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.warning(f"Erro ao gravar métricas do processo: {str(e)}")
+
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+    def _after_fork(self):
+        for metric in self._metrics:
+            metric.reset()
+        self._flush_lock = threading.Lock()
+        if self.directory is not None:
+            self._start_flusher()
+
+    def _collect_process(self):
+        """Métricas registradas e coletores por processo"""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return metrics
+
+    def flush(self):
+        """Grava o estado deste processo em <diretório>/<pid>.json (sem efeito fora do modo multiprocesso)"""
+        if self.directory is None:
+            return
+
+        with self._app.app_context():
+            data = {metric.name: _describe(metric) for metric in self._collect_process()}
+        with self._flush_lock:
+            _write_json(os.path.join(self.directory, f"{os.getpid()}.json"), data)
+
+    def _collect_directory(self):
+        """Soma os arquivos de todos os processos (vivos e archive.json)"""
+        merged = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, '*.json'))):
+            data = _read_json(path)
+            for name, entry in (data or {}).items():
+                _merge_into(merged, name, entry)
+        return list(merged.values())
+
+    def render(self):
+        """
+        Gera o texto de exposição de todas as métricas
+
+        Returns:
+            str: Corpo da resposta de /metrics
+        """
+        if self.directory is None:
+            metrics = self._collect_process()
+        else:
+            self.flush()
+            metrics = self._collect_directory()
+
+        for collector in self._shared_collectors:
+            metrics.extend(collector())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+def clear_multiprocess_dir(directory):
+    """
+    Remove os arquivos de uma execução anterior (hook on_starting do gunicorn)
+
+    Args:
+        directory: Diretório de METRICS_MULTIPROC_DIR
+    """
+    for path in glob.glob(os.path.join(directory, '*.json*')):
+        os.remove(path)
+
+
+def mark_process_dead(directory, pid):
+    """
+    Acumula contadores e histogramas de um processo encerrado em archive.json (hook child_exit do gunicorn)
+
+    Args:
+        directory: Diretório de METRICS_MULTIPROC_DIR
+        pid: PID do processo encerrado
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    data = _read_json(path)
+    if data is None:
+        return
+
+    archive_path = os.path.join(directory, MetricsRegistry.ARCHIVE)
+    merged = {}
+    for source in (_read_json(archive_path) or {}, data):
+        for name, entry in source.items():
+            _merge_into(merged, name, entry, include_gauges=False)
+
+    _write_json(archive_path, {name: _describe(metric) for name, metric in merged.items()})
+    os.remove(path)
+
+
+# Registro do processo e métricas da aplicação
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    'http_requests_total', 'Requisições HTTP atendidas', ('endpoint', 'method', 'status')
+)
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds', 'Latência das requisições HTTP (inclui respostas em streaming)', ('endpoint',)
+)
+http_requests_in_flight = registry.gauge(
+    'http_requests_in_flight', 'Requisições HTTP em andamento'
+)
+http_request_db_queries = registry.histogram(
+    'http_request_db_queries', 'Queries SQL por requisição', ('endpoint',), buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_duration_seconds = registry.histogram(
+    'http_request_db_duration_seconds', 'Tempo total em queries SQL por requisição', ('endpoint',)
+)
+db_queries_total = registry.counter(
+    'db_queries_total', 'Queries SQL executadas', ('database',)
+)
+viacep_request_duration_seconds = registry.histogram(
+    'viacep_request_duration_seconds', 'Latência das consultas ao ViaCEP por resultado', ('outcome',)
+)
+outbox_jobs_processed_total = registry.counter(
+    'outbox_jobs_processed_total', 'Tarefas da outbox processadas por resultado (done, retry, failed, lease_lost)', ('kind', 'outcome')
+)
+outbox_job_lag_seconds = registry.histogram(
+    'outbox_job_lag_seconds', 'Tempo entre a gravação da tarefa e cada processamento', ('kind',), buckets=OUTBOX_LAG_BUCKETS
+)
+
+
+def observe_viacep(started, outcome):
+    """
+    Registra uma consulta ao ViaCEP
+
+    Args:
+        started: time.perf_counter() do início da consulta
+        outcome: Resultado (found, not_found, timeout, error, circuit_open)
+    """
+    viacep_request_duration_seconds.observe(time.perf_counter() - started, outcome)
+
+
+def observe_outbox_job(kind, outcome, lag_seconds):
+    """
+    Registra o processamento de uma tarefa da outbox
+
+    Args:
+        kind: Tipo da tarefa
+        outcome: Resultado (done, retry, failed, lease_lost)
+        lag_seconds: Tempo desde a gravação da tarefa
+    """
+    outbox_jobs_processed_total.inc(kind, outcome)
+    outbox_job_lag_seconds.observe(lag_seconds, kind)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['metrics_query_started'].pop()
+    elapsed = time.perf_counter() - started
+
+    # Réplicas definem a opção de execução "database" (ver app/replicas.py)
+    db_queries_total.inc(conn.get_execution_options().get('database', 'primary'))
+
+    if has_request_context():
+        g.metrics_db_queries = g.get('metrics_db_queries', 0) + 1
+        g.metrics_db_seconds = g.get('metrics_db_seconds', 0.0) + elapsed
+
+
+def _handle_error(context):
+    # Query que falhou: descarta o início registrado em before_cursor_execute
+    connection = context.connection
+    if connection is not None and connection.info.get('metrics_query_started'):
+        connection.info['metrics_query_started'].pop()
+
+
+def _collect_components():
+    """Métricas lidas na coleta: pool de conexões, réplicas e caches"""
+    from app.replicas import get_replica_router
+
+    pool_checked_out = Gauge('db_pool_checked_out', 'Conexões do pool em uso', ('database',))
+    pool_idle = Gauge('db_pool_idle', 'Conexões ociosas no pool', ('database',))
+    pool_overflow = Gauge('db_pool_overflow', 'Conexões abertas além de DB_POOL_SIZE', ('database',))
+    pool_wait = Counter('db_pool_wait_seconds_total', 'Tempo total de espera por conexão do pool', ('database',))
+    pool_timeouts = Counter('db_pool_timeouts_total', 'Esperas por conexão que estouraram DB_POOL_TIMEOUT', ('database',))
+    pool_connects = Counter('db_pool_connects_total', 'Conexões abertas com o banco', ('database',))
+    replica_healthy = Gauge('db_replica_healthy', 'Réplica apta a receber leituras (1) ou não (0)', ('database',), 'min')
+    replica_lag = Gauge('db_replica_lag_seconds', 'Atraso de replicação na última verificação', ('database',), 'max')
+    cache_hits = Counter('cache_hits_total', 'Acertos de cache', ('cache',))
+    cache_misses = Counter('cache_misses_total', 'Faltas de cache', ('cache',))
+    cache_size = Gauge('cache_size', 'Entradas em cache', ('cache',))
+
+    monitors = [('primary', current_app.extensions.get('db_pool_monitor'))]
+    router = get_replica_router()
+    for replica in router.replicas:
+        monitors.append((replica.name, replica.pool_monitor))
+        replica_healthy.set(1 if replica.healthy else 0, replica.name)
+        if replica.lag is not None:
+            replica_lag.set(replica.lag, replica.name)
+
+    for database, monitor in monitors:
+        if monitor is None:
+            continue
+        stats = monitor.stats()
+        pool_checked_out.set(stats['checked_out'], database)
+        if stats['idle'] is not None:
+            pool_idle.set(stats['idle'], database)
+            pool_overflow.set(stats['overflow'], database)
+        pool_wait.inc(database, amount=stats['wait_seconds_total'])
+        pool_timeouts.inc(database, amount=stats['timeouts'])
+        pool_connects.inc(database, amount=stats['connects'])
+
+    for name, extension in (('cep', 'cep_cache'), ('order_detail', 'order_detail_cache')):
+        cache = current_app.extensions.get(extension)
+        if cache is not None:
+            stats = cache.stats()
+            cache_hits.inc(name, amount=stats['hits'])
+            cache_misses.inc(name, amount=stats['misses'])
+            cache_size.set(stats['size'], name)
+
+    return [
+        pool_checked_out, pool_idle, pool_overflow, pool_wait, pool_timeouts, pool_connects,
+        replica_healthy, replica_lag, cache_hits, cache_misses, cache_size
+    ]
+
+
+registry.collector(_collect_components)
+
+
+def _outbox_stats():
+    """
+    Estatísticas da outbox com cache de METRICS_OUTBOX_CACHE_SECONDS
+
+    O GROUP BY na outbox_jobs roda no máximo uma vez por intervalo em cada
+    processo, por mais frequentes que sejam as coletas.
+    """
+    from app.services.outbox_service import OutboxService
+
+    ttl = current_app.config.get('METRICS_OUTBOX_CACHE_SECONDS', 15.0)
+    cached = current_app.extensions.get('metrics_outbox_stats')
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached[1]
+
+    stats = OutboxService.stats()
+    current_app.extensions['metrics_outbox_stats'] = (time.monotonic() + ttl, stats)
+    return stats
+
+
+def _collect_outbox():
+    """Profundidade e atraso da outbox, lidos do banco na coleta (com cache)"""
+    jobs = Gauge('outbox_jobs', 'Tarefas na outbox por estado (pending inclui as reservadas)', ('kind', 'status'))
+    oldest = Gauge('outbox_oldest_pending_age_seconds', 'Idade da tarefa pendente mais antiga', ('kind',))
+
+    try:
+        stats = _outbox_stats()
+    except Exception as e:
+        logger.warning(f"Erro ao coletar métricas da outbox: {str(e)}")
+        return []
+
+    for kind, entry in stats.items():
+        jobs.set(entry['pending'], kind, 'pending')
+        jobs.set(entry['failed'], kind, 'failed')
+        oldest.set(entry['oldest_pending_age_seconds'], kind)
+
+    return [jobs, oldest]
+
+
+registry.collector(_collect_outbox, shared=True)
+
+
+def instrument_engine(engine):
+    """
+    Registra a contagem de queries em um engine (primário em init_metrics, réplicas no roteador)
+
+    Args:
+        engine: Engine SQLAlchemy
+    """
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def init_metrics(app):
+    """
+    Registra a coleta de métricas por requisição e a rota GET /metrics
+
+    Args:
+        app: Instância do Flask
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    from app.database import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    directory = app.config.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        registry.enable_multiprocess(app, directory, app.config.get('METRICS_FLUSH_INTERVAL', 5.0))
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+
+        http_requests_in_flight.dec()
+        endpoint = request.endpoint or 'none'
+        status = g.pop('metrics_status', 500)
+
+        http_requests_total.inc(endpoint, request.method, str(status))
+        http_request_duration_seconds.observe(time.perf_counter() - started, endpoint)
+        http_request_db_queries.observe(g.pop('metrics_db_queries', 0), endpoint)
+        http_request_db_duration_seconds.observe(g.pop('metrics_db_seconds', 0.0), endpoint)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -4,5 +4,8 @@ Models do sistema
 from app.models.order import Order
 from app.models.address import Address
 from app.models.order_item import OrderItem
+from app.models.order_number_sequence import OrderNumberSequence
+from app.models.outbox_job import OutboxJob
+from app.models.order_daily_stats import OrderDailyStats
 
-__all__ = ['Order', 'Address', 'OrderItem']
+__all__ = ['Order', 'Address', 'OrderItem', 'OrderNumberSequence', 'OutboxJob', 'OrderDailyStats']
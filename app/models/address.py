@@ -2,6 +2,7 @@
 Model de Endereço (Address)
 """
 from app.database import db
+from app.serializers import compile_serializer
 
 
 class Address(db.Model):
@@ -26,16 +27,13 @@ class Address(db.Model):
         Returns:
             dict: Representação do endereço
         """
-        return {
-            'id': self.id,
-            'cep': self.cep,
-            'street': self.street,
-            'number': self.number,
-            'complement': self.complement,
-            'neighborhood': self.neighborhood,
-            'city': self.city,
-            'state': self.state
-        }
+        return _serialize_address(self)
 
     def __repr__(self):
         return f"<Address {self.street}, {self.number} - {self.city}/{self.state}>"
+
+
+# Serializador gerado uma única vez a partir das colunas do model
+_serialize_address = compile_serializer(Address, [
+    'id', 'cep', 'street', 'number', 'complement', 'neighborhood', 'city', 'state'
+])
@@ -2,15 +2,32 @@
 Model de Pedido (Order)
 """
 from app.database import db
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import joinedload, selectinload
+from app.order_numbers import get_order_number_allocator
+from app.serializers import compile_serializer
 from datetime import datetime
-import random
-import string
 
 
 class Order(db.Model):
     """Modelo de Pedido"""
 
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Índices compostos para paginação por cursor: (filtro, ordenação, desempate)
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_total_amount_id', 'total_amount', 'id'),
+        db.Index('ix_orders_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_orders_status_total_amount_id', 'status', 'total_amount', 'id'),
+        # Histórico do cliente: pedidos de um e-mail do mais recente ao mais antigo e busca por prefixo do nome
+        db.Index('ix_orders_customer_email_created_at_id', 'customer_email', 'created_at', 'id'),
+        db.Index('ix_orders_customer_name_id', 'customer_name', 'id'),
+        # PostgreSQL: com collation diferente de "C", LIKE 'x%' só usa índice com varchar_pattern_ops
+        db.Index(
+            'ix_orders_customer_name_pattern_id', 'customer_name', 'id',
+            postgresql_ops={'customer_name': 'varchar_pattern_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False)
@@ -19,9 +36,13 @@ class Order(db.Model):
     customer_phone = db.Column(db.String(20), nullable=True)
     total_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0.00)
     shipping_cost = db.Column(db.Numeric(10, 2), nullable=False, default=0.00)
-    status = db.Column(db.String(20), nullable=False, default='pending')
+    status = db.Column(db.String(30), nullable=False, default='pending')
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Versão do pedido para o ETag do detalhe: microssegundos também no MySQL (DATETIME(6))
+    updated_at = db.Column(
+        db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql', 'mariadb'),
+        nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     # Relacionamentos
     address = db.relationship('Address', backref='order', uselist=False, cascade='all, delete-orphan')
@@ -33,12 +54,23 @@ class Order(db.Model):
         if not self.order_number:
             self.order_number = self._generate_order_number()
 
+    @staticmethod
+    def detail_load_options():
+        """
+        Opções de carregamento antecipado para serializar com include_details
+
+        O endereço (1:1) vem no mesmo SELECT via JOIN e os itens em um único
+        SELECT ... IN para todos os pedidos, independente da quantidade.
+
+        Returns:
+            tuple: Opções para Query.options()
+        """
+        return (joinedload(Order.address), selectinload(Order.items))
+
     @staticmethod
     def _generate_order_number():
-        """Gera um número de pedido único no formato ORD-YYYYMMDD-XXXX"""
-        date_str = datetime.now().strftime('%Y%m%d')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-        return f"ORD-{date_str}-{random_str}"
+        """Gera um número de pedido único usando o alocador configurado (ORDER_NUMBER_ALLOCATOR)"""
+        return get_order_number_allocator().allocate()
 
     def calculate_total(self):
         """Calcula o total do pedido (itens + frete)"""
@@ -56,18 +88,7 @@ class Order(db.Model):
         Returns:
             dict: Representação do pedido
         """
-        data = {
-            'id': self.id,
-            'order_number': self.order_number,
-            'customer_name': self.customer_name,
-            'customer_email': self.customer_email,
-            'customer_phone': self.customer_phone,
-            'total_amount': float(self.total_amount),
-            'shipping_cost': float(self.shipping_cost),
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = _serialize_order(self)
 
         if include_details:
             data['address'] = self.address.to_dict() if self.address else None
@@ -77,3 +98,10 @@ class Order(db.Model):
 
     def __repr__(self):
         return f"<Order {self.order_number} - {self.customer_name}>"
+
+
+# Serializador gerado uma única vez a partir das colunas do model
+_serialize_order = compile_serializer(Order, [
+    'id', 'order_number', 'customer_name', 'customer_email', 'customer_phone',
+    'total_amount', 'shipping_cost', 'status', 'created_at', 'updated_at'
+])
@@ -0,0 +1,23 @@
+"""
+Model de Resumo Diário de Pedidos (OrderDailyStats)
+"""
+from app.database import db
+from datetime import datetime
+
+
+class OrderDailyStats(db.Model):
+    """Totais de pedidos por dia (UTC), status e estado, mantidos incrementalmente"""
+
+    __tablename__ = 'order_daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(30), primary_key=True)
+    state = db.Column(db.String(2), primary_key=True)  # Vazio enquanto o endereço aguarda validação
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    items_quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0.00)
+    shipping_revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0.00)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OrderDailyStats {self.day} {self.status} {self.state or '--'}: {self.order_count}>"
@@ -2,6 +2,7 @@
 Model de Item do Pedido (OrderItem)
 """
 from app.database import db
+from app.serializers import compile_serializer
 
 
 class OrderItem(db.Model):
@@ -36,15 +37,13 @@ class OrderItem(db.Model):
         Returns:
             dict: Representação do item
         """
-        return {
-            'id': self.id,
-            'product_id': self.product_id,
-            'product_name': self.product_name,
-            'product_image': self.product_image,
-            'quantity': self.quantity,
-            'unit_price': float(self.unit_price),
-            'total_price': float(self.total_price)
-        }
+        return _serialize_order_item(self)
 
     def __repr__(self):
         return f"<OrderItem {self.product_name} x{self.quantity}>"
+
+
+# Serializador gerado uma única vez a partir das colunas do model
+_serialize_order_item = compile_serializer(OrderItem, [
+    'id', 'product_id', 'product_name', 'product_image', 'quantity', 'unit_price', 'total_price'
+])
@@ -0,0 +1,16 @@
+"""
+Model de Sequência de Números de Pedido (OrderNumberSequence)
+"""
+from app.database import db
+
+
+class OrderNumberSequence(db.Model):
+    """Contador global usado para reservar blocos de números de pedido"""
+
+    __tablename__ = 'order_number_sequences'
+
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OrderNumberSequence {self.name}={self.next_value}>"
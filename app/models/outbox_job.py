@@ -0,0 +1,31 @@
+"""
+Model de Tarefa da Outbox (OutboxJob)
+"""
+from app.database import db
+from datetime import datetime
+
+
+class OutboxJob(db.Model):
+    """Tarefa gravada na mesma transação do pedido e executada pelos workers da outbox"""
+
+    __tablename__ = 'outbox_jobs'
+    __table_args__ = (
+        # Busca das próximas tarefas disponíveis de um tipo
+        db.Index('ix_outbox_jobs_kind_status_available_at', 'kind', 'status', 'available_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(50), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending ou failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Próxima execução ou fim da reserva
+    claim_token = db.Column(db.String(32), nullable=True, index=True)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    order = db.relationship('Order')
+
+    def __repr__(self):
+        return f"<OutboxJob {self.id} {self.kind} pedido={self.order_id} ({self.status})>"
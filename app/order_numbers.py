@@ -0,0 +1,245 @@
+"""
+Alocadores de números de pedido
+
+Os alocadores block e time geram números no formato ORD-YYYYMMDD-XXXXXXX, onde
+o sufixo tem 7 caracteres em base 36 (cabe na coluna order_number de 20 chars):
+
+    - block: reserva blocos de uma sequência global no banco (um UPDATE a cada
+      ORDER_NUMBER_BLOCK_SIZE pedidos); único entre processos e servidores.
+    - time: segundo do dia + ORDER_NODE_ID + sequência local, sem acesso ao
+      banco; único desde que cada processo vivo tenha um ORDER_NODE_ID
+      distinto em todos os servidores (faixas de nós sem sobreposição entre
+      hosts) e que o relógio não volte entre o fim de um processo e o início
+      do seu substituto.
+    - random: formato legado ORD-YYYYMMDD-XXXX aleatório (sem garantia).
+"""
+from datetime import datetime
+import logging
+import os
+import random
+import string
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+SUFFIX_LENGTH = 7
+ALPHABET = string.digits + string.ascii_uppercase
+MAX_SUFFIX_VALUE = len(ALPHABET) ** SUFFIX_LENGTH
+
+
+def format_order_number(date, value):
+    """
+    Formata o número do pedido
+
+    Args:
+        date: Data do pedido
+        value: Inteiro único a ser codificado no sufixo
+
+    Returns:
+        str: Número no formato ORD-YYYYMMDD-XXXXXXX
+    """
+    if not 0 <= value < MAX_SUFFIX_VALUE:
+        raise ValueError(f"Valor fora do intervalo do número de pedido: {value}")
+
+    suffix = []
+    for _ in range(SUFFIX_LENGTH):
+        value, remainder = divmod(value, len(ALPHABET))
+        suffix.append(ALPHABET[remainder])
+
+    return f"ORD-{date.strftime('%Y%m%d')}-{''.join(reversed(suffix))}"
+
+
+class RandomOrderNumberAllocator:
+    """Formato legado ORD-YYYYMMDD-XXXX com 4 caracteres aleatórios (sem garantia de unicidade)"""
+
+    def allocate(self):
+        """Gera um número de pedido"""
+        date_str = datetime.now().strftime('%Y%m%d')
+        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+        return f"ORD-{date_str}-{random_str}"
+
+
+class TimeOrderNumberAllocator:
+    """
+    Sufixo ordenado no tempo: segundo do dia (17 bits) + nó (10 bits) + sequência (9 bits)
+
+    Permite até 512 pedidos por segundo por nó; ao esgotar a sequência, aguarda
+    o próximo segundo. Se o relógio voltar, continua a partir do último segundo usado.
+
+    O segundo em que o alocador é criado é tratado como esgotado: o primeiro
+    número sai no segundo seguinte. Assim um processo que substitui outro no
+    mesmo nó (worker reciclado pelo gunicorn, que herda a posição do anterior)
+    não repete a sequência que o anterior usou naquele segundo.
+    """
+
+    NODE_BITS = 10
+    SEQUENCE_BITS = 9
+    MAX_NODE_ID = (1 << NODE_BITS) - 1
+    MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+    def __init__(self, node_id):
+        """
+        Args:
+            node_id: Identificador único do processo (0 a 1023)
+        """
+        if not 0 <= node_id <= self.MAX_NODE_ID:
+            raise ValueError(f"ORDER_NODE_ID deve estar entre 0 e {self.MAX_NODE_ID}")
+
+        self.node_id = node_id
+        self._lock = threading.Lock()
+        self._day, self._last_second = self._clock()
+        self._sequence = self.MAX_SEQUENCE
+
+    @staticmethod
+    def _clock():
+        """Dia e segundo do dia atuais"""
+        now = datetime.now()
+        return now.date(), now.hour * 3600 + now.minute * 60 + now.second
+
+    def allocate(self):
+        """Gera um número de pedido"""
+        with self._lock:
+            while True:
+                current = self._clock()
+
+                if current > (self._day, self._last_second):
+                    self._day, self._last_second = current
+                    self._sequence = 0
+                    break
+
+                # Mesmo segundo (ou relógio voltou): usar a próxima sequência
+                if self._sequence < self.MAX_SEQUENCE:
+                    self._sequence += 1
+                    break
+
+                time.sleep(0.001)
+
+            value = (
+                (self._last_second << (self.NODE_BITS + self.SEQUENCE_BITS))
+                | (self.node_id << self.SEQUENCE_BITS)
+                | self._sequence
+            )
+            return format_order_number(self._day, value)
+
+
+class BlockOrderNumberAllocator:
+    """Sequência global com blocos reservados no banco de dados"""
+
+    SEQUENCE_NAME = 'order_number'
+
+    def __init__(self, engine, block_size=1000):
+        """
+        Args:
+            engine: Engine SQLAlchemy usado para reservar blocos
+            block_size: Quantidade de números reservados por acesso ao banco
+        """
+        self.engine = engine
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+        self.blocks_reserved = 0
+
+        # Processos filhos (fork) não podem reutilizar o bloco herdado do pai
+        os.register_at_fork(after_in_child=self._discard_block)
+
+    def _discard_block(self):
+        """Descarta o bloco atual (o próximo allocate() reserva um novo)"""
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    def _reserve_block(self):
+        """
+        Reserva o próximo bloco em uma transação própria
+
+        Returns:
+            tuple: (primeiro valor, valor final exclusivo) do bloco
+        """
+        from app.models.order_number_sequence import OrderNumberSequence
+
+        table = OrderNumberSequence.__table__
+        for _ in range(3):
+            try:
+                with self.engine.begin() as connection:
+                    updated = connection.execute(
+                        update(table)
+                        .where(table.c.name == self.SEQUENCE_NAME)
+                        .values(next_value=table.c.next_value + self.block_size)
+                    ).rowcount
+
+                    if not updated:
+                        connection.execute(table.insert().values(
+                            name=self.SEQUENCE_NAME, next_value=self.block_size
+                        ))
+                        end = self.block_size
+                    else:
+                        end = connection.execute(
+                            select(table.c.next_value).where(table.c.name == self.SEQUENCE_NAME)
+                        ).scalar_one()
+            except IntegrityError:
+                # Outro processo criou a sequência ao mesmo tempo: tentar novamente
+                continue
+
+            self.blocks_reserved += 1
+            logger.debug(f"Bloco de números de pedido reservado: {end - self.block_size}-{end - 1}")
+            return end - self.block_size, end
+
+        raise RuntimeError('Não foi possível reservar bloco de números de pedido')
+
+    def allocate(self):
+        """Gera um número de pedido"""
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve_block()
+            value = self._next
+            self._next += 1
+
+        return format_order_number(datetime.now(), value)
+
+
+def create_allocator(app, engine):
+    """
+    Cria o alocador configurado em ORDER_NUMBER_ALLOCATOR
+
+    Args:
+        app: Instância do Flask
+        engine: Engine SQLAlchemy da aplicação
+
+    Returns:
+        Alocador com o método allocate()
+    """
+    name = app.config.get('ORDER_NUMBER_ALLOCATOR', 'block')
+
+    if name == 'block':
+        return BlockOrderNumberAllocator(engine, app.config.get('ORDER_NUMBER_BLOCK_SIZE', 1000))
+    if name == 'time':
+        return TimeOrderNumberAllocator(app.config.get('ORDER_NODE_ID', 0))
+    if name == 'random':
+        return RandomOrderNumberAllocator()
+
+    raise ValueError(f"Alocador de número de pedido desconhecido: {name}")
+
+
+def get_order_number_allocator():
+    """
+    Retorna o alocador de números de pedido da aplicação atual (criado sob demanda)
+
+    Returns:
+        Alocador com o método allocate()
+    """
+    from app.database import db
+
+    allocator = current_app.extensions.get('order_number_allocator')
+    if allocator is None:
+        allocator = current_app.extensions.setdefault(
+            'order_number_allocator',
+            create_allocator(current_app, db.engine)
+        )
+    return allocator
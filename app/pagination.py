@@ -0,0 +1,122 @@
+"""
+Paginação por cursor (keyset) para consultas ordenadas
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Erro lançado quando o cursor informado não pode ser decodificado"""
+
+
+def _serialize_value(value):
+    """Converte o valor da coluna de ordenação para um tipo JSON"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize_value(value, kind):
+    """Converte o valor do cursor de volta para o tipo da coluna"""
+    if kind == 'datetime':
+        return datetime.fromisoformat(value)
+    if kind == 'decimal':
+        return Decimal(value)
+    return value
+
+
+def _value_kind(value):
+    """Identifica o tipo do valor armazenado no cursor"""
+    if isinstance(value, datetime):
+        return 'datetime'
+    if isinstance(value, Decimal):
+        return 'decimal'
+    return 'raw'
+
+
+def encode_cursor(value, row_id, order_by, sort):
+    """
+    Gera um cursor opaco a partir da última linha da página
+
+    Args:
+        value: Valor da coluna de ordenação na última linha
+        row_id: ID da última linha (desempate)
+        order_by: Nome do campo de ordenação
+        sort: Direção da ordenação (asc, desc)
+
+    Returns:
+        str: Cursor codificado em base64 (URL-safe)
+    """
+    payload = {
+        'o': order_by,
+        's': sort,
+        'k': _value_kind(value),
+        'v': _serialize_value(value),
+        'id': row_id
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, order_by, sort):
+    """
+    Decodifica um cursor e valida se corresponde à ordenação atual
+
+    Args:
+        cursor: Cursor gerado por encode_cursor
+        order_by: Nome do campo de ordenação da requisição atual
+        sort: Direção da ordenação da requisição atual
+
+    Returns:
+        tuple: (valor, id) da última linha da página anterior
+
+    Raises:
+        InvalidCursorError: Se o cursor for inválido ou de outra ordenação
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if payload['o'] != order_by or payload['s'] != sort:
+            raise InvalidCursorError('Cursor não corresponde à ordenação solicitada')
+        return _deserialize_value(payload['v'], payload['k']), int(payload['id'])
+    except InvalidCursorError:
+        raise
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        raise InvalidCursorError('Cursor inválido') from e
+
+
+def apply_keyset(query, column, id_column, sort, cursor_value=None, cursor_id=None):
+    """
+    Aplica ordenação (coluna, id) e o filtro de keyset a uma query
+
+    Args:
+        query: Query SQLAlchemy
+        column: Coluna de ordenação
+        id_column: Coluna de desempate (chave primária)
+        sort: Direção da ordenação (asc, desc)
+        cursor_value: Valor da coluna na última linha da página anterior
+        cursor_id: ID da última linha da página anterior
+
+    Returns:
+        Query: Query ordenada e filtrada a partir do cursor
+    """
+    if sort == 'asc':
+        if cursor_id is not None:
+            query = query.filter(or_(
+                column > cursor_value,
+                and_(column == cursor_value, id_column > cursor_id)
+            ))
+        return query.order_by(column.asc(), id_column.asc())
+
+    if cursor_id is not None:
+        query = query.filter(or_(
+            column < cursor_value,
+            and_(column == cursor_value, id_column < cursor_id)
+        ))
+    return query.order_by(column.desc(), id_column.desc())
@@ -0,0 +1,147 @@
+"""
+Estatísticas do pool de conexões do banco de dados
+
+Mede conexões em uso e ociosas, overflow, tempo de espera para obter uma
+conexão do pool e rotatividade (conexões abertas, fechadas e invalidadas),
+para dimensionar DB_POOL_SIZE/DB_MAX_OVERFLOW por worker a partir de dados.
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool que informa ao PoolMonitor o tempo de espera de cada checkout"""
+
+    monitor = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.monitor is not None:
+                self.monitor.record_timeout()
+            raise
+        finally:
+            if self.monitor is not None:
+                self.monitor.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() recria o pool; o monitor continua o mesmo
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class PoolMonitor:
+    """Contadores do pool de um engine, alimentados por eventos do SQLAlchemy"""
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: Engine SQLAlchemy a monitorar
+        """
+        self.engine = engine
+        self._lock = threading.Lock()
+
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+        if isinstance(engine.pool, MonitoredQueuePool):
+            engine.pool.monitor = self
+
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'close', self._on_close)
+        event.listen(engine, 'close_detached', self._on_close)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'soft_invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _on_close(self, dbapi_connection, *args):
+        with self._lock:
+            self.closes += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds):
+        """Registra o tempo de espera de um checkout"""
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def record_timeout(self):
+        """Registra um checkout que estourou DB_POOL_TIMEOUT"""
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self):
+        """
+        Retorna o estado atual do pool
+
+        Returns:
+            dict: Conexões em uso/ociosas, overflow, espera e rotatividade
+        """
+        pool = self.engine.pool
+        is_queue = isinstance(pool, QueuePool)
+
+        with self._lock:
+            return {
+                'pool_class': type(pool).__name__,
+                'size': pool.size() if is_queue else None,
+                'max_overflow': pool._max_overflow if is_queue else None,
+                'checked_out': self.checked_out,
+                'idle': pool.checkedin() if is_queue else None,
+                'overflow': max(pool.overflow(), 0) if is_queue else None,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+                'wait_seconds_avg': round(self.wait_seconds_total / self.waits, 6) if self.waits else 0.0,
+                'connects': self.connects,
+                'closes': self.closes,
+                'invalidations': self.invalidations
+            }
+
+
+def monitored_engine_options(options):
+    """
+    Acrescenta o MonitoredQueuePool às opções do engine quando o pool é de fila
+
+    Args:
+        options: SQLALCHEMY_ENGINE_OPTIONS (não é alterado)
+
+    Returns:
+        dict: Opções com poolclass definido (ou as mesmas opções)
+    """
+    options = dict(options or {})
+    if 'pool_size' in options and 'poolclass' not in options:
+        options['poolclass'] = MonitoredQueuePool
+    return options
@@ -0,0 +1,58 @@
+"""
+Preparação de cada worker de um servidor pre-fork (gunicorn)
+
+A aplicação é criada uma única vez no processo master (preload_app) e os
+workers herdam tudo por fork. O que não pode ser compartilhado entre processos
+é descartado em cada worker logo após o fork:
+
+    - conexões dos pools do banco (primário e réplicas): o socket herdado
+      seria usado por dois processos ao mesmo tempo;
+    - sessão HTTP do ViaCEP e consultas em andamento (single flight);
+    - alocador de números de pedido: um bloco reservado no master seria
+      distribuído em duplicidade, e o alocador "time" precisa de um
+      ORDER_NODE_ID diferente por worker.
+
+Caches (CEP e detalhe de pedidos) e métricas continuam por processo.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Extensões recriadas sob demanda em cada worker
+PER_PROCESS_EXTENSIONS = (
+    'viacep_client', 'viacep_async_client', 'cep_single_flight', 'cep_async_single_flight',
+    'order_number_allocator', 'db_replicas'
+)
+
+
+def init_worker(app, slot=0):
+    """
+    Prepara a aplicação herdada do master para rodar no worker atual
+
+    Args:
+        app: Instância do Flask criada no master
+        slot: Posição do worker (0 a workers-1, reaproveitada quando um worker é substituído)
+    """
+    from app.database import db
+
+    with app.app_context():
+        # close=False: as conexões herdadas pertencem ao master e não são encerradas aqui
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+        router = app.extensions.get('db_replicas')
+        if router is not None:
+            router.dispose(close=False)
+
+        client = app.extensions.get('viacep_client')
+        if client is not None:
+            client.close()
+
+        for name in PER_PROCESS_EXTENSIONS:
+            app.extensions.pop(name, None)
+
+    # Cada worker do servidor usa um nó distinto no alocador "time"
+    app.config['ORDER_NODE_ID'] = app.config.get('ORDER_NODE_ID', 0) + slot
+
+    logger.info(f"Worker {slot} pronto (pid {os.getpid()}, ORDER_NODE_ID={app.config['ORDER_NODE_ID']})")
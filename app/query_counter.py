@@ -0,0 +1,78 @@
+"""
+Contador de queries SQL (útil para verificar o número de queries por endpoint)
+"""
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Erro lançado quando um bloco executa mais queries do que o permitido"""
+
+
+class QueryCounter:
+    """
+    Context manager que registra as queries executadas em um engine
+
+    Exemplo:
+        with app.app_context():
+            engine = db.engine
+        with QueryCounter(engine) as counter:
+            client.get('/api/orders?include_details=true&limit=100')
+        counter.assert_at_most(3)
+    """
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: Engine SQLAlchemy a ser observado
+        """
+        self.engine = engine
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
+
+    @property
+    def count(self):
+        """Quantidade de queries executadas"""
+        return len(self.statements)
+
+    def assert_at_most(self, budget):
+        """
+        Verifica se o número de queries está dentro do limite
+
+        Args:
+            budget: Número máximo de queries permitido
+
+        Raises:
+            QueryBudgetExceeded: Se o limite for ultrapassado
+        """
+        if self.count > budget:
+            listing = '\n'.join(f"  {i + 1}. {statement}" for i, statement in enumerate(self.statements))
+            raise QueryBudgetExceeded(
+                f"{self.count} queries executadas (limite: {budget}):\n{listing}"
+            )
+
+    def assert_no_repeated(self, threshold=3):
+        """
+        Verifica se nenhuma query foi repetida (padrão N+1)
+
+        Args:
+            threshold: Repetições a partir das quais o formato é apontado
+
+        Raises:
+            QueryBudgetExceeded: Se algum formato de query se repetir
+        """
+        from app.sql_profiler import find_repeated
+
+        repeated = find_repeated(self.statements, threshold)
+        if repeated:
+            listing = '\n'.join(f"  {item['count']}x {item['statement']}" for item in repeated)
+            raise QueryBudgetExceeded(f"Queries repetidas (possível N+1):\n{listing}")
@@ -0,0 +1,341 @@
+"""
+Roteamento de leituras para réplicas do banco de dados
+
+Rotas marcadas com @use_read_replica executam suas consultas em uma réplica
+(DATABASE_REPLICA_URLS). Escritas, flushes e qualquer rota sem o decorator
+continuam no primário, assim como a resposta de create_order/update_order
+(leia-suas-escritas). Réplicas indisponíveis ou com atraso acima de
+REPLICA_MAX_LAG_SECONDS são ignoradas e a leitura volta para o primário.
+
+As verificações de saúde rodam em threads de fundo: a requisição nunca
+espera pela rede da verificação, apenas usa o último resultado conhecido
+(ou o primário, enquanto a primeira verificação de uma réplica não termina).
+
+A réplica é escolhida uma vez por requisição e usada em todas as leituras
+dela; se ficar indisponível no meio da requisição, as leituras seguintes
+vão para o primário.
+"""
+from functools import wraps
+import itertools
+import logging
+import threading
+import time
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, make_url, text
+
+from app.cache import TTLCache
+from app.pool_monitor import PoolMonitor, monitored_engine_options
+
+logger = logging.getLogger(__name__)
+
+
+def _mysql_lag(connection):
+    """Atraso de replicação no MySQL (SHOW REPLICA STATUS / SHOW SLAVE STATUS)"""
+    try:
+        row = connection.execute(text('SHOW REPLICA STATUS')).mappings().first()
+    except Exception:
+        row = connection.execute(text('SHOW SLAVE STATUS')).mappings().first()
+
+    if row is None:
+        return 0.0  # Não configurado como réplica (ex.: ambiente local)
+
+    lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+    return float('inf') if lag is None else float(lag)  # None: replicação parada
+
+
+def _postgresql_lag(connection):
+    """Atraso de replicação no PostgreSQL (0 quando todo o WAL recebido foi aplicado)"""
+    return float(connection.execute(text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )).scalar())
+
+
+def _no_lag(connection):
+    """Bancos sem replicação conhecida: só testa a conexão"""
+    connection.execute(text('SELECT 1'))
+    return 0.0
+
+
+LAG_PROBES = {
+    'mysql': _mysql_lag,
+    'mariadb': _mysql_lag,
+    'postgresql': _postgresql_lag
+}
+
+
+class Replica:
+    """Uma réplica de leitura com o último estado verificado"""
+
+    def __init__(self, url, engine_options=None):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url, **monitored_engine_options({
+            'pool_pre_ping': True,
+            **(engine_options or {}),
+            'execution_options': {'database': self.name}  # Rótulo das métricas de queries
+        }))
+        self.pool_monitor = PoolMonitor(self.engine)
+        self.healthy = False
+        self.lag = None
+        self.checked_at = None
+        self.error = None
+        self.probing = False
+
+        # Erros de conexão durante uma leitura tiram a réplica de uso até a próxima verificação
+        event.listen(self.engine, 'handle_error', self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            self.healthy = False
+            self.error = str(context.original_exception)
+            logger.warning(f"Réplica {self.name} desconectada, leituras voltam para o primário")
+
+    def check(self, max_lag):
+        """
+        Verifica conexão e atraso de replicação
+
+        Args:
+            max_lag: Atraso máximo aceito (segundos)
+
+        Returns:
+            bool: True se a réplica pode receber leituras
+        """
+        probe = LAG_PROBES.get(self.engine.dialect.name, _no_lag)
+        try:
+            with self.engine.connect() as connection:
+                self.lag = probe(connection)
+            self.error = None
+            self.healthy = self.lag <= max_lag
+            if not self.healthy:
+                logger.warning(f"Réplica {self.name} atrasada ({self.lag}s), leituras voltam para o primário")
+        except Exception as e:
+            self.healthy = False
+            self.lag = None
+            self.error = str(e)
+            logger.warning(f"Réplica {self.name} indisponível: {str(e)}")
+
+        self.checked_at = time.monotonic()
+        return self.healthy
+
+    def dispose(self, close=True):
+        """
+        Descarta as conexões do pool
+
+        Args:
+            close: Se False, apenas abandona as conexões (após fork, sem fechar as do processo pai)
+        """
+        self.engine.dispose(close=close)
+
+
+class ReplicaRouter:
+    """Escolhe a réplica das leituras (round-robin entre as saudáveis)"""
+
+    def __init__(self, urls, max_lag=5.0, check_interval=5.0, engine_options=None):
+        """
+        Args:
+            urls: URLs de conexão das réplicas
+            max_lag: Atraso máximo de replicação aceito (segundos)
+            check_interval: Intervalo entre verificações de cada réplica (segundos)
+            engine_options: Opções repassadas ao create_engine das réplicas
+        """
+        self.replicas = [Replica(url, engine_options) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+
+        # Chaves escritas neste processo há menos de max_lag segundos (leia-suas-escritas)
+        self._recent_writes = TTLCache(max_size=10000, ttl=max_lag)
+
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    def _ensure_checked(self, replica):
+        """
+        Indica se a réplica pode receber leituras, sem fazer I/O na requisição
+
+        Com a verificação expirada, dispara uma nova em uma thread de fundo e
+        usa o último resultado; resultados com mais de três intervalos (ex.:
+        verificação travada) e réplicas ainda não verificadas mandam a
+        leitura para o primário.
+        """
+        checked_at = replica.checked_at
+        age = None if checked_at is None else time.monotonic() - checked_at
+        if age is not None and age < self.check_interval:
+            return replica.healthy
+
+        self._start_probe(replica)
+        return age is not None and age < 3 * self.check_interval and replica.healthy
+
+    def _start_probe(self, replica):
+        """Inicia a verificação da réplica em uma thread de fundo (uma por réplica)"""
+        with self._lock:
+            if replica.probing:
+                return
+            replica.probing = True
+
+        def probe():
+            try:
+                replica.check(self.max_lag)
+            finally:
+                replica.probing = False
+
+        threading.Thread(target=probe, name=f"replica-check-{replica.name}", daemon=True).start()
+
+    def choose_replica(self):
+        """
+        Escolhe uma réplica saudável (round-robin)
+
+        Returns:
+            Replica: Réplica escolhida ou None para usar o primário
+        """
+        if self._cycle is None:
+            return None
+
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if self._ensure_checked(replica):
+                return replica
+        return None
+
+    def engine_for_read(self, replica):
+        """
+        Retorna o engine da réplica escolhida para a requisição
+
+        Args:
+            replica: Retorno de choose_replica()
+
+        Returns:
+            Engine: Engine da réplica ou None para usar o primário (sem
+                réplica ou réplica que deixou de estar saudável)
+        """
+        if replica is not None and self._ensure_checked(replica):
+            self.replica_reads += 1
+            return replica.engine
+
+        if self.replicas:
+            self.primary_fallbacks += 1
+        return None
+
+    def record_writes(self, keys):
+        """
+        Registra chaves recém-escritas, que devem ser lidas do primário
+
+        Args:
+            keys: Chaves escritas (ex.: IDs de pedidos)
+        """
+        if self.replicas:
+            for key in keys:
+                self._recent_writes.set(key, True)
+
+    def written_recently(self, key):
+        """Indica se a chave foi escrita há menos de max_lag segundos"""
+        return bool(self.replicas) and self._recent_writes.get(key) is not None
+
+    def dispose(self, close=True):
+        """Descarta as conexões de todas as réplicas (ver Replica.dispose)"""
+        for replica in self.replicas:
+            replica.dispose(close)
+
+    def stats(self):
+        """
+        Retorna o estado das réplicas
+
+        Returns:
+            dict: Réplicas configuradas, leituras roteadas e fallbacks
+        """
+        return {
+            'replicas': [{
+                'name': replica.name,
+                'healthy': replica.healthy,
+                'lag_seconds': replica.lag,
+                'error': replica.error,
+                'pool': replica.pool_monitor.stats()
+            } for replica in self.replicas],
+            'max_lag_seconds': self.max_lag,
+            'replica_reads': self.replica_reads,
+            'primary_fallbacks': self.primary_fallbacks
+        }
+
+
+def get_replica_router():
+    """
+    Retorna o roteador de réplicas da aplicação atual (criado sob demanda)
+
+    Returns:
+        ReplicaRouter: Roteador (sem réplicas se DATABASE_REPLICA_URLS estiver vazio)
+    """
+    router = current_app.extensions.get('db_replicas')
+    if router is None:
+        config = current_app.config
+        router = current_app.extensions.setdefault('db_replicas', ReplicaRouter(
+            config.get('SQLALCHEMY_REPLICA_URIS', []),
+            max_lag=config.get('REPLICA_MAX_LAG_SECONDS', 5.0),
+            check_interval=config.get('REPLICA_CHECK_INTERVAL', 5.0),
+            engine_options=config.get('SQLALCHEMY_ENGINE_OPTIONS')
+        ))
+        if config.get('METRICS_ENABLED', True):
+            from app.metrics import instrument_engine
+
+            for replica in router.replicas:
+                instrument_engine(replica.engine)
+        if config.get('SQL_PROFILER_ENABLED', False):
+            from app.sql_profiler import instrument_engine as profile_engine
+
+            for replica in router.replicas:
+                profile_engine(replica.engine)
+    return router
+
+
+def use_read_replica(view):
+    """
+    Decorator: as consultas da rota vão para uma réplica de leitura
+
+    Vale para todo o contexto da requisição, inclusive respostas em streaming
+    (stream_with_context).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def use_primary():
+    """Faz as próximas consultas da requisição atual voltarem para o primário"""
+    g.use_read_replica = False
+
+
+def read_from_replica():
+    """Indica se alguma consulta da requisição atual foi feita em uma réplica"""
+    return g.get('read_from_replica', False)
+
+
+class RoutingSession(Session):
+    """Sessão que envia leituras para a réplica quando a rota pede (@use_read_replica)"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_app_context()
+            and g.get('use_read_replica')
+        ):
+            router = get_replica_router()
+            # Uma réplica por requisição: réplicas com atrasos diferentes
+            # devolveriam partes da resposta em pontos distintos da replicação
+            if 'read_replica' not in g:
+                g.read_replica = router.choose_replica()
+
+            engine = router.engine_for_read(g.read_replica)
+            if engine is not None:
+                # Resultados lidos de réplica não vão para caches (podem estar atrasados)
+                g.read_from_replica = True
+                return engine
+
+            # Réplica indisponível: o restante da requisição fica no primário
+            g.read_replica = None
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
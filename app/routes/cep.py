@@ -1,9 +1,10 @@
 """
 Rotas para validação de CEP
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.services.viacep_service import ViaCEPService
 from app.services.shipping_service import ShippingService
+from marshmallow import Schema, fields, ValidationError, validate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,58 @@ logger = logging.getLogger(__name__)
 cep_bp = Blueprint('cep', __name__, url_prefix='/api/cep')
 
 
+class BatchCEPSchema(Schema):
+    """Schema para validação de CEPs em lote"""
+    ceps = fields.List(fields.Str(), required=True, validate=validate.Length(min=1))
+    calculate_shipping = fields.Bool(required=False, load_default=False)
+
+
+batch_cep_schema = BatchCEPSchema()
+
+
+class ShippingQuoteItemSchema(Schema):
+    """Schema de um par (CEP, total do carrinho) a cotar"""
+    cep = fields.Str(required=True)
+    cart_total = fields.Float(required=True, validate=validate.Range(min=0))
+
+
+class ShippingQuoteSchema(Schema):
+    """Schema para cotação de frete de vários carrinhos"""
+    quotes = fields.List(fields.Nested(ShippingQuoteItemSchema), required=True, validate=validate.Length(min=1))
+
+
+shipping_quote_schema = ShippingQuoteSchema()
+
+
+def _build_cep_response(result, calculate_shipping=False):
+    """
+    Monta a resposta de validação de um CEP
+
+    Args:
+        result: Retorno de ViaCEPService.validate_and_get_address
+        calculate_shipping: Se True, inclui frete e prazo estimado
+
+    Returns:
+        dict: Dados do endereço (com frete opcional) ou erro
+    """
+    if not result.get('valid'):
+        return {
+            'error': result.get('error', 'CEP inválido'),
+            'valid': False
+        }
+
+    response_data = result.copy()
+
+    if calculate_shipping and result.get('state'):
+        shipping_info = ShippingService.calculate_shipping(result['state'], cep=result.get('cep'))
+        response_data['shipping'] = shipping_info
+        response_data['estimated_delivery_days'] = ShippingService.get_shipping_estimate_days(
+            result['state'], cep=result.get('cep')
+        )
+
+    return response_data
+
+
 @cep_bp.route('/<cep>', methods=['GET'])
 def validate_cep(cep):
     """
@@ -29,21 +82,13 @@ def validate_cep(cep):
         # Validar e buscar dados do CEP
         result = ViaCEPService.validate_and_get_address(cep)
 
-        if not result.get('valid'):
-            return jsonify({
-                'error': result.get('error', 'CEP inválido'),
-                'valid': False
-            }), 400
-
         # Calcular frete (opcional, enviado como query param)
         calculate_shipping = request.args.get('calculate_shipping', 'false').lower() == 'true'
 
-        response_data = result.copy()
+        response_data = _build_cep_response(result, calculate_shipping)
 
-        if calculate_shipping and result.get('state'):
-            shipping_info = ShippingService.calculate_shipping(result['state'])
-            response_data['shipping'] = shipping_info
-            response_data['estimated_delivery_days'] = ShippingService.get_shipping_estimate_days(result['state'])
+        if not response_data['valid']:
+            return jsonify(response_data), 400
 
         return jsonify(response_data), 200
 
@@ -55,39 +100,203 @@ def validate_cep(cep):
         }), 500
 
 
-@cep_bp.route('/shipping/<state>', methods=['GET'])
-def get_shipping_rate(state):
+@cep_bp.route('/batch', methods=['POST'])
+def validate_cep_batch():
+    """
+    Valida vários CEPs em uma única requisição
+
+    Body JSON:
+    {
+        "ceps": ["01310100", "01310-100", "20040020"],
+        "calculate_shipping": true
+    }
+
+    Returns:
+        200: Resultado por CEP (mesmo formato de GET /api/cep/<cep>)
+        400: Dados inválidos
+        500: Erro interno
+    """
+    try:
+        data = request.get_json()
+        validated_data = batch_cep_schema.load(data)
+
+        ceps = validated_data['ceps']
+        max_size = current_app.config.get('CEP_BATCH_MAX_SIZE', 500)
+        if len(ceps) > max_size:
+            return jsonify({
+                'error': 'Dados inválidos',
+                'details': {'ceps': [f'Máximo de {max_size} CEPs por requisição.']}
+            }), 400
+
+        logger.info(f"Requisição para validar {len(ceps)} CEPs em lote")
+
+        results = ViaCEPService.validate_many(ceps)
+        response_data = {
+            cep: _build_cep_response(result, validated_data['calculate_shipping'])
+            for cep, result in results.items()
+        }
+
+        return jsonify({
+            'results': response_data,
+            'total': len(response_data),
+            'valid': sum(1 for result in response_data.values() if result['valid'])
+        }), 200
+
+    except ValidationError as e:
+        logger.warning(f"Dados inválidos na validação de CEPs em lote: {e.messages}")
+        return jsonify({
+            'error': 'Dados inválidos',
+            'details': e.messages
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Erro ao validar CEPs em lote: {str(e)}")
+        return jsonify({
+            'error': 'Erro interno ao processar CEPs'
+        }), 500
+
+
+@cep_bp.route('/cache/stats', methods=['GET'])
+def get_cep_cache_stats():
     """
-    Busca o valor do frete para um estado específico
+    Retorna as estatísticas do cache de CEPs do processo atual
+
+    Returns:
+        JSON com acertos, falhas, despejos, tamanho do cache e consultas coalescidas
+    """
+    try:
+        stats = ViaCEPService.get_cache().stats()
+        stats['single_flight'] = ViaCEPService.get_single_flight().stats()
+        return jsonify(stats), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar estatísticas do cache de CEP: {str(e)}")
+        return jsonify({
+            'error': 'Erro ao buscar estatísticas do cache'
+        }), 500
+
+
+@cep_bp.route('/shipping/<destination>', methods=['GET'])
+def get_shipping_rate(destination):
+    """
+    Busca o valor do frete para um estado (UF) ou CEP de destino
+
+    Um CEP é cotado pela tabela de faixas (SHIPPING_RATE_TABLE_PATH); sem
+    faixa para ele, vale o valor do estado informado em ?state=.
 
     Args:
-        state: Sigla do estado (UF)
+        destination: Sigla do estado (UF) ou CEP
 
     Query params:
         total_amount: Valor total do pedido (para calcular frete grátis)
+        state: UF do CEP (opcional, usada quando o CEP não está em nenhuma faixa)
 
     Returns:
         JSON com informações do frete
     """
     try:
-        logger.info(f"Requisição para calcular frete para estado: {state}")
+        logger.info(f"Requisição para calcular frete para destino: {destination}")
 
         # Obter valor total (opcional)
         total_amount = request.args.get('total_amount', 0, type=float)
 
+        clean_cep = ''.join(filter(str.isdigit, destination))
+        if clean_cep:
+            if len(clean_cep) != 8:
+                return jsonify({
+                    'error': 'CEP deve conter 8 dígitos'
+                }), 400
+            cep = ViaCEPService.format_cep(clean_cep)
+            state = request.args.get('state', '')
+        else:
+            cep = None
+            state = destination
+
         # Calcular frete
-        shipping_info = ShippingService.calculate_shipping(state, total_amount)
-        shipping_info['estimated_delivery_days'] = ShippingService.get_shipping_estimate_days(state)
+        shipping_info = ShippingService.calculate_shipping(state, total_amount, cep=cep)
+        shipping_info['estimated_delivery_days'] = ShippingService.get_shipping_estimate_days(state, cep=cep)
 
         return jsonify(shipping_info), 200
 
     except Exception as e:
-        logger.error(f"Erro ao calcular frete para {state}: {str(e)}")
+        logger.error(f"Erro ao calcular frete para {destination}: {str(e)}")
         return jsonify({
             'error': 'Erro ao calcular frete'
         }), 500
 
 
+@cep_bp.route('/shipping/quote', methods=['POST'])
+def quote_shipping():
+    """
+    Cota o frete de vários pares (CEP, total do carrinho) em uma única requisição
+
+    Body JSON:
+    {
+        "quotes": [
+            {"cep": "01310-100", "cart_total": 120.00},
+            {"cep": "01310100", "cart_total": 250.00},
+            {"cep": "69005-000", "cart_total": 80.00}
+        ]
+    }
+
+    Returns:
+        200: Cotações na ordem recebida
+        400: Dados inválidos
+        500: Erro interno
+    """
+    try:
+        data = request.get_json()
+        validated_data = shipping_quote_schema.load(data)
+
+        pairs = validated_data['quotes']
+        max_size = current_app.config.get('CEP_BATCH_MAX_SIZE', 500)
+        if len(pairs) > max_size:
+            return jsonify({
+                'error': 'Dados inválidos',
+                'details': {'quotes': [f'Máximo de {max_size} cotações por requisição.']}
+            }), 400
+
+        # Cada CEP distinto é validado uma única vez
+        results = ViaCEPService.validate_many([pair['cep'] for pair in pairs])
+
+        valid_pairs = [pair for pair in pairs if results[pair['cep']].get('valid')]
+        shipping = iter(ShippingService.calculate_shipping_many([
+            (results[pair['cep']]['state'], results[pair['cep']]['cep'], pair['cart_total'])
+            for pair in valid_pairs
+        ]))
+
+        quotes = []
+        for pair in pairs:
+            result = results[pair['cep']]
+            if result.get('valid'):
+                quotes.append({'cep': pair['cep'], 'cart_total': pair['cart_total'], 'valid': True,
+                               'shipping': next(shipping)})
+            else:
+                quotes.append({'cep': pair['cep'], 'cart_total': pair['cart_total'], 'valid': False,
+                               'error': result.get('error', 'CEP inválido')})
+
+        logger.info(f"Frete cotado para {len(pairs)} carrinhos ({len(valid_pairs)} com CEP válido)")
+
+        return jsonify({
+            'quotes': quotes,
+            'total': len(quotes),
+            'valid': len(valid_pairs)
+        }), 200
+
+    except ValidationError as e:
+        logger.warning(f"Dados inválidos na cotação de frete: {e.messages}")
+        return jsonify({
+            'error': 'Dados inválidos',
+            'details': e.messages
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Erro ao cotar frete: {str(e)}")
+        return jsonify({
+            'error': 'Erro ao cotar frete'
+        }), 500
+
+
 @cep_bp.route('/shipping/rates', methods=['GET'])
 def get_all_shipping_rates():
     """
@@ -2,14 +2,26 @@
 Rotas para gerenciamento de pedidos (Orders)
 CRUD completo: POST, GET, PUT, DELETE
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 from app.database import db
+from app.pagination import encode_cursor, decode_cursor, apply_keyset, InvalidCursorError
 from app.models.order import Order
 from app.models.address import Address
 from app.models.order_item import OrderItem
 from app.services.viacep_service import ViaCEPService
 from app.services.shipping_service import ShippingService
+from app.services.order_ingestion_service import OrderIngestionService
+from app.services.order_export_service import OrderExportService
+from app.services.order_cache_service import OrderCacheService, OrderDetailCache
+from app.services.address_enrichment_service import AddressEnrichmentService
+from app.services.outbox_service import OutboxService
+from app.services.order_stats_service import OrderStatsService, DIMENSIONS
+from app.fast_validation import load_create_order
+from app.replicas import use_read_replica, use_primary, read_from_replica, get_replica_router
+from app.sql_profiler import query_budget, extend_query_budget
+from app.asgi import CEP_LOOKUP_ENVIRON_KEY
 from marshmallow import Schema, fields, ValidationError, validate
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,6 +56,11 @@ class CreateOrderSchema(Schema):
     items = fields.List(fields.Nested(OrderItemSchema), required=True, validate=validate.Length(min=1))
 
 
+class BulkCreateOrderSchema(Schema):
+    """Schema para validação do envelope de criação de pedidos em lote"""
+    orders = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
+
+
 class UpdateOrderSchema(Schema):
     """Schema para validação de atualização de pedido"""
     customer_name = fields.Str(required=False, validate=validate.Length(min=3, max=100))
@@ -54,10 +71,66 @@ class UpdateOrderSchema(Schema):
 
 # Instanciar schemas
 create_order_schema = CreateOrderSchema()
+bulk_create_order_schema = BulkCreateOrderSchema()
 update_order_schema = UpdateOrderSchema()
 
 
+def _get_order_with_details(order_id, lock=False):
+    """
+    Busca um pedido com endereço e itens carregados antecipadamente
+
+    Args:
+        order_id: ID do pedido
+        lock: Se True, trava a linha do pedido até o fim da transação
+            (SELECT ... FOR UPDATE), para alterações que partem do estado lido
+
+    Returns:
+        Order: Pedido ou None se não encontrado
+    """
+    query = Order.query.options(*Order.detail_load_options()).filter_by(id=order_id)
+    if lock:
+        query = query.with_for_update(of=Order)
+    return query.first()
+
+
+def load_order_payload(data):
+    """
+    Valida o payload de criação de pedido com o backend de ORDER_VALIDATION_BACKEND
+
+    Também usado pelo gateway ASGI, que valida antes de consultar o ViaCEP.
+
+    Args:
+        data: Payload JSON do pedido
+
+    Returns:
+        dict: Dados validados
+
+    Raises:
+        ValidationError: Se os dados forem inválidos (mesmas mensagens nos dois backends)
+    """
+    if current_app.config.get('ORDER_VALIDATION_BACKEND') == 'fast':
+        return load_create_order(data)
+    return create_order_schema.load(data)
+
+
+def _resolve_order_cep(cep):
+    """
+    Valida o CEP do pedido, reaproveitando a consulta já feita pelo gateway ASGI
+
+    Args:
+        cep: CEP informado no pedido
+
+    Returns:
+        dict: Resultado de ViaCEPService.validate_and_get_address
+    """
+    resolved = request.environ.get(CEP_LOOKUP_ENVIRON_KEY)
+    if resolved is not None and resolved[0] == cep:
+        return resolved[1]
+    return ViaCEPService.validate_and_get_address(cep)
+
+
 @orders_bp.route('', methods=['POST'])
+@query_budget(13)
 def create_order():
     """
     POST /api/orders - Criar novo pedido
@@ -85,19 +158,28 @@ def create_order():
 
     Returns:
         201: Pedido criado com sucesso
+        202: Pedido gravado com endereço em validação (ORDER_ADDRESS_VALIDATION=deferred)
         400: Dados inválidos
         500: Erro interno
     """
     try:
         # Validar dados de entrada
         data = request.get_json()
-        validated_data = create_order_schema.load(data)
+        validated_data = load_order_payload(data)
 
-        # Validar CEP via ViaCEP
+        # Validar CEP via ViaCEP (já consultado no event loop quando servido pelo gateway ASGI).
+        # Com validação adiada, apenas o que dispensa a rede (formato, diretório e cache)
         cep_data = validated_data['address']['cep']
-        cep_result = ViaCEPService.validate_and_get_address(cep_data)
+        if AddressEnrichmentService.is_deferred():
+            cep_result = ViaCEPService.validate_locally(cep_data)
+        else:
+            cep_result = _resolve_order_cep(cep_data)
 
-        if not cep_result.get('valid'):
+        # CEP ainda não consultado: o endereço é preenchido pelo worker da outbox
+        deferred = cep_result is None
+        if deferred:
+            cep_result = {'cep': ViaCEPService.format_cep(cep_data), 'street': '', 'neighborhood': '', 'city': '', 'state': ''}
+        elif not cep_result.get('valid'):
             return jsonify({
                 'error': 'CEP inválido',
                 'details': cep_result.get('error')
@@ -134,18 +216,38 @@ def create_order():
             item.calculate_total()
             order.items.append(item)
 
-        # Calcular frete
-        items_total = sum(float(item.total_price) for item in order.items)
-        shipping_info = ShippingService.calculate_shipping(cep_result['state'], items_total)
-        order.shipping_cost = shipping_info['final_cost']
+        # O ORM grava um INSERT por item
+        extend_query_budget(len(order.items))
+
+        # Calcular frete (com validação adiada, o worker calcula depois)
+        if deferred:
+            order.shipping_cost = 0
+        else:
+            items_total = sum(float(item.total_price) for item in order.items)
+            shipping_info = ShippingService.calculate_shipping(cep_result['state'], items_total, cep=cep_result['cep'])
+            order.shipping_cost = shipping_info['final_cost']
 
         # Calcular total
         order.calculate_total()
 
-        # Salvar no banco de dados
+        # Salvar no banco de dados (pedido, tarefa da outbox e resumo na mesma transação)
         db.session.add(order)
+        if deferred:
+            AddressEnrichmentService.enqueue(order, cep_data)
+        db.session.flush()
+        OrderStatsService.add(order)
         db.session.commit()
 
+        # Recarregar com endereço e itens em número fixo de queries
+        order = _get_order_with_details(order.id)
+
+        if deferred:
+            logger.info(f"Pedido recebido, endereço em validação: {order.order_number}")
+            return jsonify({
+                'message': 'Pedido recebido; endereço em validação',
+                'order': order.to_dict(include_details=True)
+            }), 202
+
         logger.info(f"Pedido criado com sucesso: {order.order_number}")
 
         return jsonify({
@@ -168,7 +270,79 @@ def create_order():
         }), 500
 
 
+@orders_bp.route('/bulk', methods=['POST'])
+@query_budget(allow_repeated=True)
+def create_orders_bulk():
+    """
+    POST /api/orders/bulk - Criar vários pedidos em uma requisição
+
+    Body JSON:
+    {
+        "orders": [
+            { ...mesmo formato de POST /api/orders... },
+            ...
+        ]
+    }
+
+    Returns:
+        200: Resultado por pedido (sucesso ou erro), na ordem enviada
+        400: Dados inválidos
+        500: Erro interno
+    """
+    try:
+        data = request.get_json()
+        payloads = bulk_create_order_schema.load(data)['orders']
+
+        max_size = current_app.config.get('ORDERS_BULK_MAX_SIZE', 1000)
+        if len(payloads) > max_size:
+            return jsonify({
+                'error': 'Dados inválidos',
+                'details': {'orders': [f'Máximo de {max_size} pedidos por requisição.']}
+            }), 400
+
+        # Validar cada pedido individualmente
+        results = {}
+        valid_orders = []
+        for index, payload in enumerate(payloads):
+            try:
+                valid_orders.append((index, load_order_payload(payload)))
+            except ValidationError as e:
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'error': 'Dados inválidos',
+                    'details': e.messages
+                }
+
+        results.update(OrderIngestionService.ingest(valid_orders))
+
+        created = sum(1 for result in results.values() if result['success'])
+        logger.info(f"Pedidos em lote: {created} criados, {len(payloads) - created} com erro")
+
+        return jsonify({
+            'results': [results[index] for index in range(len(payloads))],
+            'created': created,
+            'failed': len(payloads) - created
+        }), 200
+
+    except ValidationError as e:
+        logger.warning(f"Dados inválidos na criação de pedidos em lote: {e.messages}")
+        return jsonify({
+            'error': 'Dados inválidos',
+            'details': e.messages
+        }), 400
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erro ao criar pedidos em lote: {str(e)}")
+        return jsonify({
+            'error': 'Erro interno ao criar pedidos'
+        }), 500
+
+
 @orders_bp.route('', methods=['GET'])
+@use_read_replica
+@query_budget(3)
 def get_orders():
     """
     GET /api/orders - Listar todos os pedidos
@@ -176,12 +350,16 @@ def get_orders():
     Query params:
         - status: Filtrar por status (ex: pending, confirmed)
         - limit: Número máximo de resultados (padrão: 10)
-        - offset: Número de registros a pular (paginação)
+        - cursor: Cursor da próxima página (retornado em next_cursor)
+        - offset: Número de registros a pular (ignorado quando há cursor)
         - order_by: Campo para ordenação (created_at, total_amount)
         - sort: Direção da ordenação (asc, desc)
+        - include_total: Se true, inclui a contagem total de pedidos
+        - include_details: Se true, inclui endereço e itens de cada pedido
 
     Returns:
         200: Lista de pedidos
+        400: Cursor inválido
         500: Erro interno
     """
     try:
@@ -189,11 +367,21 @@ def get_orders():
         status = request.args.get('status')
         limit = request.args.get('limit', 10, type=int)
         offset = request.args.get('offset', 0, type=int)
+        cursor = request.args.get('cursor')
         order_by = request.args.get('order_by', 'created_at')
         sort = request.args.get('sort', 'desc')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        include_details = request.args.get('include_details', 'false').lower() == 'true'
+
+        # Limitar o limite ao intervalo 1-100 e o offset a valores não negativos
+        limit = min(max(limit, 1), 100)
+        offset = max(offset, 0)
 
-        # Limitar o limite máximo
-        limit = min(limit, 100)
+        # Normalizar ordenação
+        if order_by != 'total_amount':
+            order_by = 'created_at'
+        if sort != 'asc':
+            sort = 'desc'
 
         # Construir query
         query = Order.query
@@ -202,30 +390,55 @@ def get_orders():
         if status:
             query = query.filter_by(status=status)
 
-        # Ordenação
-        if order_by == 'total_amount':
-            order_column = Order.total_amount
-        else:
-            order_column = Order.created_at
+        # Contagem total (opcional, custa uma varredura do filtro)
+        total_count = query.count() if include_total else None
+
+        # Ordenação por (coluna, id) e paginação por cursor ou offset
+        order_column = getattr(Order, order_by)
 
-        if sort == 'asc':
-            query = query.order_by(order_column.asc())
+        if cursor:
+            cursor_value, cursor_id = decode_cursor(cursor, order_by, sort)
+            query = apply_keyset(query, order_column, Order.id, sort, cursor_value, cursor_id)
         else:
-            query = query.order_by(order_column.desc())
+            query = apply_keyset(query, order_column, Order.id, sort)
+            if offset:
+                query = query.offset(offset)
+
+        # Carregar endereço e itens antecipadamente (evita N+1)
+        if include_details:
+            query = query.options(*Order.detail_load_options())
 
-        # Paginação
-        total_count = query.count()
-        orders = query.offset(offset).limit(limit).all()
+        # Buscar um registro a mais para saber se existe próxima página
+        orders = query.limit(limit + 1).all()
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+
+        next_cursor = None
+        if has_more and orders:
+            last = orders[-1]
+            next_cursor = encode_cursor(getattr(last, order_by), last.id, order_by, sort)
 
         # Serializar pedidos
-        orders_data = [order.to_dict(include_details=False) for order in orders]
+        orders_data = [order.to_dict(include_details=include_details) for order in orders]
 
-        return jsonify({
+        response_data = {
             'orders': orders_data,
-            'total': total_count,
             'limit': limit,
-            'offset': offset
-        }), 200
+            'offset': 0 if cursor else offset,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }
+        if include_total:
+            response_data['total'] = total_count
+
+        return jsonify(response_data), 200
+
+    except InvalidCursorError as e:
+        logger.warning(f"Cursor inválido na listagem de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Cursor inválido',
+            'details': str(e)
+        }), 400
 
     except Exception as e:
         logger.error(f"Erro ao listar pedidos: {str(e)}")
@@ -234,30 +447,354 @@ def get_orders():
         }), 500
 
 
+@orders_bp.route('/history', methods=['GET'])
+@use_read_replica
+@query_budget(3)
+def get_customer_history():
+    """
+    GET /api/orders/history - Histórico de pedidos de um cliente
+
+    Informe exatamente um dos filtros:
+        - email: E-mail do cliente (pedidos do mais recente ao mais antigo,
+          índice (customer_email, created_at, id))
+        - name: Início do nome do cliente, mínimo 3 caracteres (pedidos em
+          ordem de nome, índice (customer_name, id))
+
+    As páginas são buscadas por cursor no próprio índice, então o tempo de
+    cada página não depende do tamanho da tabela.
+
+    Query params:
+        - email ou name
+        - limit: Número máximo de resultados (padrão: 10)
+        - cursor: Cursor da próxima página (retornado em next_cursor)
+        - include_details: Se true, inclui endereço e itens de cada pedido
+
+    Returns:
+        200: Lista de pedidos
+        400: Filtro ausente ou inválido, ou cursor inválido
+        500: Erro interno
+    """
+    try:
+        email = (request.args.get('email') or '').strip()
+        name = (request.args.get('name') or '').strip()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        cursor = request.args.get('cursor')
+        include_details = request.args.get('include_details', 'false').lower() == 'true'
+
+        if bool(email) == bool(name):
+            return jsonify({
+                'error': 'Informe email ou name (apenas um)'
+            }), 400
+
+        if email:
+            query = Order.query.filter(Order.customer_email == email)
+            order_by, sort = 'created_at', 'desc'
+        else:
+            if len(name) < 3:
+                return jsonify({
+                    'error': 'name deve ter ao menos 3 caracteres'
+                }), 400
+            # Prefixo literal (% e _ do texto não são curingas) para usar o índice
+            prefix = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = Order.query.filter(Order.customer_name.like(f"{prefix}%", escape='\\'))
+            order_by, sort = 'customer_name', 'asc'
+
+        order_column = getattr(Order, order_by)
+        if cursor:
+            cursor_value, cursor_id = decode_cursor(cursor, order_by, sort)
+            query = apply_keyset(query, order_column, Order.id, sort, cursor_value, cursor_id)
+        else:
+            query = apply_keyset(query, order_column, Order.id, sort)
+
+        if include_details:
+            query = query.options(*Order.detail_load_options())
+
+        # Buscar um registro a mais para saber se existe próxima página
+        orders = query.limit(limit + 1).all()
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+
+        next_cursor = None
+        if has_more and orders:
+            last = orders[-1]
+            next_cursor = encode_cursor(getattr(last, order_by), last.id, order_by, sort)
+
+        return jsonify({
+            'orders': [order.to_dict(include_details=include_details) for order in orders],
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        }), 200
+
+    except InvalidCursorError as e:
+        logger.warning(f"Cursor inválido no histórico de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Cursor inválido',
+            'details': str(e)
+        }), 400
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar histórico de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Erro interno ao buscar histórico de pedidos'
+        }), 500
+
+
+@orders_bp.route('/export', methods=['GET'])
+@use_read_replica
+def export_orders():
+    """
+    GET /api/orders/export - Exportar pedidos em streaming
+
+    Query params:
+        - format: Formato do arquivo (ndjson, csv) (padrão: ndjson)
+        - start: Data inicial de criação (YYYY-MM-DD ou ISO 8601, inclusiva)
+        - end: Data final de criação (YYYY-MM-DD inclusiva ou ISO 8601 exclusiva)
+        - status: Filtrar por status
+        - include_details: Se true, inclui endereço e itens
+        - gzip: Se true, comprime o arquivo (application/gzip)
+
+    Returns:
+        200: Arquivo em streaming
+        400: Parâmetros inválidos
+        500: Erro interno
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        status = request.args.get('status')
+        include_details = request.args.get('include_details', 'false').lower() == 'true'
+        gzip = request.args.get('gzip', 'false').lower() == 'true'
+
+        if export_format not in OrderExportService.FORMATS:
+            return jsonify({
+                'error': 'Formato inválido',
+                'details': f"Formatos suportados: {', '.join(OrderExportService.FORMATS)}"
+            }), 400
+
+        try:
+            start = OrderExportService.parse_date(request.args.get('start'))
+            end = OrderExportService.parse_date(request.args.get('end'), end=True)
+        except ValueError:
+            return jsonify({
+                'error': 'Data inválida',
+                'details': 'Use o formato YYYY-MM-DD ou ISO 8601'
+            }), 400
+
+        logger.info(f"Exportação de pedidos iniciada: formato={export_format}, início={start}, fim={end}")
+
+        query = OrderExportService.build_query(start, end, status, include_details)
+        orders = OrderExportService.iter_orders(
+            query,
+            batch_size=current_app.config.get('ORDERS_EXPORT_BATCH_SIZE', 1000)
+        )
+        body = OrderExportService.stream(orders, export_format, include_details, gzip)
+
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        filename = f"orders.{export_format}"
+        if gzip:
+            mimetype = 'application/gzip'
+            filename += '.gz'
+
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    except Exception as e:
+        logger.error(f"Erro ao exportar pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Erro interno ao exportar pedidos'
+        }), 500
+
+
+@orders_bp.route('/cache/stats', methods=['GET'])
+def get_order_cache_stats():
+    """
+    GET /api/orders/cache/stats - Estatísticas do cache de detalhe de pedidos
+
+    Returns:
+        200: Acertos, falhas, invalidações e respostas 304 do processo atual
+        500: Erro interno
+    """
+    try:
+        cache = OrderCacheService.get_cache()
+        if cache is None:
+            return jsonify({'enabled': False}), 200
+
+        return jsonify({'enabled': True, **cache.stats()}), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar estatísticas do cache de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Erro ao buscar estatísticas do cache'
+        }), 500
+
+
+@orders_bp.route('/outbox/stats', methods=['GET'])
+def get_outbox_stats():
+    """
+    GET /api/orders/outbox/stats - Fila de tarefas em segundo plano (outbox)
+
+    Returns:
+        200: Tarefas pendentes e com falha e idade da pendente mais antiga, por tipo
+        500: Erro interno
+    """
+    try:
+        return jsonify(OutboxService.stats()), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar estatísticas da outbox: {str(e)}")
+        return jsonify({
+            'error': 'Erro ao buscar estatísticas da outbox'
+        }), 500
+
+
+@orders_bp.route('/stats', methods=['GET'])
+@use_read_replica
+@query_budget(2)
+def get_order_stats():
+    """
+    GET /api/orders/stats - Pedidos, itens, receita e frete agregados
+
+    Lê a tabela de resumo order_daily_stats (mantida a cada criação, mudança
+    de status e remoção de pedido), sem varrer orders e order_items.
+
+    Query params:
+        - start: Primeiro dia, YYYY-MM-DD (UTC, inclusivo)
+        - end: Último dia, YYYY-MM-DD (UTC, inclusivo)
+        - status: Filtrar por status
+        - state: Filtrar por estado (UF)
+        - group_by: Dimensões separadas por vírgula: day, status, state (padrão: day; vazio = só totais)
+
+    Returns:
+        200: Totais e grupos
+        400: Parâmetros inválidos
+        500: Erro interno
+    """
+    try:
+        try:
+            start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+            end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        except ValueError:
+            return jsonify({
+                'error': 'Datas devem estar no formato YYYY-MM-DD'
+            }), 400
+
+        group_by = list(dict.fromkeys(
+            dimension.strip() for dimension in request.args.get('group_by', 'day').split(',') if dimension.strip()
+        ))
+        invalid = [dimension for dimension in group_by if dimension not in DIMENSIONS]
+        if invalid:
+            return jsonify({
+                'error': f"group_by inválido: {', '.join(invalid)} (use {', '.join(DIMENSIONS)})"
+            }), 400
+
+        stats = OrderStatsService.query(
+            start=start,
+            end=end,
+            status=request.args.get('status'),
+            state=request.args.get('state'),
+            group_by=group_by
+        )
+
+        return jsonify({
+            **stats,
+            'filters': {
+                'start': start.isoformat() if start else None,
+                'end': end.isoformat() if end else None,
+                'status': request.args.get('status'),
+                'state': request.args.get('state'),
+                'group_by': group_by
+            }
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Erro ao buscar estatísticas de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Erro ao buscar estatísticas de pedidos'
+        }), 500
+
+
 @orders_bp.route('/<int:order_id>', methods=['GET'])
+@use_read_replica
+@query_budget(3)
 def get_order(order_id):
     """
     GET /api/orders/<id> - Buscar pedido específico
 
+    A resposta traz um ETag forte derivado de updated_at. Acertos do cache
+    conferidos há menos de ORDER_CACHE_REVALIDATE_SECONDS (e If-None-Match
+    igual ao ETag dessas entradas, com 304 sem corpo) não consultam o banco;
+    fora dessa janela, a versão é conferida com uma query pela chave primária.
+
     Args:
         order_id: ID do pedido
 
     Returns:
         200: Dados do pedido
+        304: Pedido não modificado
         404: Pedido não encontrado
         500: Erro interno
     """
     try:
-        order = Order.query.get(order_id)
+        # Pedido alterado há pouco neste processo: ler do primário (leia-suas-escritas)
+        if get_replica_router().written_recently(order_id):
+            use_primary()
+
+        cache = OrderCacheService.get_cache()
+        cached = OrderCacheService.get_entry(cache, order_id) if cache is not None else None
+
+        if cached is not None:
+            _, etag, body = cached
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                cache.record_not_modified()
+                return response
+
+            response = Response(body, status=200, mimetype='application/json')
+            response.set_etag(etag)
+            return response
+
+        # Sem entrada no cache, If-None-Match só precisa da versão atual
+        if request.if_none_match:
+            version = OrderCacheService.current_version(order_id)
+            if version is None:
+                return jsonify({
+                    'error': 'Pedido não encontrado'
+                }), 404
+
+            etag = OrderDetailCache.compute_etag(order_id, version)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                if cache is not None:
+                    cache.record_not_modified()
+                return response
+
+        order = _get_order_with_details(order_id)
 
         if not order:
             return jsonify({
                 'error': 'Pedido não encontrado'
             }), 404
 
-        return jsonify({
+        response = jsonify({
             'order': order.to_dict(include_details=True)
-        }), 200
+        })
+        if cache is not None and not read_from_replica():
+            etag = cache.put(order_id, order.updated_at, response.get_data())
+        else:
+            etag = OrderDetailCache.compute_etag(order_id, order.updated_at)
+
+        response.set_etag(etag)
+        response.make_conditional(request)
+
+        if response.status_code == 304 and cache is not None:
+            cache.record_not_modified()
+
+        return response
 
     except Exception as e:
         logger.error(f"Erro ao buscar pedido {order_id}: {str(e)}")
@@ -267,6 +804,7 @@ def get_order(order_id):
 
 
 @orders_bp.route('/<int:order_id>', methods=['PUT'])
+@query_budget(11)
 def update_order(order_id):
     """
     PUT /api/orders/<id> - Atualizar pedido
@@ -286,10 +824,12 @@ def update_order(order_id):
         200: Pedido atualizado
         400: Dados inválidos
         404: Pedido não encontrado
+        409: Mudança de status de pedido aguardando validação do endereço (só o cancelamento é aceito)
         500: Erro interno
     """
     try:
-        order = Order.query.get(order_id)
+        # Travado até o commit: o resumo é ajustado a partir do status lido aqui
+        order = _get_order_with_details(order_id, lock=True)
 
         if not order:
             return jsonify({
@@ -300,6 +840,9 @@ def update_order(order_id):
         data = request.get_json()
         validated_data = update_order_schema.load(data)
 
+        # Contribuição para o resumo antes da mudança de status
+        stats_before = OrderStatsService.snapshot(order)
+
         # Atualizar campos
         if 'customer_name' in validated_data:
             order.customer_name = validated_data['customer_name']
@@ -308,11 +851,21 @@ def update_order(order_id):
         if 'customer_phone' in validated_data:
             order.customer_phone = validated_data['customer_phone']
         if 'status' in validated_data:
+            if not AddressEnrichmentService.can_change_status(order, validated_data['status']):
+                db.session.rollback()
+                return jsonify({
+                    'error': 'Status não pode ser alterado',
+                    'details': f"Pedido com status {order.status} aguarda o worker de endereços; só pode ser cancelado"
+                }), 409
             order.status = validated_data['status']
+            OrderStatsService.replace(stats_before, order)
 
         # Salvar alterações
         db.session.commit()
 
+        # Recarregar com endereço e itens em número fixo de queries
+        order = _get_order_with_details(order_id)
+
         logger.info(f"Pedido {order.order_number} atualizado com sucesso")
 
         return jsonify({
@@ -336,6 +889,7 @@ def update_order(order_id):
 
 
 @orders_bp.route('/<int:order_id>', methods=['DELETE'])
+@query_budget(10)
 def delete_order(order_id):
     """
     DELETE /api/orders/<id> - Deletar pedido
@@ -349,7 +903,8 @@ def delete_order(order_id):
         500: Erro interno
     """
     try:
-        order = Order.query.get(order_id)
+        # Travado até o commit: o resumo é ajustado a partir do estado lido aqui
+        order = _get_order_with_details(order_id, lock=True)
 
         if not order:
             return jsonify({
@@ -358,7 +913,8 @@ def delete_order(order_id):
 
         order_number = order.order_number
 
-        # Deletar pedido (cascade vai deletar endereço e itens)
+        # Deletar pedido (cascade vai deletar endereço e itens) e retirá-lo do resumo
+        OrderStatsService.remove(order)
         db.session.delete(order)
         db.session.commit()
 
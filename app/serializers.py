@@ -0,0 +1,61 @@
+"""
+Serializadores pré-compilados dos models
+
+Em vez de montar o dicionário atributo por atributo a cada chamada, o código
+de conversão de cada model é gerado uma única vez a partir dos tipos das
+colunas (Numeric -> float, DateTime -> isoformat) e compilado em uma função.
+"""
+from sqlalchemy import DateTime, Numeric
+
+
+def _field_expression(column, value):
+    """Expressão Python que converte o valor de uma coluna"""
+    if isinstance(column.type, Numeric):
+        return f"(None if (value := {value}) is None else _float(value))"
+    if isinstance(column.type, DateTime):
+        return f"(value.isoformat() if (value := {value}) else None)"
+    return value
+
+
+def compile_serializer(model, fields):
+    """
+    Gera a função de serialização de um model
+
+    A função lê os valores direto do __dict__ da instância (sem passar pelos
+    descritores do SQLAlchemy); se algum atributo não estiver carregado
+    (expirado ou adiado), usa getattr para que o ORM o carregue.
+
+    Args:
+        model: Classe do model SQLAlchemy
+        fields: Nomes das colunas, na ordem de saída
+
+    Returns:
+        function: Função serialize(obj) -> dict
+    """
+    columns = model.__table__.columns
+    name = f"serialize_{model.__name__.lower()}"
+
+    def entries(accessor):
+        return ',\n            '.join(
+            f"{field!r}: {_field_expression(columns[field], accessor(field))}" for field in fields
+        )
+
+    source = (
+        f"def {name}(obj):\n"
+        f"    state = obj.__dict__\n"
+        f"    try:\n"
+        f"        return {{\n"
+        f"            {entries(lambda field: f'state[{field!r}]')}\n"
+        f"        }}\n"
+        f"    except KeyError:\n"
+        f"        return {{\n"
+        f"            {entries(lambda field: f'obj.{field}')}\n"
+        f"        }}\n"
+    )
+
+    namespace = {'_float': float}
+    exec(compile(source, f"<serializer {model.__name__}>", 'exec'), namespace)
+
+    serializer = namespace[name]
+    serializer.source = source
+    return serializer
@@ -5,4 +5,6 @@ from app.services.viacep_service import ViaCEPService
 
 from app.services.shipping_service import ShippingService
 
-__all__ = ['ViaCEPService', 'ShippingService']
+from app.services.order_ingestion_service import OrderIngestionService
+
+__all__ = ['ViaCEPService', 'ShippingService', 'OrderIngestionService']
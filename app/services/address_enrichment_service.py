@@ -0,0 +1,181 @@
+"""
+Enriquecimento assíncrono de endereços (ORDER_ADDRESS_VALIDATION=deferred)
+
+O pedido é gravado com status pending_address_validation, endereço apenas
+com CEP/número/complemento e frete zerado, junto com uma tarefa na outbox.
+O worker (flask outbox-worker) consulta o ViaCEP, preenche o endereço,
+recalcula o frete e o total e libera o pedido (status pending) ou o
+rejeita (address_rejected) se o CEP não existir.
+"""
+import logging
+
+from flask import current_app
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.order import Order
+from app.services.order_stats_service import OrderStatsService
+from app.services.outbox_service import DONE, RETRY, OutboxService, OutboxWorker
+from app.services.shipping_service import ShippingService
+from app.services.viacep_service import ViaCEPService
+
+logger = logging.getLogger(__name__)
+
+
+class AddressEnrichmentService:
+    """Tarefas de validação de CEP e cálculo de frete dos pedidos"""
+
+    KIND = 'address_enrichment'
+
+    PENDING_STATUS = 'pending_address_validation'
+    READY_STATUS = 'pending'
+    REJECTED_STATUS = 'address_rejected'
+
+    # Status controlados pelo worker: o cliente só pode cancelar o pedido
+    LOCKED_STATUSES = (PENDING_STATUS, REJECTED_STATUS)
+    ALLOWED_CLIENT_STATUSES = ('cancelled',)
+
+    @staticmethod
+    def enqueue(order, cep):
+        """
+        Marca o pedido como aguardando validação e grava a tarefa na sessão atual
+
+        Args:
+            order: Pedido ainda não gravado
+            cep: CEP informado pelo cliente
+        """
+        order.status = AddressEnrichmentService.PENDING_STATUS
+        OutboxService.enqueue(AddressEnrichmentService.KIND, order, {'cep': cep})
+
+    @staticmethod
+    def process(jobs):
+        """
+        Processa um lote de tarefas (handler do OutboxWorker)
+
+        Os CEPs distintos do lote são consultados em paralelo, fora de
+        transação; os pedidos só são carregados e alterados depois.
+
+        Args:
+            jobs: Tarefas reservadas
+
+        Returns:
+            dict: {job.id: (DONE ou RETRY, erro)}
+        """
+        ceps = {job.id: (job.payload or {}).get('cep', '') for job in jobs}
+        results = ViaCEPService.validate_many(list(set(ceps.values())))
+
+        # Pedidos travados até o commit do lote: um PUT/DELETE simultâneo espera
+        # e o resumo é ajustado a partir do estado atual
+        orders = {
+            order.id: order
+            for order in Order.query.options(joinedload(Order.address), selectinload(Order.items))
+            .filter(Order.id.in_([job.order_id for job in jobs]))
+            .with_for_update(of=Order)
+            .populate_existing()
+        }
+
+        outcomes = {}
+        for job in jobs:
+            order = orders.get(job.order_id)
+            result = results[ceps[job.id]]
+
+            if order is None or order.address is None:
+                # Pedido removido enquanto a tarefa aguardava
+                outcomes[job.id] = (DONE, None)
+            elif result.get('valid'):
+                AddressEnrichmentService._apply_address(order, result)
+                outcomes[job.id] = (DONE, None)
+            elif ViaCEPService.is_definitive(result):
+                AddressEnrichmentService._reject(order, result['error'])
+                outcomes[job.id] = (DONE, None)
+            else:
+                outcomes[job.id] = (RETRY, result.get('error'))
+
+        return outcomes
+
+    @staticmethod
+    def _apply_address(order, cep_result):
+        """
+        Preenche o endereço, recalcula frete e total e libera o pedido
+
+        Um pedido cancelado enquanto a tarefa aguardava recebe só o endereço:
+        mantém o status, o frete e o total.
+        """
+        stats_before = OrderStatsService.snapshot(order)
+        address = order.address
+        address.cep = cep_result['cep']
+        address.street = cep_result['street']
+        address.neighborhood = cep_result['neighborhood']
+        address.city = cep_result['city']
+        address.state = cep_result['state']
+
+        if order.status == AddressEnrichmentService.PENDING_STATUS:
+            items_total = sum(float(item.total_price) for item in order.items)
+            shipping_info = ShippingService.calculate_shipping(cep_result['state'], items_total, cep=cep_result['cep'])
+            order.shipping_cost = shipping_info['final_cost']
+            order.calculate_total()
+            order.status = AddressEnrichmentService.READY_STATUS
+
+        OrderStatsService.replace(stats_before, order)
+        logger.info(f"Endereço do pedido {order.order_number} validado: {address.city}/{address.state}")
+
+    @staticmethod
+    def _reject(order, error):
+        """Rejeita o pedido com CEP inexistente ou inválido"""
+        if order.status == AddressEnrichmentService.PENDING_STATUS:
+            stats_before = OrderStatsService.snapshot(order)
+            order.status = AddressEnrichmentService.REJECTED_STATUS
+            OrderStatsService.replace(stats_before, order)
+        logger.warning(f"Pedido {order.order_number} rejeitado: {error}")
+
+    @staticmethod
+    def can_change_status(order, status):
+        """
+        Indica se o cliente pode mudar o status do pedido (PUT /api/orders/<id>)
+
+        Pedidos com endereço em validação ou rejeitado não têm endereço nem
+        frete confirmados: apenas o worker os libera, e o cliente só pode cancelá-los.
+
+        Args:
+            order: Pedido atual
+            status: Status pedido pelo cliente
+
+        Returns:
+            bool: True se a mudança é permitida
+        """
+        return (
+            order.status not in AddressEnrichmentService.LOCKED_STATUSES
+            or status == order.status
+            or status in AddressEnrichmentService.ALLOWED_CLIENT_STATUSES
+        )
+
+    @staticmethod
+    def create_worker(app, threads=None, batch_size=None):
+        """
+        Cria o worker da outbox de endereços com as configurações OUTBOX_*
+
+        Args:
+            app: Instância do Flask
+            threads: Threads do worker (padrão: OUTBOX_WORKER_THREADS)
+            batch_size: Tarefas por lote (padrão: OUTBOX_BATCH_SIZE)
+
+        Returns:
+            OutboxWorker: Worker pronto para run()
+        """
+        config = app.config
+        return OutboxWorker(
+            app,
+            AddressEnrichmentService.KIND,
+            AddressEnrichmentService.process,
+            threads=threads or config.get('OUTBOX_WORKER_THREADS', 2),
+            batch_size=batch_size or config.get('OUTBOX_BATCH_SIZE', 50),
+            poll_interval=config.get('OUTBOX_POLL_INTERVAL', 1.0),
+            lease_seconds=config.get('OUTBOX_LEASE_SECONDS', 60),
+            max_attempts=config.get('OUTBOX_MAX_ATTEMPTS', 8),
+            backoff=config.get('OUTBOX_RETRY_BACKOFF', 5.0),
+            backoff_max=config.get('OUTBOX_RETRY_BACKOFF_MAX', 600.0)
+        )
+
+    @staticmethod
+    def is_deferred():
+        """Indica se a criação de pedidos adia a validação do endereço (ORDER_ADDRESS_VALIDATION=deferred)"""
+        return current_app.config.get('ORDER_ADDRESS_VALIDATION', 'sync') == 'deferred'
@@ -0,0 +1,98 @@
+"""
+Cliente HTTP assíncrono para APIs externas (httpx), usado pelo caminho ASGI
+
+Mesmo comportamento do ResilientHTTPClient (retries com backoff e circuit
+breaker), mas as esperas acontecem no event loop: milhares de consultas
+podem aguardar o serviço externo ao mesmo tempo sem ocupar threads.
+"""
+import asyncio
+import logging
+
+import httpx
+
+from app.services.http_client import ResilientHTTPClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncResilientHTTPClient(ResilientHTTPClient):
+    """ResilientHTTPClient com get() e close() assíncronos"""
+
+    def __init__(self, max_connections=100, **kwargs):
+        """
+        Args:
+            max_connections: Consultas simultâneas ao serviço externo (as demais aguardam na fila)
+            **kwargs: Parâmetros do ResilientHTTPClient
+        """
+        super().__init__(**kwargs)
+        self.max_connections = max_connections
+        self._client = None
+
+    @property
+    def client(self):
+        """httpx.AsyncClient com pool keep-alive (criado sob demanda, no event loop atual)"""
+        if self._client is None:
+            connect_timeout, read_timeout = self.timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=None),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.pool_maxsize
+                )
+            )
+        return self._client
+
+    async def get(self, url, **kwargs):
+        """
+        Executa um GET com retries e circuit breaker
+
+        Respostas 5xx, timeouts e erros de conexão são repetidas; respostas
+        4xx são devolvidas ao chamador sem nova tentativa. Outras exceções não
+        são repetidas. O circuit breaker vê a chamada inteira: as tentativas
+        contam como uma única falha (ou um único sucesso).
+
+        Args:
+            url: URL a ser consultada
+
+        Returns:
+            httpx.Response: Resposta HTTP
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+            httpx.HTTPError: Se todas as tentativas falharem
+        """
+        self.breaker.before_call()
+
+        try:
+            response = await self._get_with_retries(url, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Requisição cancelada (ex.: cliente desconectou): não há resultado a registrar
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return response
+
+    async def _get_with_retries(self, url, **kwargs):
+        """GET com novas tentativas em 5xx, timeouts e erros de conexão"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.get(url, **kwargs)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Falha ao consultar {url} ({type(e).__name__}), nova tentativa em {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        """Fecha o cliente e as conexões do pool"""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
@@ -0,0 +1,42 @@
+"""
+Cache em memória (TTL + LRU) para consultas de CEP
+"""
+from app.cache import TTLCache
+
+
+class CEPCache(TTLCache):
+    """Cache de CEPs com TTL menor para resultados "CEP não encontrado" """
+
+    def __init__(self, max_size=10000, ttl=86400, negative_ttl=600):
+        """
+        Inicializa o cache
+
+        Args:
+            max_size: Número máximo de CEPs armazenados
+            ttl: Tempo de vida (segundos) de resultados válidos
+            negative_ttl: Tempo de vida (segundos) de resultados "CEP não encontrado"
+        """
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.negative_ttl = negative_ttl
+
+    def set(self, key, value, negative=False):
+        """
+        Armazena um valor no cache
+
+        Args:
+            key: CEP limpo (8 dígitos)
+            value: Resultado da consulta
+            negative: Se True, usa o TTL de resultados negativos
+        """
+        super().set(key, value, ttl=self.negative_ttl if negative else None)
+
+    def stats(self):
+        """
+        Retorna estatísticas de uso do cache
+
+        Returns:
+            dict: Contadores de acertos, falhas e despejos
+        """
+        stats = super().stats()
+        stats['negative_ttl'] = self.negative_ttl
+        return stats
@@ -0,0 +1,206 @@
+"""
+Diretório offline de CEPs baseado em índice ordenado mapeado em memória (mmap)
+
+Formato do arquivo de índice:
+    - Cabeçalho: MAGIC (8 bytes) + quantidade de registros (uint32, little-endian)
+    - Chaves: N CEPs de 8 bytes ASCII, em ordem crescente
+    - Offsets: N + 1 inteiros uint32 apontando para a tabela de strings
+    - Tabela de strings: registros UTF-8 com os campos separados por \\x1f
+"""
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'CEPIDX01'
+HEADER = struct.Struct('<8sI')
+OFFSET = struct.Struct('<I')
+KEY_SIZE = 8
+FIELD_SEPARATOR = '\x1f'
+
+# Campos armazenados por CEP (mesmos nomes da resposta do ViaCEP)
+FIELDS = ('logradouro', 'complemento', 'bairro', 'localidade', 'uf', 'ibge', 'gia', 'ddd')
+
+
+def _read_records(source_path):
+    """
+    Lê os registros de um dump de CEPs em CSV ou JSON
+
+    Args:
+        source_path: Caminho do arquivo (.csv, .json ou .jsonl)
+
+    Returns:
+        iterable: Dicionários com o CEP e os campos do endereço
+    """
+    extension = os.path.splitext(source_path)[1].lower()
+
+    if extension == '.csv':
+        with open(source_path, newline='', encoding='utf-8') as source:
+            yield from csv.DictReader(source)
+
+    elif extension == '.jsonl':
+        with open(source_path, encoding='utf-8') as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+    elif extension == '.json':
+        with open(source_path, encoding='utf-8') as source:
+            data = json.load(source)
+        if isinstance(data, dict):
+            for cep, record in data.items():
+                yield {'cep': cep, **record}
+        else:
+            yield from data
+
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {extension}")
+
+
+def build_cep_index(source_path, index_path):
+    """
+    Converte um dump de CEPs (CSV/JSON) em um índice binário ordenado
+
+    Args:
+        source_path: Caminho do dump de CEPs
+        index_path: Caminho do arquivo de índice a ser gerado
+
+    Returns:
+        int: Quantidade de CEPs indexados
+    """
+    records = {}
+    for record in _read_records(source_path):
+        clean_cep = ''.join(filter(str.isdigit, str(record.get('cep', ''))))
+        if len(clean_cep) != 8:
+            continue
+        values = [str(record.get(field) or '').replace(FIELD_SEPARATOR, ' ') for field in FIELDS]
+        records[clean_cep] = FIELD_SEPARATOR.join(values).encode('utf-8')
+
+    keys = sorted(records)
+
+    offsets = []
+    position = 0
+    for key in keys:
+        offsets.append(position)
+        position += len(records[key])
+    offsets.append(position)
+
+    # Escrever em arquivo temporário e renomear para não expor índice parcial
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as index:
+        index.write(HEADER.pack(MAGIC, len(keys)))
+        index.write(b''.join(key.encode('ascii') for key in keys))
+        index.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        for key in keys:
+            index.write(records[key])
+    os.replace(tmp_path, index_path)
+
+    logger.info(f"Índice de CEPs gerado: {len(keys)} registros em {index_path}")
+    return len(keys)
+
+
+class CEPDirectory:
+    """Consulta de CEPs por busca binária em um índice mapeado em memória"""
+
+    def __init__(self, index_path):
+        """
+        Abre o índice em modo somente leitura
+
+        Args:
+            index_path: Caminho do arquivo gerado por build_cep_index
+
+        Raises:
+            OSError: Se o arquivo não puder ser aberto
+            ValueError: Se o arquivo não for um índice válido ou estiver truncado
+        """
+        self.index_path = index_path
+        self._file = open(index_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivo vazio
+            self._file.close()
+            raise ValueError(f"Arquivo de índice de CEP vazio: {index_path}")
+
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"Arquivo de índice de CEP truncado: {index_path}")
+
+        magic, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo de índice de CEP inválido: {index_path}")
+
+        self._keys_start = HEADER.size
+        self._offsets_start = self._keys_start + self.count * KEY_SIZE
+        self._strings_start = self._offsets_start + (self.count + 1) * OFFSET.size
+
+        # Chaves, offsets e a tabela de strings inteira precisam caber no arquivo
+        if (
+            len(self._mm) < self._strings_start
+            or len(self._mm) < self._strings_start + OFFSET.unpack_from(self._mm, self._strings_start - OFFSET.size)[0]
+        ):
+            self.close()
+            raise ValueError(f"Arquivo de índice de CEP truncado: {index_path}")
+
+    def _find(self, clean_cep):
+        """
+        Busca binária pela posição do CEP na seção de chaves
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            int: Posição do CEP ou -1 se ausente
+        """
+        target = clean_cep.encode('ascii')
+        mm = self._mm
+        base = self._keys_start
+        low, high = 0, self.count - 1
+
+        while low <= high:
+            mid = (low + high) // 2
+            start = base + mid * KEY_SIZE
+            key = mm[start:start + KEY_SIZE]
+            if key < target:
+                low = mid + 1
+            elif key > target:
+                high = mid - 1
+            else:
+                return mid
+        return -1
+
+    def lookup(self, clean_cep):
+        """
+        Busca os dados de um CEP no índice
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            dict: Campos do endereço (nomes do ViaCEP) ou None se ausente
+        """
+        position = self._find(clean_cep)
+        if position < 0:
+            return None
+
+        offset_position = self._offsets_start + position * OFFSET.size
+        start, end = struct.unpack_from('<2I', self._mm, offset_position)
+        raw = self._mm[self._strings_start + start:self._strings_start + end]
+
+        return dict(zip(FIELDS, raw.decode('utf-8').split(FIELD_SEPARATOR)))
+
+    def close(self):
+        """Libera o mapeamento e o arquivo"""
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, clean_cep):
+        return self._find(clean_cep) >= 0
@@ -0,0 +1,233 @@
+"""
+Cliente HTTP resiliente para APIs externas (pool keep-alive, retries e circuit breaker)
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Erro lançado quando o circuito está aberto e a chamada é recusada"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (fechado -> aberto -> meio-aberto)
+
+    Após `failure_threshold` falhas consecutivas o circuito abre e as chamadas
+    falham imediatamente. Depois de `reset_timeout` segundos uma única chamada
+    de teste é liberada: sucesso fecha o circuito, falha o reabre.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        """Estado atual do circuito"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """
+        Verifica se a chamada pode prosseguir
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            self.rejected += 1
+            raise CircuitOpenError('Circuito aberto: serviço externo indisponível')
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida e fecha o circuito"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Libera a chamada de teste sem registrar resultado (chamada interrompida ou cancelada)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Registra uma falha e abre o circuito se o limite for atingido"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"Circuit breaker aberto após {self._failures} falhas consecutivas")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        """
+        Retorna o estado e os contadores do circuito
+
+        Returns:
+            dict: Estado, falhas consecutivas e chamadas rejeitadas
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened
+            }
+
+
+class ResilientHTTPClient:
+    """Cliente HTTP com sessão compartilhada, retries com backoff e circuit breaker"""
+
+    def __init__(self, connect_timeout=2.0, read_timeout=3.0, max_retries=2,
+                 backoff_factor=0.1, backoff_max=2.0, pool_connections=4, pool_maxsize=20,
+                 failure_threshold=5, reset_timeout=30):
+        """
+        Inicializa o cliente
+
+        Args:
+            connect_timeout: Timeout de conexão (segundos)
+            read_timeout: Timeout de leitura (segundos)
+            max_retries: Número máximo de novas tentativas após a primeira
+            backoff_factor: Base do backoff exponencial (segundos)
+            backoff_max: Limite superior de espera entre tentativas (segundos)
+            pool_connections: Quantidade de pools de conexão (hosts) mantidos
+            pool_maxsize: Conexões keep-alive mantidas por host
+            failure_threshold: Falhas consecutivas para abrir o circuito
+            reset_timeout: Tempo (segundos) até liberar uma chamada de teste
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Sessão requests com pool de conexões keep-alive (criada sob demanda)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        max_retries=0
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _backoff(self, attempt):
+        """
+        Calcula a espera antes da próxima tentativa (backoff exponencial com jitter)
+
+        Args:
+            attempt: Número da tentativa que falhou (0 = primeira)
+
+        Returns:
+            float: Tempo de espera em segundos
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def get(self, url, **kwargs):
+        """
+        Executa um GET com retries e circuit breaker
+
+        Respostas 5xx, timeouts e erros de conexão são repetidas; respostas
+        4xx são devolvidas ao chamador sem nova tentativa. Outras exceções não
+        são repetidas. O circuit breaker vê a chamada inteira: as tentativas
+        contam como uma única falha (ou um único sucesso), e a chamada de teste
+        do circuito meio-aberto inclui as suas novas tentativas.
+
+        Args:
+            url: URL a ser consultada
+
+        Returns:
+            requests.Response: Resposta HTTP
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+            requests.exceptions.RequestException: Se todas as tentativas falharem
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        self.breaker.before_call()
+
+        try:
+            response = self._get_with_retries(url, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Interrupção (ex.: timeout do worker): não há resultado a registrar
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return response
+
+    def _get_with_retries(self, url, **kwargs):
+        """GET com novas tentativas em 5xx, timeouts e erros de conexão"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, **kwargs)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+            except (requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.HTTPError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Falha ao consultar {url} ({type(e).__name__}), nova tentativa em {delay:.2f}s")
+                time.sleep(delay)
+
+    def close(self):
+        """Fecha a sessão e as conexões do pool"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
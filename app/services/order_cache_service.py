@@ -0,0 +1,240 @@
+"""
+Cache da resposta de detalhe de pedidos (GET /api/orders/<id>) com ETag
+
+O ETag e a validade das entradas vêm de orders.updated_at. Uma entrada
+conferida há menos de ORDER_CACHE_REVALIDATE_SECONDS é servida (ou responde
+304) sem nenhuma query; depois disso, o próximo acerto confere a versão com
+uma leitura pela chave primária. Alterações feitas neste processo invalidam
+a entrada no commit; alterações de outros workers, do worker da outbox ou
+de outros servidores aparecem em no máximo ORDER_CACHE_REVALIDATE_SECONDS.
+Só leituras do primário são armazenadas (uma réplica atrasada renderizaria
+uma versão antiga).
+"""
+from datetime import datetime
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.replicas import get_replica_router
+
+
+class OrderDetailCache(TTLCache):
+    """Cache do JSON renderizado de cada pedido, com ETag forte"""
+
+    def __init__(self, max_size=10000, ttl=5):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._not_modified_lock = threading.Lock()
+        self.not_modified = 0
+
+    @staticmethod
+    def compute_etag(order_id, version):
+        """
+        Calcula o ETag forte de um pedido a partir da sua versão
+
+        Args:
+            order_id: ID do pedido
+            version: updated_at do pedido
+
+        Returns:
+            str: ETag (sem aspas), igual em todos os processos para a mesma versão
+        """
+        return f"{order_id}-{version:%Y%m%d%H%M%S%f}"
+
+    def put(self, order_id, version, body):
+        """
+        Armazena o corpo renderizado de um pedido
+
+        Args:
+            order_id: ID do pedido
+            version: updated_at do pedido renderizado
+            body: Corpo JSON renderizado (bytes)
+
+        Returns:
+            str: ETag do corpo
+        """
+        etag = self.compute_etag(order_id, version)
+        self.set(order_id, (version, etag, body, time.monotonic()))
+        return etag
+
+    def record_not_modified(self):
+        """Contabiliza uma resposta 304"""
+        with self._not_modified_lock:
+            self.not_modified += 1
+
+    def stats(self):
+        """
+        Retorna estatísticas de uso do cache
+
+        Returns:
+            dict: Contadores de acertos, falhas, invalidações e respostas 304
+        """
+        stats = super().stats()
+        stats['not_modified'] = self.not_modified
+        return stats
+
+
+class OrderCacheService:
+    """Serviço de acesso e invalidação do cache de detalhe de pedidos"""
+
+    @staticmethod
+    def get_cache():
+        """
+        Retorna o cache de detalhe de pedidos da aplicação atual (criado sob demanda)
+
+        Returns:
+            OrderDetailCache: Cache ou None se desabilitado (ORDER_CACHE_ENABLED)
+        """
+        if not current_app.config.get('ORDER_CACHE_ENABLED', True):
+            return None
+
+        cache = current_app.extensions.get('order_detail_cache')
+        if cache is None:
+            cache = current_app.extensions.setdefault('order_detail_cache', OrderDetailCache(
+                max_size=current_app.config.get('ORDER_CACHE_MAX_SIZE', 10000),
+                ttl=current_app.config.get('ORDER_CACHE_TTL', 5)
+            ))
+        return cache
+
+    @staticmethod
+    def get_entry(cache, order_id):
+        """
+        Busca o corpo de um pedido no cache, conferindo a versão se necessário
+
+        Entradas conferidas há menos de ORDER_CACHE_REVALIDATE_SECONDS são
+        devolvidas sem consultar o banco; as demais são conferidas com
+        current_version() e descartadas se o pedido mudou ou foi removido.
+
+        Args:
+            cache: Retorno de get_cache()
+            order_id: ID do pedido
+
+        Returns:
+            tuple: (versão, ETag, corpo) ou None se não houver entrada válida
+        """
+        entry = cache.get(order_id)
+        if entry is None:
+            return None
+
+        version, etag, body, verified_at = entry
+        if time.monotonic() - verified_at >= current_app.config.get('ORDER_CACHE_REVALIDATE_SECONDS', 1.0):
+            if OrderCacheService.current_version(order_id) != version:
+                # Alterado por outro processo (outro worker, worker da outbox, outro servidor)
+                cache.delete(order_id)
+                return None
+            cache.set(order_id, (version, etag, body, time.monotonic()))
+
+        return version, etag, body
+
+    @staticmethod
+    def current_version(order_id):
+        """
+        Lê a versão atual do pedido (uma query pela chave primária)
+
+        Args:
+            order_id: ID do pedido
+
+        Returns:
+            datetime: updated_at do pedido ou None se ele não existir
+        """
+        from app.database import db
+        from app.models.order import Order
+
+        return db.session.execute(
+            select(Order.updated_at).where(Order.id == order_id)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def invalidate(order_ids):
+        """
+        Remove pedidos do cache
+
+        Args:
+            order_ids: IDs dos pedidos alterados ou removidos
+        """
+        if not order_ids or not has_app_context():
+            return
+
+        cache = OrderCacheService.get_cache()
+        if cache is None:
+            return
+
+        for order_id in order_ids:
+            cache.delete(order_id)
+
+
+def _changed_order_ids(session):
+    """Coleta os IDs dos pedidos afetados pelas alterações pendentes da sessão"""
+    from app.models.order import Order
+    from app.models.address import Address
+    from app.models.order_item import OrderItem
+
+    order_ids = set()
+    for instance in list(session.dirty) + list(session.deleted) + list(session.new):
+        if isinstance(instance, Order):
+            order_id = instance.id
+        elif isinstance(instance, (Address, OrderItem)):
+            order_id = instance.order_id if instance.order_id is not None else getattr(instance.order, 'id', None)
+        else:
+            continue
+
+        if order_id is not None:
+            order_ids.add(order_id)
+    return order_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def _touch_parent_orders(session, flush_context, instances):
+    """
+    Atualiza updated_at (versão do ETag) de pedidos cujo endereço ou itens mudaram
+
+    Sem isso, uma alteração só no endereço (ex.: enriquecimento de um pedido
+    já cancelado) não mudaria a versão conferida pelo cache.
+    """
+    from app.models.address import Address
+    from app.models.order_item import OrderItem
+
+    with session.no_autoflush:
+        for instance in list(session.dirty) + list(session.deleted):
+            if not isinstance(instance, (Address, OrderItem)):
+                continue
+            if instance in session.dirty and not session.is_modified(instance):
+                continue
+
+            order = instance.order
+            if order is not None and order not in session.deleted:
+                order.updated_at = datetime.utcnow()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_orders(session, flush_context):
+    """
+    Registra os pedidos alterados para invalidar o cache após o commit
+
+    Roda após o flush (new/dirty/deleted ainda refletem o estado anterior) para
+    que pedidos novos já tenham ID.
+    """
+    order_ids = _changed_order_ids(session)
+    if order_ids:
+        session.info.setdefault('changed_order_ids', set()).update(order_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_orders(session):
+    """Invalida o cache dos pedidos alterados na transação confirmada"""
+    order_ids = session.info.pop('changed_order_ids', None)
+    if order_ids:
+        OrderCacheService.invalidate(order_ids)
+
+        # Leituras desses pedidos ficam no primário até as réplicas alcançarem
+        if has_app_context():
+            get_replica_router().record_writes(order_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed_orders(session, previous_transaction):
+    """Descarta os pedidos coletados em uma transação desfeita"""
+    session.info.pop('changed_order_ids', None)
@@ -0,0 +1,177 @@
+"""
+Serviço de exportação de pedidos em streaming (NDJSON/CSV)
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.database import db
+from app.models.order import Order
+
+logger = logging.getLogger(__name__)
+
+ORDER_COLUMNS = [
+    'id', 'order_number', 'customer_name', 'customer_email', 'customer_phone',
+    'total_amount', 'shipping_cost', 'status', 'created_at', 'updated_at'
+]
+ADDRESS_COLUMNS = ['cep', 'street', 'number', 'complement', 'neighborhood', 'city', 'state']
+
+# Tamanho aproximado dos blocos enviados ao cliente (bytes)
+CHUNK_SIZE = 64 * 1024
+
+
+class OrderExportService:
+    """Serviço para exportar pedidos com memória constante"""
+
+    FORMATS = ('ndjson', 'csv')
+
+    @staticmethod
+    def parse_date(value, end=False):
+        """
+        Converte um parâmetro de data (YYYY-MM-DD ou ISO 8601) para datetime
+
+        Args:
+            value: Data informada na query string
+            end: Se True e a data não tiver horário, usa o início do dia seguinte
+
+        Returns:
+            datetime: Data convertida ou None se não informada
+
+        Raises:
+            ValueError: Se a data for inválida
+        """
+        if not value:
+            return None
+
+        parsed = datetime.fromisoformat(value)
+        if end and len(value) == 10:
+            parsed += timedelta(days=1)
+        return parsed
+
+    @staticmethod
+    def build_query(start=None, end=None, status=None, include_details=False):
+        """
+        Monta a query de exportação (ordenada por created_at, id)
+
+        Args:
+            start: Data inicial (inclusiva)
+            end: Data final (exclusiva)
+            status: Filtrar por status
+            include_details: Se True, carrega endereço e itens antecipadamente
+
+        Returns:
+            Select: Query SQLAlchemy
+        """
+        query = select(Order).order_by(Order.created_at.asc(), Order.id.asc())
+
+        if start:
+            query = query.where(Order.created_at >= start)
+        if end:
+            query = query.where(Order.created_at < end)
+        if status:
+            query = query.where(Order.status == status)
+        if include_details:
+            query = query.options(*Order.detail_load_options())
+
+        return query
+
+    @staticmethod
+    def iter_orders(query, batch_size=1000):
+        """
+        Percorre os pedidos com cursor no servidor, em lotes de batch_size
+
+        Args:
+            query: Query gerada por build_query
+            batch_size: Quantidade de linhas buscadas por vez
+
+        Yields:
+            Order: Pedidos na ordem da query
+        """
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        try:
+            yield from result.scalars()
+        finally:
+            result.close()
+
+    @staticmethod
+    def _iter_ndjson(orders, include_details):
+        """Gera uma linha JSON por pedido"""
+        for order in orders:
+            yield current_app.json.dumps(order.to_dict(include_details=include_details)) + '\n'
+
+    @staticmethod
+    def _iter_csv(orders, include_details):
+        """Gera o cabeçalho e uma linha CSV por pedido"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        header = list(ORDER_COLUMNS)
+        if include_details:
+            header += [f'address_{column}' for column in ADDRESS_COLUMNS] + ['items']
+        writer.writerow(header)
+
+        for order in orders:
+            data = order.to_dict(include_details=include_details)
+            row = [data[column] for column in ORDER_COLUMNS]
+
+            if include_details:
+                address = data['address'] or {}
+                row += [address.get(column) for column in ADDRESS_COLUMNS]
+                row.append(json.dumps(data['items'], ensure_ascii=False))
+
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+        yield buffer.getvalue()
+
+    @staticmethod
+    def stream(orders, export_format='ndjson', include_details=False, gzip=False):
+        """
+        Serializa os pedidos em blocos de bytes
+
+        Args:
+            orders: Iterável de pedidos (ver iter_orders)
+            export_format: ndjson ou csv
+            include_details: Se True, inclui endereço e itens
+            gzip: Se True, comprime a saída em formato gzip
+
+        Yields:
+            bytes: Blocos de aproximadamente CHUNK_SIZE bytes
+        """
+        if export_format == 'csv':
+            lines = OrderExportService._iter_csv(orders, include_details)
+        else:
+            lines = OrderExportService._iter_ndjson(orders, include_details)
+
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        pending = []
+        pending_size = 0
+
+        for line in lines:
+            encoded = line.encode('utf-8')
+            pending.append(encoded)
+            pending_size += len(encoded)
+
+            if pending_size >= CHUNK_SIZE:
+                chunk = b''.join(pending)
+                pending, pending_size = [], 0
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+
+        chunk = b''.join(pending)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+
+        logger.info(f"Exportação de pedidos concluída ({export_format})")
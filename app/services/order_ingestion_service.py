@@ -0,0 +1,196 @@
+"""
+Serviço de ingestão de pedidos em lote
+"""
+from datetime import datetime
+import logging
+from flask import current_app
+from sqlalchemy import insert, select
+
+from app.database import db
+from app.models.order import Order
+from app.models.address import Address
+from app.models.order_item import OrderItem
+from app.services.viacep_service import ViaCEPService
+from app.services.shipping_service import ShippingService
+from app.services.order_stats_service import OrderStatsService
+
+logger = logging.getLogger(__name__)
+
+
+class OrderIngestionService:
+    """Serviço para criar muitos pedidos com inserts multi-linha"""
+
+    @staticmethod
+    def _build_rows(validated_data, cep_result):
+        """
+        Monta as linhas de pedido, endereço e itens de um pedido validado
+
+        Args:
+            validated_data: Pedido validado pelo CreateOrderSchema
+            cep_result: Retorno de ViaCEPService.validate_and_get_address
+
+        Returns:
+            tuple: (linha do pedido, linha do endereço, linhas dos itens)
+        """
+        item_rows = []
+        for item_data in validated_data['items']:
+            item_rows.append({
+                'product_id': item_data['product_id'],
+                'product_name': item_data['product_name'],
+                'product_image': item_data.get('product_image'),
+                'quantity': item_data['quantity'],
+                'unit_price': item_data['unit_price'],
+                'total_price': item_data['quantity'] * item_data['unit_price']
+            })
+
+        # Calcular frete e total (mesmas regras de POST /api/orders)
+        items_total = sum(float(item['total_price']) for item in item_rows)
+        shipping_info = ShippingService.calculate_shipping(cep_result['state'], items_total, cep=cep_result['cep'])
+        shipping_cost = shipping_info['final_cost']
+
+        order_row = {
+            'order_number': Order._generate_order_number(),
+            'customer_name': validated_data['customer_name'],
+            'customer_email': validated_data['customer_email'],
+            'customer_phone': validated_data.get('customer_phone'),
+            'shipping_cost': shipping_cost,
+            'total_amount': items_total + float(shipping_cost),
+            'created_at': datetime.utcnow()
+        }
+
+        address_row = {
+            'cep': cep_result['cep'],
+            'street': cep_result['street'],
+            'number': validated_data['address'].get('number'),
+            'complement': validated_data['address'].get('complement'),
+            'neighborhood': cep_result['neighborhood'],
+            'city': cep_result['city'],
+            'state': cep_result['state']
+        }
+
+        return order_row, address_row, item_rows
+
+    @staticmethod
+    def _insert_chunk(chunk):
+        """
+        Insere um bloco de pedidos em uma única transação
+
+        Cada tabela recebe um único INSERT multi-linha; os IDs dos pedidos são
+        recuperados por order_number para funcionar também sem RETURNING (MySQL).
+
+        Args:
+            chunk: Lista de tuplas (índice, linha do pedido, endereço, itens)
+
+        Returns:
+            dict: ID do pedido indexado pelo order_number
+        """
+        order_numbers = [order_row['order_number'] for _, order_row, _, _ in chunk]
+
+        db.session.execute(insert(Order.__table__), [order_row for _, order_row, _, _ in chunk])
+
+        ids = dict(db.session.execute(
+            select(Order.order_number, Order.id).where(Order.order_number.in_(order_numbers))
+        ).all())
+
+        address_rows = []
+        item_rows = []
+        for _, order_row, address_row, items in chunk:
+            order_id = ids[order_row['order_number']]
+            address_rows.append({**address_row, 'order_id': order_id})
+            item_rows.extend({**item_row, 'order_id': order_id} for item_row in items)
+
+        db.session.execute(insert(Address.__table__), address_rows)
+        db.session.execute(insert(OrderItem.__table__), item_rows)
+
+        # Resumo de pedidos atualizado na mesma transação do bloco
+        OrderStatsService.add_rows((order_row, address_row, items) for _, order_row, address_row, items in chunk)
+        db.session.commit()
+
+        return ids
+
+    @staticmethod
+    def ingest(orders):
+        """
+        Cria vários pedidos já validados
+
+        Os CEPs distintos são consultados uma única vez e os pedidos são gravados
+        em blocos de ORDERS_BULK_CHUNK_SIZE, cada bloco em sua própria transação
+        (um bloco com erro é dividido até isolar os pedidos que falham).
+
+        Args:
+            orders: Lista de tuplas (índice, pedido validado pelo CreateOrderSchema)
+
+        Returns:
+            dict: Resultado por índice (sucesso com id/order_number ou erro)
+        """
+        results = {}
+        if not orders:
+            return results
+
+        # Consultar cada CEP distinto uma única vez
+        cep_results = ViaCEPService.validate_many(
+            [validated_data['address']['cep'] for _, validated_data in orders]
+        )
+
+        rows = []
+        for index, validated_data in orders:
+            cep_result = cep_results[validated_data['address']['cep']]
+            if not cep_result.get('valid'):
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'error': 'CEP inválido',
+                    'details': cep_result.get('error')
+                }
+                continue
+
+            order_row, address_row, item_rows = OrderIngestionService._build_rows(validated_data, cep_result)
+            rows.append((index, order_row, address_row, item_rows))
+
+        chunk_size = current_app.config.get('ORDERS_BULK_CHUNK_SIZE', 200)
+        for start in range(0, len(rows), chunk_size):
+            OrderIngestionService._insert_or_split(rows[start:start + chunk_size], results)
+
+        return results
+
+    @staticmethod
+    def _insert_or_split(chunk, results):
+        """
+        Grava um bloco e registra o resultado de cada pedido
+
+        Se o bloco falhar (ex.: um valor maior que a coluna), ele é dividido
+        ao meio e cada metade é gravada de novo, até isolar os pedidos com
+        erro: só eles são reportados como falha.
+
+        Args:
+            chunk: Lista de tuplas (índice, linha do pedido, endereço, itens)
+            results: Resultados por índice (preenchido aqui)
+        """
+        try:
+            ids = OrderIngestionService._insert_chunk(chunk)
+        except Exception as e:
+            db.session.rollback()
+            if len(chunk) > 1:
+                logger.warning(f"Erro ao gravar bloco de {len(chunk)} pedidos, dividindo: {str(e)}")
+                middle = len(chunk) // 2
+                OrderIngestionService._insert_or_split(chunk[:middle], results)
+                OrderIngestionService._insert_or_split(chunk[middle:], results)
+                return
+
+            index = chunk[0][0]
+            logger.error(f"Erro ao gravar pedido {index} do lote: {str(e)}")
+            results[index] = {
+                'index': index,
+                'success': False,
+                'error': 'Erro interno ao criar pedido'
+            }
+            return
+
+        for index, order_row, _, _ in chunk:
+            results[index] = {
+                'index': index,
+                'success': True,
+                'id': ids[order_row['order_number']],
+                'order_number': order_row['order_number'],
+                'total_amount': round(order_row['total_amount'], 2)
+            }
@@ -0,0 +1,298 @@
+"""
+Resumos de pedidos por (dia, status, estado) mantidos incrementalmente
+
+Cada operação que cria, altera ou remove pedidos aplica a diferença de
+quantidade, itens, receita e frete na tabela order_daily_stats dentro da
+mesma transação, então os painéis leem algumas centenas de linhas de resumo
+em vez de varrer orders e order_items. O dia é a data UTC de created_at.
+
+flask rebuild-order-stats recalcula a tabela a partir dos pedidos.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+import logging
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import db
+from app.models.address import Address
+from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
+from app.models.order_item import OrderItem
+
+logger = logging.getLogger(__name__)
+
+# Dimensões aceitas em group_by
+DIMENSIONS = ('day', 'status', 'state')
+
+ZERO = Decimal('0.00')
+CENTS = Decimal('0.01')
+
+
+def _to_decimal(value):
+    return Decimal(str(value if value is not None else 0)).quantize(CENTS)
+
+
+def _to_date(value):
+    # SQLite devolve func.date() como texto
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+class OrderStatsService:
+    """Manutenção e consulta da tabela order_daily_stats"""
+
+    @staticmethod
+    def snapshot(order):
+        """
+        Contribuição atual de um pedido para o resumo
+
+        Deve ser chamado antes de alterar o pedido; o resultado é passado
+        para replace() depois da alteração. Usa o endereço e os itens do
+        pedido (carregar com Order.detail_load_options()).
+
+        Args:
+            order: Pedido já gravado
+
+        Returns:
+            tuple: (chave (dia, status, estado), (pedidos, itens, receita, frete))
+        """
+        key = (
+            order.created_at.date(),
+            order.status,
+            order.address.state if order.address is not None else ''
+        )
+        values = (
+            1,
+            sum(item.quantity for item in order.items),
+            _to_decimal(order.total_amount),
+            _to_decimal(order.shipping_cost)
+        )
+        return key, values
+
+    @staticmethod
+    def add(order):
+        """
+        Soma um pedido novo ao resumo (created_at precisa estar definido: chamar após o flush)
+
+        Args:
+            order: Pedido criado na transação atual
+        """
+        OrderStatsService.apply([(OrderStatsService.snapshot(order), 1)])
+
+    @staticmethod
+    def remove(order):
+        """
+        Subtrai do resumo um pedido que será removido na transação atual
+
+        Args:
+            order: Pedido com endereço e itens carregados
+        """
+        OrderStatsService.apply([(OrderStatsService.snapshot(order), -1)])
+
+    @staticmethod
+    def replace(before, order):
+        """
+        Move a contribuição de um pedido alterado (status, estado ou valores)
+
+        Args:
+            before: Retorno de snapshot() antes da alteração
+            order: Pedido já alterado
+        """
+        after = OrderStatsService.snapshot(order)
+        if after != before:
+            OrderStatsService.apply([(before, -1), (after, 1)])
+
+    @staticmethod
+    def add_rows(rows):
+        """
+        Soma ao resumo pedidos inseridos em lote (sem objetos do ORM)
+
+        Args:
+            rows: Tuplas (linha do pedido, linha do endereço, linhas dos itens)
+                com created_at definido na linha do pedido
+        """
+        OrderStatsService.apply([
+            (
+                (
+                    (order_row['created_at'].date(), order_row.get('status') or 'pending', address_row['state']),
+                    (
+                        1,
+                        sum(item['quantity'] for item in item_rows),
+                        _to_decimal(order_row['total_amount']),
+                        _to_decimal(order_row['shipping_cost'])
+                    )
+                ),
+                1
+            )
+            for order_row, address_row, item_rows in rows
+        ])
+
+    @staticmethod
+    def apply(changes):
+        """
+        Aplica contribuições somadas ou subtraídas na sessão atual (o commit é do chamador)
+
+        As contribuições são agrupadas por chave e cada chave recebe um único
+        UPDATE incremental; chaves ainda inexistentes são inseridas em um
+        savepoint (se outra transação inserir a mesma chave ao mesmo tempo,
+        o UPDATE é repetido).
+
+        Args:
+            changes: Lista de ((chave, valores), sinal) com sinal 1 ou -1
+        """
+        deltas = defaultdict(lambda: [0, 0, ZERO, ZERO])
+        for (key, values), sign in changes:
+            delta = deltas[key]
+            for position, value in enumerate(values):
+                delta[position] += sign * value
+
+        table = OrderDailyStats.__table__
+        for (day, status, state), (orders, items, revenue, shipping) in deltas.items():
+            if not (orders or items or revenue or shipping):
+                continue
+
+            where = (table.c.day == day, table.c.status == status, table.c.state == state)
+            increment = update(table).where(*where).values(
+                order_count=table.c.order_count + orders,
+                items_quantity=table.c.items_quantity + items,
+                revenue=table.c.revenue + revenue,
+                shipping_revenue=table.c.shipping_revenue + shipping,
+                updated_at=func.now()
+            )
+
+            if db.session.execute(increment).rowcount:
+                continue
+
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(table).values(
+                        day=day, status=status, state=state,
+                        order_count=orders, items_quantity=items,
+                        revenue=revenue, shipping_revenue=shipping
+                    ))
+            except IntegrityError:
+                # Outra transação criou a linha ao mesmo tempo
+                db.session.execute(increment)
+
+    @staticmethod
+    def rebuild():
+        """
+        Recalcula toda a tabela de resumo a partir de orders, addresses e order_items
+
+        Executado em uma única transação; pedidos gravados durante o
+        recálculo podem ficar de fora (rodar com a escrita pausada ou
+        repetir em seguida).
+
+        Returns:
+            int: Quantidade de linhas de resumo geradas
+        """
+        day = func.date(Order.created_at)
+        state = func.coalesce(Address.state, '')
+
+        quantities = (
+            select(OrderItem.order_id, func.sum(OrderItem.quantity).label('quantity'))
+            .group_by(OrderItem.order_id)
+            .subquery()
+        )
+
+        rows = db.session.execute(
+            select(
+                day, Order.status, state,
+                func.count(Order.id),
+                func.coalesce(func.sum(quantities.c.quantity), 0),
+                func.coalesce(func.sum(Order.total_amount), 0),
+                func.coalesce(func.sum(Order.shipping_cost), 0)
+            )
+            .select_from(Order)
+            .outerjoin(Address, Address.order_id == Order.id)
+            .outerjoin(quantities, quantities.c.order_id == Order.id)
+            .group_by(day, Order.status, state)
+        ).all()
+
+        db.session.execute(delete(OrderDailyStats))
+        if rows:
+            db.session.execute(insert(OrderDailyStats.__table__), [
+                {
+                    'day': _to_date(row_day), 'status': row_status, 'state': row_state,
+                    'order_count': count, 'items_quantity': int(quantity),
+                    'revenue': _to_decimal(revenue), 'shipping_revenue': _to_decimal(shipping)
+                }
+                for row_day, row_status, row_state, count, quantity, revenue, shipping in rows
+            ])
+        db.session.commit()
+
+        logger.info(f"Resumo de pedidos recalculado: {len(rows)} linhas")
+        return len(rows)
+
+    @staticmethod
+    def query(start=None, end=None, status=None, state=None, group_by=('day',)):
+        """
+        Consulta os totais no resumo
+
+        Args:
+            start: Primeiro dia (inclusivo)
+            end: Último dia (inclusivo)
+            status: Filtrar por status
+            state: Filtrar por estado (UF)
+            group_by: Dimensões do agrupamento (subconjunto de DIMENSIONS, vazio = só totais)
+
+        Returns:
+            dict: totals e groups (ordenados pelas dimensões)
+        """
+        columns = [getattr(OrderDailyStats, dimension) for dimension in group_by]
+        sums = (
+            func.coalesce(func.sum(OrderDailyStats.order_count), 0),
+            func.coalesce(func.sum(OrderDailyStats.items_quantity), 0),
+            func.coalesce(func.sum(OrderDailyStats.revenue), 0),
+            func.coalesce(func.sum(OrderDailyStats.shipping_revenue), 0)
+        )
+
+        query = select(*columns, *sums)
+        if start is not None:
+            query = query.where(OrderDailyStats.day >= start)
+        if end is not None:
+            query = query.where(OrderDailyStats.day <= end)
+        if status:
+            query = query.where(OrderDailyStats.status == status)
+        if state is not None:
+            query = query.where(OrderDailyStats.state == state.upper())
+        if columns:
+            query = query.group_by(*columns).order_by(*columns)
+
+        groups = []
+        totals = {'orders': 0, 'items_quantity': 0, 'revenue': ZERO, 'shipping_revenue': ZERO}
+        for row in db.session.execute(query).all():
+            dimensions = row[:len(columns)]
+            orders, items, revenue, shipping = row[len(columns):]
+            if not orders:
+                # Linhas zeradas por remoções e mudanças de status
+                continue
+
+            group = OrderStatsService._summary(orders, items, revenue, shipping)
+            for dimension, value in zip(group_by, dimensions):
+                group[dimension] = value.isoformat() if dimension == 'day' else value
+            groups.append(group)
+
+            totals['orders'] += int(orders)
+            totals['items_quantity'] += int(items)
+            totals['revenue'] += _to_decimal(revenue)
+            totals['shipping_revenue'] += _to_decimal(shipping)
+
+        return {
+            'totals': OrderStatsService._summary(*totals.values()),
+            'groups': groups if columns else []
+        }
+
+    @staticmethod
+    def _summary(orders, items, revenue, shipping):
+        """Valores de um grupo com ticket médio"""
+        revenue = _to_decimal(revenue)
+        return {
+            'orders': int(orders),
+            'items_quantity': int(items),
+            'revenue': float(revenue),
+            'shipping_revenue': float(_to_decimal(shipping)),
+            'average_ticket': float(round(revenue / int(orders), 2)) if orders else 0.0
+        }
@@ -0,0 +1,322 @@
+"""
+Outbox transacional: tarefas gravadas junto com o pedido e executadas em segundo plano
+
+A tarefa é inserida na mesma transação que cria o pedido, então nunca existe
+pedido sem tarefa (nem tarefa sem pedido). Workers (flask outbox-worker)
+reservam lotes de tarefas, executam o handler do tipo e registram o
+resultado:
+
+    - concluída: a tarefa é removida na mesma transação que aplica o resultado;
+    - retry: nova tentativa após backoff exponencial com jitter;
+    - failed: OUTBOX_MAX_ATTEMPTS tentativas esgotadas (flask outbox-requeue-failed).
+
+A reserva é um lease: available_at avança OUTBOX_LEASE_SECONDS e a tarefa
+volta a ficar disponível se o worker morrer no meio do lote. O UPDATE
+condicional garante que dois workers nunca reservem a mesma tarefa; no
+MySQL/PostgreSQL o SELECT usa SKIP LOCKED para que não disputem as mesmas linhas.
+O resultado só é gravado com o claim_token da reserva: um worker cujo lease
+expirou descarta o lote em vez de sobrescrever o de quem reservou de novo.
+"""
+from datetime import datetime, timedelta
+import logging
+import random
+import threading
+import time
+import uuid
+
+from sqlalchemy import delete, func, select, update
+
+from app.database import db
+from app.metrics import observe_outbox_job
+from app.models.outbox_job import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+FAILED = 'failed'
+
+# Resultado descartado: a reserva expirou e outro worker reservou a tarefa
+LEASE_LOST = 'lease_lost'
+
+# Resultados informados pelos handlers
+DONE = 'done'
+RETRY = 'retry'
+
+
+class OutboxService:
+    """Operações sobre a tabela outbox_jobs"""
+
+    @staticmethod
+    def enqueue(kind, order, payload=None):
+        """
+        Adiciona uma tarefa à sessão atual (gravada no commit do pedido)
+
+        Args:
+            kind: Tipo da tarefa
+            order: Pedido relacionado
+            payload: Dados da tarefa (JSON)
+
+        Returns:
+            OutboxJob: Tarefa criada
+        """
+        job = OutboxJob(kind=kind, order=order, payload=payload)
+        db.session.add(job)
+        return job
+
+    @staticmethod
+    def claim(kind, batch_size, lease_seconds):
+        """
+        Reserva as próximas tarefas disponíveis de um tipo
+
+        Args:
+            kind: Tipo da tarefa
+            batch_size: Máximo de tarefas reservadas
+            lease_seconds: Duração da reserva
+
+        Returns:
+            list: Tarefas reservadas (attempts já incrementado)
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+
+        candidates = db.session.execute(
+            select(OutboxJob.id)
+            .where(OutboxJob.kind == kind, OutboxJob.status == PENDING, OutboxJob.available_at <= now)
+            .order_by(OutboxJob.available_at, OutboxJob.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        if not candidates:
+            db.session.commit()
+            return []
+
+        db.session.execute(
+            update(OutboxJob)
+            .where(OutboxJob.id.in_(candidates), OutboxJob.status == PENDING, OutboxJob.available_at <= now)
+            .values(
+                available_at=now + timedelta(seconds=lease_seconds),
+                attempts=OutboxJob.attempts + 1,
+                claim_token=token
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return db.session.execute(
+            select(OutboxJob).where(OutboxJob.claim_token == token).order_by(OutboxJob.id)
+        ).scalars().all()
+
+    @staticmethod
+    def retry_delay(attempts, base, maximum):
+        """
+        Espera antes da próxima tentativa (backoff exponencial com jitter)
+
+        Args:
+            attempts: Tentativas já feitas
+            base: Espera após a primeira falha (segundos)
+            maximum: Espera máxima (segundos)
+
+        Returns:
+            float: Segundos até a próxima tentativa
+        """
+        return min(maximum, base * (2 ** (attempts - 1))) * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def finish(jobs, outcomes, claim_tokens, max_attempts, backoff, backoff_max):
+        """
+        Registra o resultado das tarefas na sessão atual (o commit é do chamador)
+
+        Cada UPDATE/DELETE é condicionado ao claim_token da reserva: se o
+        lease expirou e outro worker reservou a tarefa de novo, nada é
+        gravado e a tarefa volta como LEASE_LOST (o chamador deve descartar
+        o lote com rollback, já que o resultado do outro worker prevalece).
+
+        Args:
+            jobs: Tarefas reservadas
+            outcomes: {job.id: (resultado, erro)} com resultado DONE ou RETRY
+            claim_tokens: {job.id: claim_token} lidos na reserva
+            max_attempts: Tentativas até marcar a tarefa como failed
+            backoff: Espera após a primeira falha (segundos)
+            backoff_max: Espera máxima entre tentativas (segundos)
+
+        Returns:
+            list: (id da tarefa, resultado final) com resultado done, retry, failed ou lease_lost
+        """
+        now = datetime.utcnow()
+        finished = []
+
+        for job in jobs:
+            outcome, error = outcomes.get(job.id, (RETRY, 'Tarefa não processada'))
+            owned = (OutboxJob.id == job.id, OutboxJob.claim_token == claim_tokens[job.id])
+
+            if outcome == DONE:
+                statement = delete(OutboxJob).where(*owned)
+            elif job.attempts >= max_attempts:
+                outcome = FAILED
+                statement = update(OutboxJob).where(*owned).values(status=FAILED, last_error=(error or '')[:255])
+            else:
+                statement = update(OutboxJob).where(*owned).values(
+                    available_at=now + timedelta(seconds=OutboxService.retry_delay(job.attempts, backoff, backoff_max)),
+                    claim_token=None,
+                    last_error=(error or '')[:255]
+                )
+
+            if not db.session.execute(statement.execution_options(synchronize_session=False)).rowcount:
+                outcome = LEASE_LOST
+                logger.warning(f"Reserva da tarefa {job.kind} do pedido {job.order_id} expirou antes do fim do processamento")
+            elif outcome == FAILED:
+                logger.error(f"Tarefa {job.kind} do pedido {job.order_id} falhou após {job.attempts} tentativas: {error}")
+
+            finished.append((job.id, outcome))
+
+        return finished
+
+    @staticmethod
+    def requeue_failed(kind=None):
+        """
+        Devolve à fila as tarefas que esgotaram as tentativas
+
+        Args:
+            kind: Tipo da tarefa (None = todos)
+
+        Returns:
+            int: Quantidade de tarefas devolvidas
+        """
+        statement = update(OutboxJob).where(OutboxJob.status == FAILED).values(
+            status=PENDING, attempts=0, available_at=datetime.utcnow(), claim_token=None
+        )
+        if kind is not None:
+            statement = statement.where(OutboxJob.kind == kind)
+
+        count = db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+        db.session.commit()
+        return count
+
+    @staticmethod
+    def stats():
+        """
+        Retorna a profundidade da fila e o atraso por tipo de tarefa
+
+        Returns:
+            dict: {kind: {'pending', 'failed', 'oldest_pending_age_seconds'}}
+        """
+        rows = db.session.execute(
+            select(OutboxJob.kind, OutboxJob.status, func.count(), func.min(OutboxJob.created_at))
+            .group_by(OutboxJob.kind, OutboxJob.status)
+        ).all()
+
+        now = datetime.utcnow()
+        stats = {}
+        for kind, status, count, oldest in rows:
+            entry = stats.setdefault(kind, {PENDING: 0, FAILED: 0, 'oldest_pending_age_seconds': 0.0})
+            entry[status] = count
+            if status == PENDING and oldest is not None:
+                entry['oldest_pending_age_seconds'] = round(max((now - oldest).total_seconds(), 0.0), 3)
+        return stats
+
+
+class OutboxWorker:
+    """Pool de threads que drena a outbox em lotes"""
+
+    def __init__(self, app, kind, handler, threads=2, batch_size=50, poll_interval=1.0,
+                 lease_seconds=60, max_attempts=8, backoff=5.0, backoff_max=600.0):
+        """
+        Args:
+            app: Instância do Flask
+            kind: Tipo de tarefa processado
+            handler: Função que recebe a lista de tarefas e retorna {job.id: (DONE|RETRY, erro)}
+            threads: Threads reservando e processando lotes em paralelo
+            batch_size: Tarefas por lote
+            poll_interval: Espera quando a fila está vazia (segundos)
+            lease_seconds: Duração da reserva de um lote (maior que o tempo de processamento)
+            max_attempts: Tentativas até marcar a tarefa como failed
+            backoff: Espera após a primeira falha (segundos)
+            backoff_max: Espera máxima entre tentativas (segundos)
+        """
+        self.app = app
+        self.kind = kind
+        self.handler = handler
+        self.threads = threads
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._stop = threading.Event()
+
+    def run_once(self):
+        """
+        Reserva e processa um lote (requer contexto de aplicação)
+
+        Returns:
+            int: Quantidade de tarefas processadas
+        """
+        try:
+            jobs = OutboxService.claim(self.kind, self.batch_size, self.lease_seconds)
+            if not jobs:
+                return 0
+
+            # Dados das tarefas antes do handler (um rollback expira os objetos)
+            claim_tokens = {job.id: job.claim_token for job in jobs}
+            created = {job.id: job.created_at for job in jobs}
+
+            try:
+                outcomes = self.handler(jobs)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro ao processar lote de {self.kind}: {str(e)}")
+                outcomes = {job.id: (RETRY, str(e)) for job in jobs}
+
+            finished = OutboxService.finish(
+                jobs, outcomes, claim_tokens, self.max_attempts, self.backoff, self.backoff_max
+            )
+            if any(outcome == LEASE_LOST for _, outcome in finished):
+                # Outro worker já reprocessa o lote; as tarefas ainda reservadas voltam ao fim do lease
+                db.session.rollback()
+                finished = [(job_id, LEASE_LOST) for job_id, _ in finished]
+            else:
+                db.session.commit()
+
+            now = datetime.utcnow()
+            for job_id, outcome in finished:
+                observe_outbox_job(self.kind, outcome, (now - created[job_id]).total_seconds())
+
+            return len(jobs)
+        finally:
+            db.session.remove()
+
+    def _loop(self):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    processed = self.run_once()
+                except Exception as e:
+                    logger.error(f"Erro no worker da outbox ({self.kind}): {str(e)}")
+                    processed = 0
+                if processed < self.batch_size:
+                    self._stop.wait(self.poll_interval)
+
+    def run(self):
+        """Executa as threads até stop() (ou Ctrl+C)"""
+        workers = [
+            threading.Thread(target=self._loop, name=f"outbox-{self.kind}-{index}", daemon=True)
+            for index in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+
+        logger.info(f"Worker da outbox iniciado: {self.kind} ({self.threads} threads, lotes de {self.batch_size})")
+        try:
+            while any(worker.is_alive() for worker in workers):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            self.stop()
+
+        for worker in workers:
+            worker.join()
+
+    def stop(self):
+        """Pede para as threads terminarem após o lote atual"""
+        self._stop.set()
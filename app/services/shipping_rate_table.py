@@ -0,0 +1,227 @@
+"""
+Tabela de frete por faixas de CEP (modelo das transportadoras)
+
+Formato do arquivo (CSV, JSON ou JSONL), uma faixa por registro:
+    - cep_start, cep_end: limites da faixa (inclusivos, 8 dígitos)
+    - cost: valor do frete em reais
+    - days: prazo de entrega em dias úteis
+    - free_shipping_threshold (opcional): valor mínimo para frete grátis;
+      vazio usa SHIPPING_FREE_THRESHOLD e "none" desativa o frete grátis
+    - region (opcional): rótulo da faixa (ex.: "SP Capital")
+
+Faixas podem se sobrepor (ex.: capital dentro da faixa do estado): vale a
+faixa mais estreita e, em empate, a que aparece depois no arquivo. Na carga
+as faixas são compiladas em intervalos disjuntos e ordenados, guardados em
+arrays paralelos; cada cotação é um bisect sobre os inícios dos intervalos.
+"""
+from array import array
+from bisect import bisect_right
+import csv
+import heapq
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Limite de frete grátis desativado
+NO_FREE_SHIPPING = float('inf')
+
+
+def _read_ranges(source_path):
+    """
+    Lê as faixas de um arquivo CSV, JSON (lista) ou JSONL
+
+    Args:
+        source_path: Caminho do arquivo
+
+    Returns:
+        iterable: Dicionários com os campos da faixa
+    """
+    extension = os.path.splitext(source_path)[1].lower()
+
+    if extension == '.csv':
+        with open(source_path, newline='', encoding='utf-8') as source:
+            yield from csv.DictReader(source)
+
+    elif extension == '.jsonl':
+        with open(source_path, encoding='utf-8') as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+    elif extension == '.json':
+        with open(source_path, encoding='utf-8') as source:
+            yield from json.load(source)
+
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {extension}")
+
+
+def _parse_cep(value):
+    clean_cep = ''.join(filter(str.isdigit, str(value or '')))
+    if len(clean_cep) != 8:
+        raise ValueError(f"CEP inválido na tabela de frete: {value!r}")
+    return int(clean_cep)
+
+
+def _parse_threshold(value, default_threshold):
+    if value is None or str(value).strip() == '':
+        return default_threshold
+    if str(value).strip().lower() == 'none':
+        return NO_FREE_SHIPPING
+    return float(value)
+
+
+class ShippingRateTable:
+    """Cotação de frete por busca binária em intervalos de CEP pré-compilados"""
+
+    def __init__(self, ranges, default_threshold=200.0):
+        """
+        Compila as faixas em intervalos disjuntos
+
+        Args:
+            ranges: Dicionários com cep_start, cep_end, cost, days,
+                free_shipping_threshold (opcional) e region (opcional)
+            default_threshold: Limite de frete grátis das faixas sem valor próprio
+        """
+        parsed = []
+        for line, record in enumerate(ranges, start=1):
+            try:
+                start = _parse_cep(record.get('cep_start'))
+                end = _parse_cep(record.get('cep_end'))
+                if start > end:
+                    raise ValueError(f"cep_start maior que cep_end ({start:08d} > {end:08d})")
+                parsed.append((
+                    start, end,
+                    float(record['cost']),
+                    int(record['days']),
+                    _parse_threshold(record.get('free_shipping_threshold'), default_threshold),
+                    str(record.get('region') or '')
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Faixa {line} da tabela de frete inválida: {str(e)}") from e
+
+        self.range_count = len(parsed)
+        self._compile(parsed)
+
+    def _compile(self, parsed):
+        """
+        Varre os limites das faixas em ordem, escolhendo para cada trecho
+        a faixa ativa mais estreita (heap), e funde trechos vizinhos da
+        mesma faixa
+
+        Args:
+            parsed: Tuplas (início, fim, valor, prazo, limite, região)
+        """
+        boundaries = sorted({start for start, *_ in parsed} | {end + 1 for _, end, *_ in parsed})
+        by_start = sorted(range(len(parsed)), key=lambda index: parsed[index][0])
+
+        starts, ends, owners = [], [], []
+        active = []
+        cursor = 0
+
+        for position, point in enumerate(boundaries[:-1]):
+            while cursor < len(by_start) and parsed[by_start[cursor]][0] == point:
+                index = by_start[cursor]
+                start, end = parsed[index][:2]
+                heapq.heappush(active, (end - start, -index))
+                cursor += 1
+
+            # Remoção preguiçosa das faixas que já terminaram
+            while active and parsed[-active[0][1]][1] < point:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            owner = -active[0][1]
+            segment_end = boundaries[position + 1] - 1
+            if owners and owners[-1] == owner and ends[-1] == point - 1:
+                ends[-1] = segment_end
+            else:
+                starts.append(point)
+                ends.append(segment_end)
+                owners.append(owner)
+
+        self._starts = array('I', starts)
+        self._ends = array('I', ends)
+        self._costs = array('d', (parsed[owner][2] for owner in owners))
+        self._days = array('H', (parsed[owner][3] for owner in owners))
+        self._thresholds = array('d', (parsed[owner][4] for owner in owners))
+        self._regions = [parsed[owner][5] for owner in owners]
+
+    @classmethod
+    def load(cls, source_path, default_threshold=200.0):
+        """
+        Carrega e compila uma tabela de faixas
+
+        Args:
+            source_path: Caminho do arquivo (.csv, .json ou .jsonl)
+            default_threshold: Limite de frete grátis das faixas sem valor próprio
+
+        Returns:
+            ShippingRateTable: Tabela compilada
+        """
+        table = cls(_read_ranges(source_path), default_threshold)
+        logger.info(
+            f"Tabela de frete por CEP carregada: {table.range_count} faixas, "
+            f"{len(table)} intervalos ({source_path})"
+        )
+        return table
+
+    def lookup(self, clean_cep):
+        """
+        Busca a faixa de um CEP
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            dict: cost, days, free_shipping_threshold (None = sem frete grátis)
+                e region, ou None se nenhuma faixa cobre o CEP
+        """
+        cep = int(clean_cep)
+        position = bisect_right(self._starts, cep) - 1
+        if position < 0 or cep > self._ends[position]:
+            return None
+
+        threshold = self._thresholds[position]
+        return {
+            'cost': self._costs[position],
+            'days': self._days[position],
+            'free_shipping_threshold': None if threshold == NO_FREE_SHIPPING else threshold,
+            'region': self._regions[position]
+        }
+
+    def lookup_many(self, clean_ceps):
+        """
+        Busca as faixas de vários CEPs, consultando cada CEP distinto uma vez
+
+        Args:
+            clean_ceps: CEPs com 8 dígitos
+
+        Returns:
+            dict: {clean_cep: mesmo retorno de lookup}
+        """
+        starts, ends = self._starts, self._ends
+        costs, days, thresholds, regions = self._costs, self._days, self._thresholds, self._regions
+        results = {}
+
+        for clean_cep in set(clean_ceps):
+            cep = int(clean_cep)
+            position = bisect_right(starts, cep) - 1
+            if position < 0 or cep > ends[position]:
+                results[clean_cep] = None
+                continue
+
+            threshold = thresholds[position]
+            results[clean_cep] = {
+                'cost': costs[position],
+                'days': days[position],
+                'free_shipping_threshold': None if threshold == NO_FREE_SHIPPING else threshold,
+                'region': regions[position]
+            }
+        return results
+
+    def __len__(self):
+        return len(self._starts)
@@ -4,6 +4,8 @@ Serviço de cálculo de frete
 import logging
 from flask import current_app
 
+from app.services.shipping_rate_table import ShippingRateTable
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,53 +13,136 @@ class ShippingService:
     """Serviço para calcular o valor do frete baseado no CEP"""
 
     @staticmethod
-    def calculate_shipping(state, total_amount=0):
+    def get_rate_table():
+        """
+        Retorna a tabela de frete por faixas de CEP da aplicação (carregada sob demanda)
+
+        Returns:
+            ShippingRateTable: Tabela compilada ou None se não configurada
+        """
+        if 'shipping_rate_table' not in current_app.extensions:
+            table = None
+            table_path = current_app.config.get('SHIPPING_RATE_TABLE_PATH')
+            if table_path:
+                try:
+                    table = ShippingRateTable.load(table_path, ShippingService._free_shipping_threshold())
+                except (OSError, ValueError) as e:
+                    logger.error(f"Erro ao carregar tabela de frete por CEP: {str(e)}")
+            current_app.extensions['shipping_rate_table'] = table
+        return current_app.extensions['shipping_rate_table']
+
+    @staticmethod
+    def _free_shipping_threshold():
+        return float(current_app.config.get('SHIPPING_FREE_THRESHOLD', 200.00))
+
+    @staticmethod
+    def _lookup_range(cep):
+        """
+        Busca a faixa de CEP que cobre o destino
+
+        Args:
+            cep: CEP de destino (com ou sem formatação) ou None
+
+        Returns:
+            dict: Dados da faixa ou None (sem tabela, CEP inválido ou fora das faixas)
+        """
+        if not cep:
+            return None
+        table = ShippingService.get_rate_table()
+        clean_cep = ''.join(filter(str.isdigit, str(cep)))
+        if table is None or len(clean_cep) != 8:
+            return None
+        return table.lookup(clean_cep)
+
+    @staticmethod
+    def _rate_terms(state, cep, rate):
         """
-        Calcula o valor do frete baseado no estado de destino
+        Reúne valor, limite de frete grátis e prazo de um destino
+
+        Args:
+            state: Sigla do estado (UF) já normalizada
+            cep: CEP de destino ou None
+            rate: Faixa do CEP na tabela ou None (vale o valor do estado)
+
+        Returns:
+            dict: info (campos fixos da resposta), cost, threshold, label e days
+        """
+        if rate is not None:
+            return {
+                'info': {'state': state, 'cep': cep, 'region': rate['region'], 'source': 'cep_range'},
+                'cost': rate['cost'],
+                'threshold': rate['free_shipping_threshold'],
+                'label': rate['region'] or cep,
+                'days': rate['days']
+            }
+
+        # Obter tabela de valores de frete da configuração
+        shipping_rates = current_app.config.get('SHIPPING_RATES', {
+            'SP': 10.00,
+            'RJ': 15.00,
+            'MG': 15.00,
+            'ES': 20.00,
+            'default': 25.00
+        })
+        delivery_days = current_app.config.get('SHIPPING_DELIVERY_DAYS', {'default': 7})
+
+        return {
+            'info': {'state': state, 'source': 'state'},
+            'cost': shipping_rates.get(state, shipping_rates.get('default', 25.00)),
+            'threshold': ShippingService._free_shipping_threshold(),
+            'label': state,
+            'days': delivery_days.get(state, delivery_days.get('default', 7))
+        }
+
+    @staticmethod
+    def _quote(terms, total_amount):
+        """Aplica a regra de frete grátis (SHIPPING_FREE_THRESHOLD ou limite da faixa) ao valor do destino"""
+        threshold = terms['threshold']
+        if threshold is not None and total_amount >= threshold:
+            return {
+                **terms['info'],
+                'original_cost': terms['cost'],
+                'final_cost': 0.00,
+                'free_shipping': True,
+                'message': f'Frete grátis para compras acima de R$ {threshold:.2f}'
+            }
+
+        return {
+            **terms['info'],
+            'original_cost': terms['cost'],
+            'final_cost': terms['cost'],
+            'free_shipping': False,
+            'message': f'Valor do frete para {terms["label"]}'
+        }
+
+    @staticmethod
+    def calculate_shipping(state, total_amount=0, cep=None):
+        """
+        Calcula o valor do frete baseado no destino
+
+        Com SHIPPING_RATE_TABLE_PATH configurado, o CEP é cotado pela faixa
+        que o cobre; sem tabela ou sem faixa, vale o valor do estado.
 
         Args:
             state: Sigla do estado (UF)
             total_amount: Valor total dos produtos (para possíveis descontos)
+            cep: CEP de destino (opcional)
 
         Returns:
             dict: Informações do frete
         """
         try:
-            # Obter tabela de valores de frete da configuração
-            shipping_rates = current_app.config.get('SHIPPING_RATES', {
-                'SP': 10.00,
-                'RJ': 15.00,
-                'MG': 15.00,
-                'ES': 20.00,
-                'default': 25.00
-            })
-
             # Normalizar estado para uppercase
             state = state.upper() if state else ''
 
-            # Buscar valor do frete para o estado
-            shipping_cost = shipping_rates.get(state, shipping_rates.get('default', 25.00))
+            terms = ShippingService._rate_terms(state, cep, ShippingService._lookup_range(cep))
+            shipping_info = ShippingService._quote(terms, total_amount)
 
-            # Regra: Frete grátis para compras acima de R$ 200,00
-            free_shipping_threshold = 200.00
-            if total_amount >= free_shipping_threshold:
+            if shipping_info['free_shipping']:
                 logger.info(f"Frete grátis aplicado para pedido de R$ {total_amount}")
-                return {
-                    'state': state,
-                    'original_cost': shipping_cost,
-                    'final_cost': 0.00,
-                    'free_shipping': True,
-                    'message': f'Frete grátis para compras acima de R$ {free_shipping_threshold:.2f}'
-                }
-
-            logger.info(f"Frete calculado: R$ {shipping_cost} para {state}")
-            return {
-                'state': state,
-                'original_cost': shipping_cost,
-                'final_cost': shipping_cost,
-                'free_shipping': False,
-                'message': f'Valor do frete para {state}'
-            }
+            else:
+                logger.info(f"Frete calculado: R$ {shipping_info['final_cost']} para {terms['label']}")
+            return shipping_info
 
         except Exception as e:
             logger.error(f"Erro ao calcular frete: {str(e)}")
@@ -73,30 +158,60 @@ class ShippingService:
             }
 
     @staticmethod
-    def get_shipping_estimate_days(state):
+    def get_shipping_estimate_days(state, cep=None):
         """
-        Estima o prazo de entrega em dias úteis baseado no estado
+        Estima o prazo de entrega em dias úteis baseado no destino
 
         Args:
             state: Sigla do estado (UF)
+            cep: CEP de destino (opcional, usa o prazo da faixa de CEP)
 
         Returns:
             int: Número estimado de dias úteis para entrega
         """
-        # Prazos estimados por região (em dias úteis)
-        delivery_days = {
-            'SP': 2,
-            'RJ': 3,
-            'MG': 3,
-            'ES': 4,
-            'PR': 4,
-            'SC': 5,
-            'RS': 5,
-            'default': 7
-        }
-
         state = state.upper() if state else ''
-        return delivery_days.get(state, delivery_days.get('default', 7))
+        return ShippingService._rate_terms(state, cep, ShippingService._lookup_range(cep))['days']
+
+    @staticmethod
+    def calculate_shipping_many(destinations):
+        """
+        Cota o frete de vários destinos de uma vez (simulação de carrinhos)
+
+        As faixas dos CEPs distintos são buscadas em uma única passada pela
+        tabela e os valores de cada destino (CEP ou estado) são calculados
+        uma vez; cada par só aplica a regra de frete grátis ao seu total.
+
+        Args:
+            destinations: Lista de (state, cep, total_amount)
+
+        Returns:
+            list: Mesmo formato de calculate_shipping com estimated_delivery_days, na ordem recebida
+        """
+        table = ShippingService.get_rate_table()
+        clean_ceps = {}
+        for _, cep, _ in destinations:
+            if cep:
+                clean_cep = ''.join(filter(str.isdigit, str(cep)))
+                if len(clean_cep) == 8:
+                    clean_ceps[cep] = clean_cep
+
+        ranges = table.lookup_many(clean_ceps.values()) if table is not None else {}
+
+        terms_by_destination = {}
+        quotes = []
+        for state, cep, total_amount in destinations:
+            state = state.upper() if state else ''
+            key = (state, cep)
+            if key not in terms_by_destination:
+                rate = ranges.get(clean_ceps.get(cep))
+                terms_by_destination[key] = ShippingService._rate_terms(state, cep, rate)
+
+            terms = terms_by_destination[key]
+            quote = ShippingService._quote(terms, total_amount)
+            quote['estimated_delivery_days'] = terms['days']
+            quotes.append(quote)
+
+        return quotes
 
     @staticmethod
     def get_all_shipping_rates():
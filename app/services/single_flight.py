@@ -0,0 +1,135 @@
+"""
+Coalescência de chamadas concorrentes idênticas (single-flight)
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    """Chamada em andamento compartilhada entre os chamadores da mesma chave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Garante uma única execução em andamento por chave
+
+    Enquanto a função de uma chave estiver executando, outros chamadores da
+    mesma chave aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Executa `fn` para a chave, ou aguarda a execução em andamento
+
+        Args:
+            key: Chave da chamada (ex.: CEP limpo)
+            fn: Função sem argumentos a ser executada
+
+        Returns:
+            tuple: (resultado, shared) onde shared indica se a chamada foi coalescida
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self):
+        """
+        Retorna os contadores de coalescência
+
+        Returns:
+            dict: Execuções reais, chamadas coalescidas e chamadas em andamento
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+class AsyncSingleFlight:
+    """
+    Versão de SingleFlight para corrotinas (um event loop por processo)
+
+    Os chamadores da mesma chave aguardam a mesma tarefa, sem ocupar threads.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Executa a corrotina de `fn` para a chave, ou aguarda a execução em andamento
+
+        Args:
+            key: Chave da chamada (ex.: CEP limpo)
+            fn: Função sem argumentos que retorna a corrotina a ser executada
+
+        Returns:
+            tuple: (resultado, shared) onde shared indica se a chamada foi coalescida
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            # shield: o cancelamento de um chamador não cancela a consulta dos demais
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        self.executions += 1
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task), False
+
+    def stats(self):
+        """
+        Retorna os contadores de coalescência
+
+        Returns:
+            dict: Execuções reais, chamadas coalescidas e chamadas em andamento
+        """
+        return {
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
@@ -3,10 +3,21 @@ Serviço de integração com a API ViaCEP
 """
 import requests
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from app.services.cep_cache import CEPCache
+from app.services.cep_directory import CEPDirectory
+from app.services.http_client import ResilientHTTPClient, CircuitOpenError
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+from app.metrics import observe_viacep
 
 logger = logging.getLogger(__name__)
 
+# Erros definitivos: repetir a consulta não muda o resultado
+CEP_INVALID_ERROR = 'CEP deve conter 8 dígitos'
+CEP_NOT_FOUND_ERROR = 'CEP não encontrado'
+
 
 class ViaCEPService:
     """Serviço para validar e buscar informações de CEP"""
@@ -24,6 +35,119 @@ class ViaCEPService:
         """
         return ''.join(filter(str.isdigit, cep))
 
+    @staticmethod
+    def get_cache():
+        """
+        Retorna o cache de CEPs da aplicação atual (criado sob demanda)
+
+        Returns:
+            CEPCache: Cache compartilhado pelas requisições do processo
+        """
+        cache = current_app.extensions.get('cep_cache')
+        if cache is None:
+            cache = CEPCache(
+                max_size=current_app.config.get('CEP_CACHE_MAX_SIZE', 10000),
+                ttl=current_app.config.get('CEP_CACHE_TTL', 86400),
+                negative_ttl=current_app.config.get('CEP_CACHE_NEGATIVE_TTL', 600)
+            )
+            current_app.extensions['cep_cache'] = cache
+        return cache
+
+    @staticmethod
+    def get_single_flight():
+        """
+        Retorna o coordenador de consultas em andamento da aplicação atual
+
+        Returns:
+            SingleFlight: Coalescência de consultas simultâneas do mesmo CEP
+        """
+        flight = current_app.extensions.get('cep_single_flight')
+        if flight is None:
+            flight = current_app.extensions.setdefault('cep_single_flight', SingleFlight())
+        return flight
+
+    @staticmethod
+    def get_http_client():
+        """
+        Retorna o cliente HTTP do ViaCEP da aplicação atual (criado sob demanda)
+
+        Returns:
+            ResilientHTTPClient: Cliente com pool keep-alive, retries e circuit breaker
+        """
+        client = current_app.extensions.get('viacep_client')
+        if client is None:
+            config = current_app.config
+            client = ResilientHTTPClient(
+                connect_timeout=config.get('VIACEP_CONNECT_TIMEOUT', 2.0),
+                read_timeout=config.get('VIACEP_READ_TIMEOUT', 3.0),
+                max_retries=config.get('VIACEP_MAX_RETRIES', 2),
+                backoff_factor=config.get('VIACEP_RETRY_BACKOFF', 0.1),
+                pool_maxsize=config.get('VIACEP_POOL_MAXSIZE', 20),
+                failure_threshold=config.get('VIACEP_CIRCUIT_FAILURE_THRESHOLD', 5),
+                reset_timeout=config.get('VIACEP_CIRCUIT_RESET_TIMEOUT', 30)
+            )
+            current_app.extensions['viacep_client'] = client
+        return client
+
+    @staticmethod
+    def get_async_single_flight():
+        """
+        Retorna o coordenador de consultas assíncronas em andamento da aplicação atual
+
+        Returns:
+            AsyncSingleFlight: Coalescência de consultas simultâneas do mesmo CEP no event loop
+        """
+        flight = current_app.extensions.get('cep_async_single_flight')
+        if flight is None:
+            flight = current_app.extensions.setdefault('cep_async_single_flight', AsyncSingleFlight())
+        return flight
+
+    @staticmethod
+    def get_async_http_client():
+        """
+        Retorna o cliente HTTP assíncrono do ViaCEP da aplicação atual (criado sob demanda)
+
+        Returns:
+            AsyncResilientHTTPClient: Cliente httpx com retries e circuit breaker
+        """
+        client = current_app.extensions.get('viacep_async_client')
+        if client is None:
+            from app.services.async_http_client import AsyncResilientHTTPClient
+
+            config = current_app.config
+            client = AsyncResilientHTTPClient(
+                max_connections=config.get('VIACEP_ASYNC_MAX_CONNECTIONS', 100),
+                connect_timeout=config.get('VIACEP_CONNECT_TIMEOUT', 2.0),
+                read_timeout=config.get('VIACEP_READ_TIMEOUT', 3.0),
+                max_retries=config.get('VIACEP_MAX_RETRIES', 2),
+                backoff_factor=config.get('VIACEP_RETRY_BACKOFF', 0.1),
+                pool_maxsize=config.get('VIACEP_POOL_MAXSIZE', 20),
+                failure_threshold=config.get('VIACEP_CIRCUIT_FAILURE_THRESHOLD', 5),
+                reset_timeout=config.get('VIACEP_CIRCUIT_RESET_TIMEOUT', 30)
+            )
+            current_app.extensions['viacep_async_client'] = client
+        return client
+
+    @staticmethod
+    def get_directory():
+        """
+        Retorna o diretório offline de CEPs, se configurado (aberto sob demanda)
+
+        Returns:
+            CEPDirectory: Índice mapeado em memória ou None
+        """
+        if 'cep_directory' not in current_app.extensions:
+            directory = None
+            index_path = current_app.config.get('CEP_DIRECTORY_PATH')
+            if index_path:
+                try:
+                    directory = CEPDirectory(index_path)
+                    logger.info(f"Diretório de CEPs carregado: {len(directory)} registros")
+                except (OSError, ValueError) as e:
+                    logger.error(f"Erro ao abrir diretório de CEPs {index_path}: {str(e)}")
+            current_app.extensions['cep_directory'] = directory
+        return current_app.extensions['cep_directory']
+
     @staticmethod
     def validate_and_get_address(cep):
         """
@@ -35,53 +159,254 @@ class ViaCEPService:
         Returns:
             dict: Dados do endereço ou None se inválido
         """
-        try:
-            # Limpar CEP
-            clean_cep = ViaCEPService._clean_cep(cep)
+        clean_cep = ViaCEPService._clean_cep(cep)
+        result = ViaCEPService._resolve_locally(cep, clean_cep)
+        if result is not None:
+            return result
+
+        # Consultas simultâneas do mesmo CEP aguardam uma única chamada ao ViaCEP
+        result, _ = ViaCEPService.get_single_flight().do(
+            clean_cep,
+            lambda: ViaCEPService._fetch_and_cache(clean_cep)
+        )
+        return result.copy()
+
+    @staticmethod
+    async def validate_and_get_address_async(cep):
+        """
+        Versão assíncrona de validate_and_get_address (consulta ao ViaCEP via httpx)
+
+        Args:
+            cep: CEP a ser validado (com ou sem formatação)
+
+        Returns:
+            dict: Dados do endereço ou erro (mesmo formato da versão síncrona)
+        """
+        clean_cep = ViaCEPService._clean_cep(cep)
+        result = ViaCEPService._resolve_locally(cep, clean_cep)
+        if result is not None:
+            return result
 
-            # Validar formato
-            if len(clean_cep) != 8:
-                logger.warning(f"CEP inválido (comprimento incorreto): {cep}")
+        result, _ = await ViaCEPService.get_async_single_flight().do(
+            clean_cep,
+            lambda: ViaCEPService._fetch_and_cache_async(clean_cep)
+        )
+        return result.copy()
+
+    @staticmethod
+    def validate_locally(cep):
+        """
+        Valida um CEP sem acesso à rede (formato, diretório offline e cache)
+
+        Args:
+            cep: CEP a ser validado (com ou sem formatação)
+
+        Returns:
+            dict: Resultado no formato de validate_and_get_address ou None se
+            for preciso consultar o ViaCEP
+        """
+        return ViaCEPService._resolve_locally(cep, ViaCEPService._clean_cep(cep))
+
+    @staticmethod
+    def is_definitive(result):
+        """
+        Indica se o resultado de uma validação é definitivo
+
+        Args:
+            result: Retorno de validate_and_get_address
+
+        Returns:
+            bool: True para endereço encontrado, CEP inexistente ou mal formatado;
+            False para falhas temporárias (timeout, circuito aberto, erro HTTP)
+        """
+        return bool(result.get('valid')) or result.get('error') in (CEP_INVALID_ERROR, CEP_NOT_FOUND_ERROR)
+
+    @staticmethod
+    def _resolve_locally(cep, clean_cep):
+        """
+        Resolve o CEP sem acesso à rede (formato, diretório offline e cache)
+
+        Args:
+            cep: CEP informado
+            clean_cep: CEP apenas com números
+
+        Returns:
+            dict: Resultado da validação ou None se for preciso consultar o ViaCEP
+        """
+        # Validar formato
+        if len(clean_cep) != 8:
+            logger.warning(f"CEP inválido (comprimento incorreto): {cep}")
+            return {
+                'valid': False,
+                'error': CEP_INVALID_ERROR
+            }
+
+        # Consultar o diretório offline (fonte primária, quando configurado)
+        directory = ViaCEPService.get_directory()
+        if directory is not None:
+            data = directory.lookup(clean_cep)
+            if data is not None:
+                return ViaCEPService._format_address(clean_cep, data)
+
+            if not current_app.config.get('CEP_DIRECTORY_HTTP_FALLBACK', True):
+                logger.warning(f"CEP não encontrado no diretório: {clean_cep}")
                 return {
                     'valid': False,
-                    'error': 'CEP deve conter 8 dígitos'
+                    'error': CEP_NOT_FOUND_ERROR
                 }
 
+        # Consultar cache antes de ir à rede
+        cached = ViaCEPService.get_cache().get(clean_cep)
+        if cached is not None:
+            return cached.copy()
+
+        return None
+
+    @staticmethod
+    def _fetch_and_cache(clean_cep):
+        """
+        Consulta o ViaCEP e armazena no cache as respostas definitivas
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            dict: Dados do endereço ou erro
+        """
+        return ViaCEPService._store(clean_cep, ViaCEPService._fetch_address(clean_cep))
+
+    @staticmethod
+    async def _fetch_and_cache_async(clean_cep):
+        """Versão assíncrona de _fetch_and_cache"""
+        return ViaCEPService._store(clean_cep, await ViaCEPService._fetch_address_async(clean_cep))
+
+    @staticmethod
+    def _store(clean_cep, result):
+        """
+        Armazena no cache as respostas definitivas (endereço ou CEP inexistente)
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+            result: Resultado da consulta ao ViaCEP
+
+        Returns:
+            dict: O mesmo resultado, sem a marcação interna not_found
+        """
+        cache = ViaCEPService.get_cache()
+        if result.get('valid'):
+            cache.set(clean_cep, result.copy())
+        elif result.get('not_found'):
+            result.pop('not_found')
+            cache.set(clean_cep, result.copy(), negative=True)
+
+        return result
+
+    @staticmethod
+    def validate_many(ceps, max_workers=None):
+        """
+        Valida vários CEPs em paralelo, consultando cada CEP distinto uma única vez
+
+        Args:
+            ceps: Lista de CEPs (com ou sem formatação)
+            max_workers: Limite de consultas simultâneas (padrão: CEP_BATCH_CONCURRENCY)
+
+        Returns:
+            dict: Resultado de validate_and_get_address indexado pelo CEP informado
+        """
+        app = current_app._get_current_object()
+        if max_workers is None:
+            max_workers = app.config.get('CEP_BATCH_CONCURRENCY', 10)
+
+        # Remover duplicados (mesmo CEP com formatações diferentes)
+        unique = {}
+        for cep in ceps:
+            unique.setdefault(ViaCEPService._clean_cep(cep), cep)
+
+        def resolve(cep):
+            with app.app_context():
+                return ViaCEPService.validate_and_get_address(cep)
+
+        workers = max(1, min(max_workers, len(unique)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resolved = dict(zip(unique, executor.map(resolve, unique.values())))
+
+        return {cep: resolved[ViaCEPService._clean_cep(cep)].copy() for cep in ceps}
+
+    @staticmethod
+    def _format_address(clean_cep, data):
+        """
+        Converte os campos do ViaCEP para o formato de resposta da API
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+            data: Dicionário com os campos no formato do ViaCEP
+
+        Returns:
+            dict: Dados do endereço
+        """
+        formatted_cep = f"{clean_cep[:5]}-{clean_cep[5:]}"
+        return {
+            'valid': True,
+            'cep': formatted_cep,
+            'street': data.get('logradouro', ''),
+            'complement': data.get('complemento', ''),
+            'neighborhood': data.get('bairro', ''),
+            'city': data.get('localidade', ''),
+            'state': data.get('uf', ''),
+            'ibge': data.get('ibge', ''),
+            'gia': data.get('gia', ''),
+            'ddd': data.get('ddd', '')
+        }
+
+    @staticmethod
+    def _fetch_address(clean_cep):
+        """
+        Consulta a API ViaCEP para um CEP já limpo
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            dict: Dados do endereço ou erro
+        """
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
             # Buscar na API ViaCEP
             api_url = current_app.config.get('VIACEP_API_URL', 'https://viacep.com.br/ws')
             url = f"{api_url}/{clean_cep}/json/"
 
             logger.info(f"Consultando ViaCEP: {url}")
-            response = requests.get(url, timeout=5)
+            response = ViaCEPService.get_http_client().get(url)
             response.raise_for_status()
 
             data = response.json()
 
             # Verificar se o CEP foi encontrado
             if data.get('erro'):
-                logger.warning(f"CEP não encontrado: {cep}")
+                outcome = 'not_found'
+                logger.warning(f"CEP não encontrado: {clean_cep}")
                 return {
                     'valid': False,
-                    'error': 'CEP não encontrado'
+                    'error': CEP_NOT_FOUND_ERROR,
+                    'not_found': True
                 }
 
             # Formatar resposta
-            formatted_cep = f"{clean_cep[:5]}-{clean_cep[5:]}"
+            outcome = 'found'
+            return ViaCEPService._format_address(clean_cep, data)
+
+        except CircuitOpenError:
+            outcome = 'circuit_open'
+            logger.warning(f"ViaCEP indisponível (circuito aberto), CEP não consultado: {clean_cep}")
             return {
-                'valid': True,
-                'cep': formatted_cep,
-                'street': data.get('logradouro', ''),
-                'complement': data.get('complemento', ''),
-                'neighborhood': data.get('bairro', ''),
-                'city': data.get('localidade', ''),
-                'state': data.get('uf', ''),
-                'ibge': data.get('ibge', ''),
-                'gia': data.get('gia', ''),
-                'ddd': data.get('ddd', '')
+                'valid': False,
+                'error': 'Serviço de CEP temporariamente indisponível. Tente novamente.'
             }
 
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout ao consultar CEP: {cep}")
+            outcome = 'timeout'
+            logger.error(f"Timeout ao consultar CEP: {clean_cep}")
             return {
                 'valid': False,
                 'error': 'Timeout ao consultar CEP. Tente novamente.'
@@ -101,6 +426,79 @@ class ViaCEPService:
                 'error': 'Erro interno ao processar CEP'
             }
 
+        finally:
+            observe_viacep(started, outcome)
+
+    @staticmethod
+    async def _fetch_address_async(clean_cep):
+        """
+        Versão assíncrona de _fetch_address (cliente httpx, sem bloquear o event loop)
+
+        Args:
+            clean_cep: CEP com 8 dígitos
+
+        Returns:
+            dict: Dados do endereço ou erro
+        """
+        import httpx
+
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            api_url = current_app.config.get('VIACEP_API_URL', 'https://viacep.com.br/ws')
+            url = f"{api_url}/{clean_cep}/json/"
+
+            logger.info(f"Consultando ViaCEP: {url}")
+            response = await ViaCEPService.get_async_http_client().get(url)
+            response.raise_for_status()
+
+            data = response.json()
+
+            if data.get('erro'):
+                outcome = 'not_found'
+                logger.warning(f"CEP não encontrado: {clean_cep}")
+                return {
+                    'valid': False,
+                    'error': CEP_NOT_FOUND_ERROR,
+                    'not_found': True
+                }
+
+            outcome = 'found'
+            return ViaCEPService._format_address(clean_cep, data)
+
+        except CircuitOpenError:
+            outcome = 'circuit_open'
+            logger.warning(f"ViaCEP indisponível (circuito aberto), CEP não consultado: {clean_cep}")
+            return {
+                'valid': False,
+                'error': 'Serviço de CEP temporariamente indisponível. Tente novamente.'
+            }
+
+        except httpx.TimeoutException:
+            outcome = 'timeout'
+            logger.error(f"Timeout ao consultar CEP: {clean_cep}")
+            return {
+                'valid': False,
+                'error': 'Timeout ao consultar CEP. Tente novamente.'
+            }
+
+        except httpx.HTTPError as e:
+            logger.error(f"Erro ao consultar ViaCEP: {str(e)}")
+            return {
+                'valid': False,
+                'error': 'Erro ao consultar serviço de CEP'
+            }
+
+        except Exception as e:
+            logger.error(f"Erro inesperado ao validar CEP: {str(e)}")
+            return {
+                'valid': False,
+                'error': 'Erro interno ao processar CEP'
+            }
+
+        finally:
+            observe_viacep(started, outcome)
+
     @staticmethod
     def format_cep(cep):
         """
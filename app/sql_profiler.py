@@ -0,0 +1,281 @@
+"""
+Profiler de SQL por requisição e detector de N+1
+
+Com SQL_PROFILER_ENABLED, cada requisição registra suas queries (texto e
+tempo) e a resposta ganha os cabeçalhos X-SQL-Queries e Server-Timing. Queries
+de leitura (SELECT) com o mesmo formato repetidas SQL_PROFILER_REPEAT_THRESHOLD
+vezes ou mais (ex.: carregamento lazy de items dentro de um loop) são
+apontadas como N+1; escritas repetidas não entram na detecção.
+As últimas requisições ficam em GET /debug/sql.
+
+Rotas podem declarar um limite de queries com @query_budget(n), ampliado
+por extend_query_budget() quando parte das queries depende da entrada. Com
+SQL_PROFILER_RAISE (útil em testes), estourar o limite ou ter N+1 gera
+QueryBudgetExceeded; caso contrário, apenas um aviso no log.
+"""
+from collections import Counter, deque
+from functools import wraps
+import logging
+import re
+import threading
+import time
+
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+from app.query_counter import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_READ = re.compile(r'^\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+
+def normalize_statement(statement):
+    """
+    Reduz uma query ao seu formato (sem valores nem tamanho de listas IN)
+
+    Args:
+        statement: SQL enviado ao banco
+
+    Returns:
+        str: Formato da query
+    """
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _STRING.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    return _PLACEHOLDER_LIST.sub('(?, ...)', shape)
+
+
+def find_repeated(statements, threshold=3):
+    """
+    Encontra formatos de leitura (SELECT) executados várias vezes (padrão N+1)
+
+    INSERT/UPDATE/DELETE repetidos não são apontados: o limite de queries
+    da rota é que controla escritas.
+
+    Args:
+        statements: Queries executadas, na ordem
+        threshold: Repetições a partir das quais o formato é apontado
+
+    Returns:
+        list: Dicionários {'statement', 'count'}, do mais repetido ao menos
+    """
+    counts = Counter(
+        normalize_statement(statement)
+        for statement in statements
+        if _READ.match(statement)
+    )
+    return [
+        {'statement': shape, 'count': count}
+        for shape, count in counts.most_common()
+        if count >= threshold
+    ]
+
+
+def query_budget(max_queries=None, allow_repeated=False):
+    """
+    Decorator: declara o número máximo de queries de uma rota
+
+    Args:
+        max_queries: Limite de queries por requisição (None = sem limite)
+        allow_repeated: Se True, repetições são esperadas (ex.: blocos de
+            inserts em lote) e não são apontadas como N+1
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.sql_query_budget = max_queries
+            g.sql_allow_repeated = allow_repeated
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def extend_query_budget(extra):
+    """
+    Aumenta o limite de queries da requisição atual
+
+    Para rotas em que parte das queries cresce com a entrada de forma
+    esperada (ex.: o ORM grava um INSERT por item do pedido).
+
+    Args:
+        extra: Queries somadas ao limite declarado em @query_budget
+    """
+    if has_request_context() and g.get('sql_query_budget') is not None:
+        g.sql_query_budget += extra
+
+
+class RequestProfile:
+    """Queries de uma requisição com os respectivos tempos"""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = None
+        self.status = None
+        self.queries = []
+
+    def record(self, statement, duration):
+        self.queries.append((statement, duration))
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def summary(self, threshold, budget=None):
+        """
+        Resume a requisição
+
+        Args:
+            threshold: Repetições para apontar N+1
+            budget: Limite de queries declarado na rota (opcional)
+
+        Returns:
+            dict: Totais, formatos repetidos, limite e a lista de queries
+        """
+        statements = [statement for statement, _ in self.queries]
+        return {
+            'method': self.method,
+            'path': self.path,
+            'endpoint': self.endpoint,
+            'status': self.status,
+            'query_count': len(self.queries),
+            'total_ms': round(self.total_time * 1000, 3),
+            'budget': budget,
+            'over_budget': budget is not None and len(self.queries) > budget,
+            'repeated': find_repeated(statements, threshold),
+            'queries': [
+                {'statement': statement, 'ms': round(duration * 1000, 3)}
+                for statement, duration in self.queries
+            ]
+        }
+
+
+class SQLProfiler:
+    """Liga o profiler à aplicação e guarda o histórico das requisições"""
+
+    def __init__(self, history=50, threshold=3, raise_on_violation=False):
+        self.threshold = threshold
+        self.raise_on_violation = raise_on_violation
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'sql_profile' in g:
+            conn.info.setdefault('sql_profiler_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('sql_profiler_started')
+        if started and has_request_context() and 'sql_profile' in g:
+            g.sql_profile.record(statement, time.perf_counter() - started.pop())
+
+    @staticmethod
+    def _handle_error(context):
+        connection = context.connection
+        if connection is not None and connection.info.get('sql_profiler_started'):
+            connection.info['sql_profiler_started'].pop()
+
+    def start_request(self):
+        g.sql_profile = RequestProfile(request.method, request.full_path.rstrip('?'))
+
+    def finish_request(self, response):
+        """Adiciona os cabeçalhos, guarda o resumo e verifica limite e N+1"""
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        profile.endpoint = request.endpoint
+        profile.status = response.status_code
+        summary = profile.summary(self.threshold, g.get('sql_query_budget'))
+
+        response.headers['X-SQL-Queries'] = (
+            f"count={summary['query_count']}; time_ms={summary['total_ms']}; repeated={len(summary['repeated'])}"
+        )
+        response.headers.add(
+            'Server-Timing', f"db;dur={summary['total_ms']};desc=\"{summary['query_count']} queries\""
+        )
+
+        with self._lock:
+            self._history.append(summary)
+
+        problems = []
+        if summary['over_budget']:
+            problems.append(f"{summary['query_count']} queries (limite: {summary['budget']})")
+        for repeated in ([] if g.get('sql_allow_repeated') else summary['repeated']):
+            problems.append(f"query repetida {repeated['count']}x (possível N+1): {repeated['statement']}")
+
+        if problems:
+            message = f"{profile.method} {profile.path}: " + '; '.join(problems)
+            if self.raise_on_violation:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def history(self):
+        """Resumos das últimas requisições (mais recente primeiro)"""
+        with self._lock:
+            return list(reversed(self._history))
+
+    def clear(self):
+        with self._lock:
+            self._history.clear()
+
+
+def instrument_engine(engine):
+    """
+    Registra o profiler em um engine (primário em init_sql_profiler, réplicas no roteador)
+
+    Args:
+        engine: Engine SQLAlchemy
+    """
+    if event.contains(engine, 'before_cursor_execute', SQLProfiler._before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', SQLProfiler._before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', SQLProfiler._after_cursor_execute)
+    event.listen(engine, 'handle_error', SQLProfiler._handle_error)
+
+
+def init_sql_profiler(app):
+    """
+    Ativa o profiler se SQL_PROFILER_ENABLED estiver ligado
+
+    Args:
+        app: Instância do Flask
+    """
+    if not app.config.get('SQL_PROFILER_ENABLED', False):
+        return
+
+    profiler = SQLProfiler(
+        history=app.config.get('SQL_PROFILER_HISTORY', 50),
+        threshold=app.config.get('SQL_PROFILER_REPEAT_THRESHOLD', 3),
+        raise_on_violation=app.config.get('SQL_PROFILER_RAISE', False)
+    )
+    app.extensions['sql_profiler'] = profiler
+
+    from app.database import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    app.before_request(profiler.start_request)
+    app.after_request(profiler.finish_request)
+
+    @app.route('/debug/sql', methods=['GET', 'DELETE'])
+    def sql_profile_history():
+        if request.method == 'DELETE':
+            profiler.clear()
+            return '', 204
+
+        # A própria consulta ao histórico não entra nele
+        g.pop('sql_profile', None)
+        return jsonify({'requests': profiler.history()})
+
+    logger.warning("Profiler de SQL ativo (SQL_PROFILER_ENABLED): não use em produção")
@@ -0,0 +1,12 @@
+"""
+Ponto de entrada ASGI: gateway que consulta o ViaCEP no event loop (ver app/asgi.py)
+
+Uso:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+    SERVER_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:application
+"""
+from app import create_app
+from app.asgi import create_asgi_app
+
+# Criar aplicação
+application = create_asgi_app(create_app())
@@ -0,0 +1,171 @@
+"""
+Benchmark da criação de pedidos com ViaCEP lento: servidor WSGI x gateway ASGI
+
+Sobe a aplicação duas vezes no uvicorn, com o mesmo número de threads para o
+Flask (--threads), e dispara --requests pedidos com --concurrency clientes
+simultâneos contra um ViaCEP falso com --viacep-latency-ms de latência:
+
+    - sync: o gateway apenas repassa ao Flask; a consulta ao ViaCEP ocupa
+      uma das threads (equivalente ao servidor WSGI com o mesmo nº de threads);
+    - async: a consulta ao ViaCEP é feita no event loop e só a parte de banco
+      ocupa as threads.
+
+Cada pedido usa um CEP diferente (sem acertos de cache). Durante a carga,
+GET /health é medido em paralelo para mostrar se as demais rotas ficam sem
+threads livres.
+
+Uso:
+    python benchmarks/async_orders.py --viacep-latency-ms 500 --requests 400 --concurrency 200 --threads 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from load_test import Recorder  # noqa: E402
+from viacep_stub import ViaCEPStub  # noqa: E402
+
+
+def _order(rng, cep):
+    return {
+        'customer_name': 'Cliente Benchmark',
+        'customer_email': 'cliente@example.com',
+        'address': {'cep': cep, 'number': str(rng.randrange(1, 2000))},
+        'items': [{
+            'product_id': rng.randrange(1, 500),
+            'product_name': 'Produto',
+            'quantity': rng.randrange(1, 4),
+            'unit_price': '49.90'
+        }]
+    }
+
+
+def _serve(application):
+    """Inicia o uvicorn em uma thread e retorna (servidor, URL base)"""
+    config = uvicorn.Config(application, host='127.0.0.1', port=0, log_level='error', lifespan='on')
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _load(base_url, payloads, concurrency, recorder):
+    """Envia os pedidos com `concurrency` clientes e mede GET /health em paralelo"""
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        queue = list(reversed(payloads))
+        finished = asyncio.Event()
+
+        async def create_orders():
+            while queue:
+                payload = queue.pop()
+                started = time.perf_counter()
+                try:
+                    status = (await client.post('/api/orders', json=payload)).status_code
+                except httpx.HTTPError:
+                    status = 'error'
+                recorder.record('POST /api/orders', status, time.perf_counter() - started)
+
+        async def probe_health():
+            while not finished.is_set():
+                started = time.perf_counter()
+                try:
+                    status = (await client.get('/health')).status_code
+                except httpx.HTTPError:
+                    status = 'error'
+                recorder.record('GET /health', status, time.perf_counter() - started)
+                await asyncio.sleep(0.1)
+
+        probe = asyncio.ensure_future(probe_health())
+        await asyncio.gather(*(create_orders() for _ in range(concurrency)))
+        finished.set()
+        await probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400, help='Pedidos criados em cada modo')
+    parser.add_argument('--concurrency', type=int, default=200, help='Clientes simultâneos')
+    parser.add_argument('--threads', type=int, default=8, help='Threads do Flask (ASGI_THREADS) nos dois modos')
+    parser.add_argument('--viacep-latency-ms', type=float, default=500.0)
+    parser.add_argument('--viacep-jitter-ms', type=float, default=50.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ecommerce-async-')
+    os.environ['TEST_DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['FLASK_ENV'] = 'production'
+
+    from app import create_app
+    from app.asgi import AsyncOrderGateway
+
+    stub = ViaCEPStub(latency_ms=args.viacep_latency_ms, jitter_ms=args.viacep_jitter_ms, seed=args.seed).start()
+
+    app = create_app('testing')
+    app.config['TESTING'] = False
+    app.config['VIACEP_API_URL'] = stub.url
+    # Pool do banco e do cliente HTTP síncrono comportam todas as threads
+    app.config['VIACEP_POOL_MAXSIZE'] = max(args.threads, app.config.get('VIACEP_POOL_MAXSIZE', 20))
+    app.config['VIACEP_ASYNC_MAX_CONNECTIONS'] = args.concurrency
+    logging.getLogger().setLevel(logging.ERROR)
+
+    # CEPs distintos em cada modo: toda criação de pedido consulta o ViaCEP
+    rng = random.Random(args.seed)
+    ceps = random.Random(args.seed).sample(range(10 ** 7, 10 ** 8), args.requests * 2)
+
+    results = {}
+    for index, mode in enumerate(('sync', 'async')):
+        payloads = [_order(rng, str(cep)) for cep in ceps[index::2]]
+        gateway = AsyncOrderGateway(app, threads=args.threads, resolve_cep=mode == 'async')
+        server, base_url = _serve(gateway)
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        asyncio.run(_load(base_url, payloads, args.concurrency, recorder))
+        elapsed = time.perf_counter() - started
+
+        server.should_exit = True
+        endpoints, _ = recorder.report(elapsed)
+        results[mode] = {'duration_seconds': round(elapsed, 3), 'endpoints': endpoints}
+
+    stub.stop()
+
+    sync_rps = results['sync']['endpoints']['POST /api/orders']['requests_per_second']
+    async_rps = results['async']['endpoints']['POST /api/orders']['requests_per_second']
+    output = json.dumps({
+        'meta': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'threads': args.threads,
+            'viacep_latency_ms': args.viacep_latency_ms,
+            'viacep_jitter_ms': args.viacep_jitter_ms,
+            'seed': args.seed
+        },
+        'results': results,
+        'orders_throughput_ratio': round(async_rps / sync_rps, 2) if sync_rps else None
+    }, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark do histórico de pedidos do cliente (GET /api/orders/history)
+
+Para cada tamanho em --sizes, cria um banco SQLite com esse número de
+pedidos (clientes aleatórios, ~5 pedidos por e-mail) e mede a latência da
+rota com o cliente de teste do Flask:
+
+    - email: primeira página do histórico de um cliente;
+    - email + cursor: segunda página (keyset);
+    - name: busca por prefixo de nome (3 a 6 letras).
+
+Também imprime o plano de execução das consultas, que deve usar os índices
+ix_orders_customer_email_created_at_id e ix_orders_customer_name_id sem
+etapa de ordenação. No SQLite, LIKE só usa índice com case_sensitive_like
+(no MySQL, com collation *_ci, a busca por prefixo usa o índice direto;
+no PostgreSQL com collation diferente de "C", usa o índice
+ix_orders_customer_name_pattern_id, com varchar_pattern_ops).
+
+Uso:
+    python benchmarks/customer_history.py --sizes 10000,1000000 --lookups 300
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event, insert, text  # noqa: E402
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela', 'João',
+               'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago', 'Vitória', 'William']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes']
+
+
+def _populate(db, Order, size, rng, chunk=20000):
+    """Insere `size` pedidos e retorna a lista de (e-mail, nome) dos clientes"""
+    customers = []
+    for index in range(max(size // 5, 1)):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {''.join(rng.choices(string.ascii_uppercase, k=3))}"
+        customers.append((f"cliente{index}@example.com", name))
+
+    start = datetime.utcnow() - timedelta(days=730)
+    number = 0
+    for offset in range(0, size, chunk):
+        rows = []
+        for _ in range(min(chunk, size - offset)):
+            email, name = rng.choice(customers)
+            number += 1
+            rows.append({
+                'order_number': f"BENCH{number:012d}",
+                'customer_name': name,
+                'customer_email': email,
+                'total_amount': 100,
+                'shipping_cost': 10,
+                'status': 'pending',
+                'created_at': start + timedelta(seconds=rng.randrange(0, 730 * 86400)),
+                'updated_at': start
+            })
+        db.session.execute(insert(Order.__table__), rows)
+        db.session.commit()
+    return customers
+
+
+def _timed(client, **params):
+    started = time.perf_counter()
+    response = client.get('/api/orders/history', query_string=params)
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"{params}: {response.status_code} {response.get_data(as_text=True)}")
+    return elapsed, response.get_json()
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1] * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,1000000', help='Quantidades de pedidos separadas por vírgula')
+    parser.add_argument('--lookups', type=int, default=300, help='Consultas medidas de cada tipo')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+    args = parser.parse_args()
+
+    os.environ['FLASK_ENV'] = 'production'
+    workdir = tempfile.mkdtemp(prefix='ecommerce-history-')
+
+    from app import config
+    from app import create_app
+
+    results = {}
+    for size in (int(value) for value in args.sizes.split(',')):
+        os.environ['TEST_DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, f'history-{size}.db')}"
+        config.TestingConfig.SQLALCHEMY_DATABASE_URI = os.environ['TEST_DATABASE_URL']
+
+        app = create_app('testing')
+        app.config['TESTING'] = False
+        logging.getLogger().setLevel(logging.ERROR)
+
+        from app.database import db
+        from app.models.order import Order
+
+        rng = random.Random(args.seed)
+        with app.app_context():
+            @event.listens_for(db.engine, 'connect')
+            def _case_sensitive_like(connection, _):
+                connection.execute('PRAGMA case_sensitive_like = ON')
+
+            db.engine.dispose()
+            started = time.perf_counter()
+            customers = _populate(db, Order, size, rng)
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+            populate_seconds = time.perf_counter() - started
+
+            plans = {}
+            for label, sql in (
+                ('email', "SELECT id FROM orders WHERE customer_email = 'cliente1@example.com' "
+                          "ORDER BY created_at DESC, id DESC LIMIT 11"),
+                ('name', "SELECT id FROM orders WHERE customer_name LIKE 'Ana S%' ESCAPE '\\' "
+                         "ORDER BY customer_name, id LIMIT 11")
+            ):
+                plans[label] = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+        client = app.test_client()
+        timings = {'email': [], 'email_next_page': [], 'name': []}
+        for _ in range(args.lookups):
+            email, name = rng.choice(customers)
+            elapsed, body = _timed(client, email=email, limit=2)
+            timings['email'].append(elapsed)
+            if body['next_cursor']:
+                elapsed, _ = _timed(client, email=email, limit=2, cursor=body['next_cursor'])
+                timings['email_next_page'].append(elapsed)
+
+            elapsed, _ = _timed(client, name=name[:rng.randrange(3, 7)], limit=20)
+            timings['name'].append(elapsed)
+
+        results[str(size)] = {
+            'populate_seconds': round(populate_seconds, 1),
+            'query_plans': plans,
+            **{label: _percentiles(samples) for label, samples in timings.items() if samples}
+        }
+
+    output = json.dumps({'lookups': args.lookups, 'seed': args.seed, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
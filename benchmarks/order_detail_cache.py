@@ -0,0 +1,123 @@
+"""
+Benchmark do cache de detalhe de pedidos (GET /api/orders/<id>)
+
+Simula clientes consultando o mesmo conjunto de pedidos repetidamente e mede
+queries SQL e latência por consulta, com o cache desligado, ligado, e ligado
+com requisições condicionais (If-None-Match).
+
+Com o cache ligado, consultas dentro da janela de --revalidate segundos
+(ORDER_CACHE_REVALIDATE_SECONDS) não fazem query; cada entrada é conferida
+com uma query pela chave primária no máximo uma vez por janela. Com
+--revalidate 0, toda consulta confere a versão (cerca de 1 query por consulta).
+
+Uso:
+    python benchmarks/order_detail_cache.py --orders 50 --polls 2000 --revalidate 1
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def _seed(app, count):
+    """Cria pedidos com endereço e itens diretamente no banco"""
+    from app.database import db
+    from app.models import Order, Address, OrderItem
+
+    with app.app_context():
+        for index in range(count):
+            order = Order(customer_name=f'Cliente {index}', customer_email=f'cliente{index}@email.com')
+            order.address = Address(
+                cep='01310-100', street='Avenida Paulista', number=str(index),
+                neighborhood='Bela Vista', city='São Paulo', state='SP'
+            )
+            for product_id in range(3):
+                order.items.append(OrderItem(
+                    product_id=product_id, product_name=f'Produto {product_id}',
+                    quantity=1, unit_price=10
+                ))
+            order.shipping_cost = 10
+            order.calculate_total()
+            db.session.add(order)
+        db.session.commit()
+        return [order_id for (order_id,) in db.session.query(Order.id).all()]
+
+
+def _run(app, client, engine, order_ids, polls, conditional):
+    """Executa as consultas e retorna as métricas do cenário"""
+    from app.query_counter import QueryCounter
+
+    etags = {}
+    latencies = []
+    statuses = {}
+
+    with QueryCounter(engine) as counter:
+        for _ in range(polls):
+            order_id = random.choice(order_ids)
+            headers = {'If-None-Match': etags[order_id]} if conditional and order_id in etags else {}
+
+            started = time.perf_counter()
+            response = client.get(f'/api/orders/{order_id}', headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.headers.get('ETag'):
+                etags[order_id] = response.headers['ETag']
+
+    latencies.sort()
+    return {
+        'polls': polls,
+        'queries': counter.count,
+        'queries_per_poll': round(counter.count / polls, 4),
+        'status_codes': statuses,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'requests_per_second': round(polls / (sum(latencies) / 1000), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--polls', type=int, default=2000)
+    parser.add_argument('--revalidate', type=float, default=1.0, help='ORDER_CACHE_REVALIDATE_SECONDS')
+    args = parser.parse_args()
+
+    os.environ['FLASK_ENV'] = 'production'
+    random.seed(42)
+
+    from app import create_app
+    from app.database import db
+
+    app = create_app('testing')
+    app.config['ORDER_CACHE_TTL'] = 3600
+    app.config['ORDER_CACHE_REVALIDATE_SECONDS'] = args.revalidate
+    client = app.test_client()
+    order_ids = _seed(app, args.orders)
+
+    with app.app_context():
+        engine = db.engine
+
+    results = {}
+
+    app.config['ORDER_CACHE_ENABLED'] = False
+    results['no_cache'] = _run(app, client, engine, order_ids, args.polls, conditional=False)
+
+    app.config['ORDER_CACHE_ENABLED'] = True
+    results['cache'] = _run(app, client, engine, order_ids, args.polls, conditional=False)
+    results['cache_conditional'] = _run(app, client, engine, order_ids, args.polls, conditional=True)
+
+    with app.app_context():
+        from app.services.order_cache_service import OrderCacheService
+        results['cache_stats'] = OrderCacheService.get_cache().stats()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Teste de estresse dos alocadores de número de pedido
+
+Vários processos (simulando workers/servidores), cada um com várias threads,
+geram números de pedido ao mesmo tempo; ao final verifica-se que não houve
+nenhuma colisão.
+
+Uso:
+    python benchmarks/order_number_stress.py --allocator block --processes 8 --threads 8 --count 2000
+    python benchmarks/order_number_stress.py --allocator time --processes 8 --threads 8 --count 2000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def _worker(allocator, node_id, threads, count, queue):
+    """Gera `threads * count` números em um processo e envia para a fila"""
+    from app import create_app
+    from app.order_numbers import get_order_number_allocator
+
+    app = create_app('testing')
+    app.config['ORDER_NUMBER_ALLOCATOR'] = allocator
+    app.config['ORDER_NODE_ID'] = node_id
+
+    numbers = []
+    lock = threading.Lock()
+
+    def generate():
+        with app.app_context():
+            generator = get_order_number_allocator()
+            local = [generator.allocate() for _ in range(count)]
+        with lock:
+            numbers.extend(local)
+
+    pool = [threading.Thread(target=generate) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    queue.put(numbers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--allocator', choices=['block', 'time', 'random'], default='block')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--count', type=int, default=1000, help='Números por thread')
+    args = parser.parse_args()
+
+    # Banco compartilhado entre os processos (necessário para o alocador "block")
+    db_path = os.path.join(tempfile.mkdtemp(), 'order_numbers.db')
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['FLASK_ENV'] = 'production'
+
+    queue = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(args.allocator, node_id, args.threads, args.count, queue))
+        for node_id in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    numbers = []
+    for _ in processes:
+        numbers.extend(queue.get())
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    unique = len(set(numbers))
+    result = {
+        'allocator': args.allocator,
+        'processes': args.processes,
+        'threads': args.threads,
+        'generated': len(numbers),
+        'unique': unique,
+        'collisions': len(numbers) - unique,
+        'max_length': max(len(number) for number in numbers),
+        'elapsed_seconds': round(elapsed, 3)
+    }
+    print(json.dumps(result, indent=2))
+
+    sys.exit(0 if result['collisions'] == 0 and result['max_length'] <= 20 else 1)
+
+
+if __name__ == '__main__':
+    main()
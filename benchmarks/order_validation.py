@@ -0,0 +1,57 @@
+"""
+Teste diferencial e microbenchmark da validação de criação de pedido
+
+Compara o validador pré-compilado (app.fast_validation) com o
+CreateOrderSchema do Marshmallow em payloads escolhidos à mão e em payloads
+gerados aleatoriamente (mutações de um pedido válido): os dados validados e
+as mensagens de erro precisam ser idênticos (payloads e comparação em
+tests/order_payloads.py, os mesmos do teste). Em seguida mede o tempo de
+validação dos dois backends para pedidos com quantidades variadas de itens.
+
+Sai com código 1 se houver qualquer divergência.
+
+Uso:
+    python benchmarks/order_validation.py --fuzz 20000 --repeat 2000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.fast_validation import load_create_order  # noqa: E402
+from app.routes.orders import CreateOrderSchema  # noqa: E402
+from tests.order_payloads import differential, valid_order  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fuzz', type=int, default=20000, help='Payloads gerados aleatoriamente')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=2000, help='Validações por medição')
+    args = parser.parse_args()
+
+    compared, mismatches = differential(args.fuzz, args.seed)
+    results = {'differential': {'payloads': compared, 'mismatches': len(mismatches)}}
+
+    if mismatches:
+        results['differential']['examples'] = mismatches[:5]
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        sys.exit(1)
+
+    schema = CreateOrderSchema()
+    results['us_per_order'] = {}
+    for items in (1, 10, 50):
+        payload = valid_order(items)
+        results['us_per_order'][f'{items}_items'] = {
+            name: round(min(timeit.repeat(lambda: loader(payload), number=args.repeat, repeat=3)) / args.repeat * 1e6, 2)
+            for name, loader in (('marshmallow', schema.load), ('fast', load_create_order))
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
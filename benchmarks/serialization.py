@@ -0,0 +1,130 @@
+"""
+Benchmark de serialização de pedidos
+
+Compara, para páginas de pedidos com endereço e itens:
+    - to_dict atributo por atributo (implementação anterior) x serializador pré-compilado
+    - provider JSON da biblioteca padrão x provider orjson
+
+Uso:
+    python benchmarks/serialization.py --orders 100 --items 3 --repeat 200
+"""
+import argparse
+from datetime import datetime
+from decimal import Decimal
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def legacy_order_to_dict(order):
+    """Implementação anterior de Order.to_dict(include_details=True)"""
+    data = {
+        'id': order.id,
+        'order_number': order.order_number,
+        'customer_name': order.customer_name,
+        'customer_email': order.customer_email,
+        'customer_phone': order.customer_phone,
+        'total_amount': float(order.total_amount),
+        'shipping_cost': float(order.shipping_cost),
+        'status': order.status,
+        'created_at': order.created_at.isoformat() if order.created_at else None,
+        'updated_at': order.updated_at.isoformat() if order.updated_at else None
+    }
+    address = order.address
+    data['address'] = {
+        'id': address.id,
+        'cep': address.cep,
+        'street': address.street,
+        'number': address.number,
+        'complement': address.complement,
+        'neighborhood': address.neighborhood,
+        'city': address.city,
+        'state': address.state
+    }
+    data['items'] = [{
+        'id': item.id,
+        'product_id': item.product_id,
+        'product_name': item.product_name,
+        'product_image': item.product_image,
+        'quantity': item.quantity,
+        'unit_price': float(item.unit_price),
+        'total_price': float(item.total_price)
+    } for item in order.items]
+    return data
+
+
+def _build_orders(count, items):
+    """Cria pedidos em memória (sem banco) com endereço e itens"""
+    from app.models import Order, Address, OrderItem
+
+    now = datetime(2024, 1, 15, 10, 30, 0)
+    orders = []
+    for index in range(count):
+        order = Order(
+            id=index + 1, order_number=f'ORD-20240115-{index:07d}', customer_name='João da Silva',
+            customer_email='joao@email.com', customer_phone='11999999999',
+            total_amount=Decimal('5010.00'), shipping_cost=Decimal('10.00'),
+            status='pending', created_at=now, updated_at=now
+        )
+        order.address = Address(
+            id=index + 1, cep='01310-100', street='Avenida Paulista', number='1000',
+            complement='Conjunto 45', neighborhood='Bela Vista', city='São Paulo', state='SP'
+        )
+        for item_index in range(items):
+            order.items.append(OrderItem(
+                id=index * items + item_index + 1, product_id=item_index, product_name='Notebook',
+                product_image='https://example.com/image.jpg', quantity=2,
+                unit_price=Decimal('2500.00'), total_price=Decimal('5000.00')
+            ))
+        orders.append(order)
+    return orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=100, help='Pedidos por página')
+    parser.add_argument('--items', type=int, default=3, help='Itens por pedido')
+    parser.add_argument('--repeat', type=int, default=200, help='Páginas serializadas por medição')
+    args = parser.parse_args()
+
+    os.environ['FLASK_ENV'] = 'production'
+
+    from app import create_app
+    from app.json_provider import OrjsonJSONProvider, StdlibJSONProvider, orjson
+
+    app = create_app('testing')
+    orders = _build_orders(args.orders, args.items)
+
+    legacy_page = [legacy_order_to_dict(order) for order in orders]
+    compiled_page = [order.to_dict(include_details=True) for order in orders]
+    assert legacy_page == compiled_page, 'Serializador pré-compilado diverge da implementação anterior'
+
+    def per_page_ms(statement):
+        return round(min(timeit.repeat(statement, number=args.repeat, repeat=3)) / args.repeat * 1000, 4)
+
+    results = {
+        'orders_per_page': args.orders,
+        'items_per_order': args.items,
+        'to_dict_ms_per_page': {
+            'legacy': per_page_ms(lambda: [legacy_order_to_dict(order) for order in orders]),
+            'compiled': per_page_ms(lambda: [order.to_dict(include_details=True) for order in orders])
+        },
+        'dumps_ms_per_page': {}
+    }
+
+    providers = {'stdlib': StdlibJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonJSONProvider(app)
+
+    payload = {'orders': compiled_page}
+    for name, provider in providers.items():
+        results['dumps_ms_per_page'][name] = per_page_ms(lambda: provider.dumps(payload))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Teste diferencial e microbenchmark da tabela de frete por faixas de CEP
+
+Gera --ranges faixas aleatórias (faixas largas por "estado" e faixas
+estreitas sobrepostas, como capitais e bairros), compila em
+ShippingRateTable e compara cada cotação com uma varredura linear das
+faixas originais (faixa mais estreita vence, empate para a última) e com
+a cotação em lote (lookup_many). Em seguida mede o tempo das duas abordagens.
+
+Sai com código 1 se houver qualquer divergência.
+
+Uso:
+    python benchmarks/shipping_rates.py --ranges 50000 --lookups 200000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.shipping_rate_table import ShippingRateTable  # noqa: E402
+
+
+def _ranges(rng, count):
+    """Faixas de 27 'estados' e o restante em sub-faixas sobrepostas"""
+    ranges = []
+    states = sorted(rng.sample(range(1, 10 ** 8), 26))
+    bounds = [0] + states + [10 ** 8]
+    for index in range(27):
+        ranges.append({
+            'cep_start': f"{bounds[index]:08d}", 'cep_end': f"{bounds[index + 1] - 1:08d}",
+            'cost': 20 + index, 'days': 3 + index % 7, 'region': f"UF{index}"
+        })
+
+    for index in range(count - len(ranges)):
+        start = rng.randrange(0, 10 ** 8)
+        end = min(start + rng.choice((10, 1000, 10 ** 5, 10 ** 6)) + rng.randrange(0, 5000), 10 ** 8 - 1)
+        ranges.append({
+            'cep_start': f"{start:08d}", 'cep_end': f"{end:08d}",
+            'cost': round(rng.uniform(5, 80), 2), 'days': rng.randrange(1, 15),
+            'free_shipping_threshold': rng.choice(('', 'none', '150', '300')),
+            'region': f"R{index}"
+        })
+    return ranges
+
+
+def _linear_lookup(ranges, cep):
+    """Referência: varre todas as faixas (a mais estreita vence, empate para a última)"""
+    best = None
+    for index, rate in enumerate(ranges):
+        start, end = int(rate['cep_start']), int(rate['cep_end'])
+        if start <= cep <= end:
+            key = (end - start, -index)
+            if best is None or key <= best[0]:
+                best = (key, rate)
+    return best[1]['region'] if best else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ranges', type=int, default=50000, help='Faixas na tabela')
+    parser.add_argument('--lookups', type=int, default=200000, help='Cotações medidas na tabela compilada')
+    parser.add_argument('--check', type=int, default=2000, help='Cotações comparadas com a varredura linear')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ranges = _ranges(rng, args.ranges)
+
+    started = time.perf_counter()
+    table = ShippingRateTable(ranges)
+    compile_seconds = time.perf_counter() - started
+
+    # Pontos de teste: limites das faixas (e vizinhos) e CEPs aleatórios
+    edges = []
+    for rate in rng.sample(ranges, min(len(ranges), args.check // 2)):
+        for value in (int(rate['cep_start']), int(rate['cep_end'])):
+            edges.extend(cep for cep in (value - 1, value, value + 1) if 0 <= cep < 10 ** 8)
+    probes = edges + [rng.randrange(0, 10 ** 8) for _ in range(args.check)]
+
+    started = time.perf_counter()
+    mismatches = 0
+    for cep in probes:
+        found = table.lookup(f"{cep:08d}")
+        if (found and found['region']) != _linear_lookup(ranges, cep):
+            mismatches += 1
+    linear_seconds = (time.perf_counter() - started) / len(probes)
+
+    # Cotação em lote (uma passada ordenada) deve coincidir com as buscas individuais
+    batch = table.lookup_many(f"{cep:08d}" for cep in probes)
+    mismatches += sum(1 for cep in probes if batch[f"{cep:08d}"] != table.lookup(f"{cep:08d}"))
+
+    ceps = [f"{rng.randrange(0, 10 ** 8):08d}" for _ in range(args.lookups)]
+    started = time.perf_counter()
+    for cep in ceps:
+        table.lookup(cep)
+    table_seconds = (time.perf_counter() - started) / len(ceps)
+
+    print(json.dumps({
+        'ranges': args.ranges,
+        'intervals': len(table),
+        'compile_ms': round(compile_seconds * 1000, 1),
+        'checked_lookups': len(probes),
+        'mismatches': mismatches,
+        'table_lookup_us': round(table_seconds * 1e6, 3),
+        'linear_scan_lookup_us': round(linear_seconds * 1e6, 1)
+    }, indent=2))
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
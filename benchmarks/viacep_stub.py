@@ -0,0 +1,161 @@
+"""
+Servidor HTTP local que imita a API ViaCEP (para benchmarks e testes de carga)
+
+Responde GET /ws/<cep>/json/ no formato do ViaCEP, com latência, taxa de
+erros (HTTP 500) e taxa de CEPs inexistentes configuráveis. O endereço é
+derivado do próprio CEP, então a mesma consulta sempre traz o mesmo resultado.
+
+Uso standalone:
+    python benchmarks/viacep_stub.py --port 8089 --latency-ms 40 --error-rate 0.01
+    VIACEP_API_URL=http://127.0.0.1:8089/ws python run.py
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+import threading
+import time
+
+# Estado pelo primeiro dígito do CEP (faixas aproximadas dos Correios)
+STATES = {
+    '0': ('SP', 'São Paulo'), '1': ('SP', 'Campinas'), '2': ('RJ', 'Rio de Janeiro'),
+    '3': ('MG', 'Belo Horizonte'), '4': ('BA', 'Salvador'), '5': ('PE', 'Recife'),
+    '6': ('CE', 'Fortaleza'), '7': ('DF', 'Brasília'), '8': ('PR', 'Curitiba'),
+    '9': ('RS', 'Porto Alegre')
+}
+
+_PATH = re.compile(r'^/ws/(\d{8})/json/?$')
+
+
+class ViaCEPStub:
+    """Servidor ViaCEP falso em uma thread de fundo"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, not_found_rate=0.0, seed=None):
+        """
+        Args:
+            host: Endereço de escuta
+            port: Porta (0 = escolhida pelo sistema)
+            latency_ms: Latência média adicionada a cada resposta
+            jitter_ms: Variação uniforme da latência (+/-)
+            error_rate: Fração de respostas HTTP 500
+            not_found_rate: Fração de CEPs respondidos com {"erro": true}
+            seed: Semente do gerador aleatório (reprodutibilidade)
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """URL base para VIACEP_API_URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/ws"
+
+    def _draw(self):
+        """Sorteia latência e resultado de uma resposta"""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+    def _not_found(self, cep):
+        # Determinístico por CEP, para que o cache da aplicação faça sentido
+        return self.not_found_rate > 0 and random.Random(cep).random() < self.not_found_rate
+
+    @staticmethod
+    def address(cep):
+        """Endereço fictício (e estável) de um CEP"""
+        state, city = STATES[cep[0]]
+        return {
+            'cep': f"{cep[:5]}-{cep[5:]}",
+            'logradouro': f"Rua {int(cep[5:]) or 1}",
+            'complemento': '',
+            'bairro': f"Bairro {cep[2:5]}",
+            'localidade': city,
+            'uf': state,
+            'ibge': '', 'gia': '', 'ddd': '', 'siafi': ''
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                delay, failed = stub._draw()
+                if delay:
+                    time.sleep(delay)
+
+                match = _PATH.match(self.path)
+                if not match:
+                    self._send(400, {'erro': True})
+                elif failed:
+                    self._send(500, {'erro': 'falha simulada'})
+                elif stub._not_found(match.group(1)):
+                    self._send(200, {'erro': True})
+                else:
+                    self._send(200, stub.address(match.group(1)))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Inicia o servidor em uma thread daemon e retorna o próprio stub"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra o servidor"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        return {'requests': self.requests, 'errors': self.errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--not-found-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = ViaCEPStub(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.not_found_rate)
+    print(f"ViaCEP falso em {stub.url} (Ctrl+C para encerrar)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Configuração do gunicorn (servidor de produção pre-fork)
+
+Uso:
+    gunicorn -c gunicorn.conf.py run:app
+
+A aplicação é carregada uma vez no master (preload_app) e cada worker é um
+fork já inicializado; app/prefork.py descarta o que não pode ser
+compartilhado entre processos (conexões do banco, sessão HTTP, alocador de
+números de pedido).
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Endereço de escuta
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', 5000)}"
+
+# Processos e threads (padrão: um worker por núcleo)
+workers = int(os.getenv('SERVER_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('SERVER_THREADS', 4))
+
+# gthread para run:app; uvicorn.workers.UvicornWorker para o gateway ASGI (asgi:application)
+worker_class = os.getenv('SERVER_WORKER_CLASS', 'gthread')
+
+# Conexões keep-alive e timeouts (segundos)
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 5))
+timeout = int(os.getenv('SERVER_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+
+# Recicla o worker após N requisições (0 = nunca); o jitter evita reinícios simultâneos
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('SERVER_MAX_REQUESTS_JITTER', 1000))
+
+# create_app roda uma vez no master, antes do fork
+preload_app = True
+
+accesslog = os.getenv('SERVER_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+def on_starting(server):
+    # Descarta as métricas gravadas por uma execução anterior
+    directory = os.getenv('METRICS_MULTIPROC_DIR')
+    if directory and os.path.isdir(directory):
+        from app.metrics import clear_multiprocess_dir
+
+        clear_multiprocess_dir(directory)
+
+
+def pre_fork(server, worker):
+    # Menor posição livre entre os workers vivos (um worker substituído herda a posição do anterior)
+    used = {getattr(alive, 'slot', None) for alive in server.WORKERS.values()}
+    worker.slot = next(slot for slot in range(len(used) + 1) if slot not in used)
+
+
+def post_worker_init(worker):
+    from app.prefork import init_worker
+
+    # O gateway ASGI guarda a aplicação Flask em flask_app
+    init_worker(getattr(worker.wsgi, 'flask_app', worker.wsgi), worker.slot)
+
+
+def worker_exit(server, worker):
+    from app.metrics import registry
+
+    # Últimas observações do worker antes de sair
+    registry.flush()
+
+
+def child_exit(server, worker):
+    # Contadores do worker encerrado passam para archive.json
+    directory = os.getenv('METRICS_MULTIPROC_DIR')
+    if directory:
+        from app.metrics import mark_process_dead
+
+        mark_process_dead(directory, worker.pid)
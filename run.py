@@ -28,6 +28,10 @@ if __name__ == '__main__':
     print("   • CEP: http://localhost:5000/api/cep/<cep>")
     print("   • Produtos: http://localhost:5000/api/products")
     print("=" * 60)
+    if not debug:
+        print("\n Servidor de desenvolvimento (um processo). Em produção use:")
+        print("   gunicorn -c gunicorn.conf.py run:app")
+        print("=" * 60)
     print("\n Servidor rodando! Pressione CTRL+C para parar.\n")
 
     # Iniciar servidor
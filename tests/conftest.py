@@ -0,0 +1,41 @@
+"""
+Fixtures compartilhadas: aplicação de testes com SQLite em arquivo temporário
+"""
+import pytest
+
+from app import create_app
+from app.config import TestingConfig, engine_options
+from app.database import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database_url)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(database_url, pool_size=5, max_overflow=5))
+
+    app = create_app('testing')
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def order_payload(items=1, cep='01310100'):
+    """Payload válido de POST /api/orders com `items` itens"""
+    return {
+        'customer_name': 'Cliente Teste',
+        'customer_email': 'cliente@example.com',
+        'customer_phone': '11999999999',
+        'address': {'cep': cep, 'number': '100'},
+        'items': [
+            {'product_id': index + 1, 'product_name': f"Produto {index + 1}", 'quantity': 1 + index % 3, 'unit_price': 10.5}
+            for index in range(items)
+        ]
+    }
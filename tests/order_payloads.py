@@ -0,0 +1,136 @@
+"""
+Payloads de criação de pedido e comparação dos backends de validação
+
+Usados pelo teste diferencial (tests/test_fast_validation.py) e pelo
+benchmark benchmarks/order_validation.py.
+"""
+import copy
+from decimal import Decimal
+import random
+
+from marshmallow import ValidationError
+
+from app.fast_validation import load_create_order
+from app.routes.orders import CreateOrderSchema
+
+
+def valid_order(items=1):
+    """Pedido válido com a quantidade de itens informada"""
+    return {
+        'customer_name': 'João da Silva',
+        'customer_email': 'joao@email.com',
+        'customer_phone': '11999999999',
+        'address': {'cep': '01310-100', 'number': '1000', 'complement': 'Conjunto 45'},
+        'items': [{
+            'product_id': index + 1,
+            'product_name': f'Produto {index}',
+            'product_image': 'https://example.com/image.jpg',
+            'quantity': 2,
+            'unit_price': 49.9
+        } for index in range(items)]
+    }
+
+
+HANDPICKED = [
+    valid_order(),
+    valid_order(5),
+    None, [], 'pedido', 42,
+    {},
+    {**valid_order(), 'extra': 1},
+    {**valid_order(), 'customer_name': 'Jo'},
+    {**valid_order(), 'customer_name': 'x' * 101},
+    {**valid_order(), 'customer_name': b'Jo\xc3\xa3o'},
+    {**valid_order(), 'customer_name': b'\xff\xfe\xfd'},
+    {**valid_order(), 'customer_email': 'joao'},
+    {**valid_order(), 'customer_email': None},
+    {**valid_order(), 'customer_phone': None},
+    {**valid_order(), 'address': 'Avenida Paulista'},
+    {**valid_order(), 'address': {'cep': None, 'z': 1}},
+    {**valid_order(), 'address': {'number': 10}},
+    {**valid_order(), 'items': []},
+    {**valid_order(), 'items': {}},
+    {**valid_order(), 'items': 'abc'},
+    {**valid_order(), 'items': [None, 'x', []]},
+    {**valid_order(), 'items': [{'product_id': True, 'product_name': 1, 'quantity': 0, 'unit_price': 'nan'}]},
+    {**valid_order(), 'items': [{'product_id': '7', 'product_name': 'A', 'quantity': '3', 'unit_price': '10.50'}]},
+    {**valid_order(), 'items': [{'product_id': 1.9, 'product_name': 'A', 'quantity': 1, 'unit_price': 1e400}]},
+    {**valid_order(), 'items': [{'product_id': 1e400, 'product_name': 'A', 'quantity': -1, 'unit_price': 'abc'}]},
+    {**valid_order(), 'items': [{'product_id': 1, 'product_name': 'A', 'quantity': 1, 'unit_price': False}]},
+    {**valid_order(), 'items': [{'product_id': 1, 'product_name': 'A', 'quantity': 1, 'unit_price': '-Infinity'}]},
+]
+
+# Valores usados nas mutações aleatórias
+FUZZ_VALUES = [
+    None, True, False, 0, -1, 1, 2 ** 70, 1.5, -0.0, float('nan'), float('inf'), 1e400,
+    '', 'ab', 'abc', 'x' * 100, 'x' * 101, '12', '1.5', 'nan', 'Infinity', '  3 ', 'a@b.com',
+    'joao@', '@email.com', 'joão@exemplo.com.br', b'abc', b'\xff', [], [1], {}, {'a': 1},
+    Decimal('1.10'), Decimal('NaN'),
+]
+
+
+def mutate(payload, rng):
+    """Aplica de 1 a 3 mutações aleatórias (trocar, remover ou adicionar chave)"""
+    payload = copy.deepcopy(payload)
+
+    for _ in range(rng.randint(1, 3)):
+        containers = [payload, payload['address']] if isinstance(payload.get('address'), dict) else [payload]
+        if isinstance(payload.get('items'), list):
+            containers.extend(item for item in payload['items'] if isinstance(item, dict))
+            if payload['items'] and rng.random() < 0.1:
+                payload['items'][rng.randrange(len(payload['items']))] = rng.choice(FUZZ_VALUES)
+
+        target = rng.choice(containers)
+        action = rng.random()
+        if action < 0.7 and target:
+            target[rng.choice(list(target))] = rng.choice(FUZZ_VALUES)
+        elif action < 0.9 and target:
+            del target[rng.choice(list(target))]
+        else:
+            target[rng.choice(['extra', 'id', 'status'])] = rng.choice(FUZZ_VALUES)
+
+    return payload
+
+
+def run_loader(loader, payload):
+    """Executa um backend e devolve ('ok', dados) ou ('error', mensagens)"""
+    try:
+        return 'ok', loader(payload)
+    except ValidationError as e:
+        return 'error', e.messages
+
+
+def _canonical(value):
+    """Forma comparável de um resultado: ignora a ordem das chaves, mas não os tipos"""
+    if isinstance(value, dict):
+        return sorted((repr(key), _canonical(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__] + [_canonical(item) for item in value]
+    return repr(value)
+
+
+def same_result(left, right):
+    """Compara dois resultados (mesmos dados/mensagens e mesmos tipos)"""
+    return _canonical(left) == _canonical(right)
+
+
+def differential(fuzz, seed):
+    """
+    Compara os dois backends
+
+    Returns:
+        tuple: (payloads comparados, lista de divergências)
+    """
+    schema = CreateOrderSchema()
+    rng = random.Random(seed)
+
+    payloads = list(HANDPICKED)
+    payloads.extend(mutate(valid_order(rng.randint(1, 4)), rng) for _ in range(fuzz))
+
+    mismatches = []
+    for payload in payloads:
+        expected = run_loader(schema.load, payload)
+        actual = run_loader(load_create_order, payload)
+        if not same_result(expected, actual):
+            mismatches.append({'payload': repr(payload), 'marshmallow': repr(expected), 'fast': repr(actual)})
+
+    return len(payloads), mismatches
@@ -0,0 +1,46 @@
+"""
+Testes do diretório offline de CEPs (índice mapeado em memória)
+"""
+import json
+
+import pytest
+
+from app.services.cep_directory import CEPDirectory, build_cep_index
+from app.services.viacep_service import ViaCEPService
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    source = tmp_path / 'ceps.json'
+    source.write_text(json.dumps([
+        {'cep': '01310-100', 'logradouro': 'Avenida Paulista', 'bairro': 'Bela Vista', 'localidade': 'São Paulo', 'uf': 'SP'},
+        {'cep': '20040-002', 'logradouro': 'Rua da Assembleia', 'bairro': 'Centro', 'localidade': 'Rio de Janeiro', 'uf': 'RJ'}
+    ]), encoding='utf-8')
+    path = tmp_path / 'ceps.idx'
+    build_cep_index(str(source), str(path))
+    return path
+
+
+def test_lookup(index_path):
+    directory = CEPDirectory(str(index_path))
+    assert len(directory) == 2
+    assert directory.lookup('01310100')['uf'] == 'SP'
+    assert directory.lookup('99999999') is None
+    directory.close()
+
+
+@pytest.mark.parametrize('size', [0, 1, 11, 12, 20, -1])
+def test_truncated_index_raises_value_error(index_path, size):
+    data = index_path.read_bytes()
+    index_path.write_bytes(data[:size])
+
+    with pytest.raises(ValueError):
+        CEPDirectory(str(index_path))
+
+
+def test_truncated_index_is_ignored_by_viacep_service(app, index_path):
+    index_path.write_bytes(index_path.read_bytes()[:5])
+    app.config['CEP_DIRECTORY_PATH'] = str(index_path)
+
+    with app.app_context():
+        assert ViaCEPService.get_directory() is None
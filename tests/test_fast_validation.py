@@ -0,0 +1,56 @@
+"""
+Teste diferencial do validador pré-compilado contra o CreateOrderSchema (Marshmallow)
+"""
+from decimal import Decimal
+
+import pytest
+from marshmallow import ValidationError
+
+from app.fast_validation import load_create_order
+from app.routes.orders import create_order_schema, load_order_payload
+
+from order_payloads import HANDPICKED, differential, run_loader, same_result, valid_order
+
+
+@pytest.mark.parametrize('payload', HANDPICKED, ids=range(len(HANDPICKED)))
+def test_same_result_as_marshmallow(payload):
+    expected = run_loader(create_order_schema.load, payload)
+    actual = run_loader(load_create_order, payload)
+    assert same_result(expected, actual), (expected, actual)
+
+
+def test_valid_payload_is_converted_like_marshmallow():
+    status, data = run_loader(load_create_order, valid_order(3))
+    assert status == 'ok'
+    assert data == create_order_schema.load(valid_order(3))
+    assert all(isinstance(item['unit_price'], Decimal) for item in data['items'])
+
+
+def test_invalid_payload_has_same_messages():
+    payload = {**valid_order(), 'customer_name': 'Jo', 'customer_email': 'joao', 'items': [{'quantity': 0}]}
+    with pytest.raises(ValidationError) as fast:
+        load_create_order(payload)
+    with pytest.raises(ValidationError) as schema:
+        create_order_schema.load(payload)
+
+    assert fast.value.messages == schema.value.messages
+    assert fast.value.messages['customer_name'] == ['Length must be between 3 and 100.']
+    assert fast.value.messages['items'][0]['quantity'] == ['Must be greater than or equal to 1.']
+
+
+def test_random_mutations_match_marshmallow():
+    compared, mismatches = differential(fuzz=3000, seed=7)
+    assert compared > 3000
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('backend', ['marshmallow', 'fast'])
+def test_backend_is_selected_by_config(app, backend, monkeypatch):
+    app.config['ORDER_VALIDATION_BACKEND'] = backend
+    calls = []
+    monkeypatch.setattr('app.routes.orders.load_create_order', lambda data: calls.append(data) or {})
+
+    with app.app_context():
+        load_order_payload(valid_order())
+
+    assert len(calls) == (1 if backend == 'fast' else 0)
@@ -0,0 +1,79 @@
+"""
+Testes do cliente HTTP resiliente (retries e circuit breaker)
+"""
+import asyncio
+from unittest import mock
+
+import httpx
+import pytest
+import requests
+
+from app.services.async_http_client import AsyncResilientHTTPClient
+from app.services.http_client import CircuitBreaker, CircuitOpenError, ResilientHTTPClient
+
+
+def _client(cls=ResilientHTTPClient, **kwargs):
+    return cls(max_retries=2, backoff_factor=0, failure_threshold=3, reset_timeout=0, **kwargs)
+
+
+def test_failed_call_counts_as_one_failure():
+    client = _client()
+    with mock.patch.object(requests.Session, 'get', side_effect=requests.exceptions.ConnectionError('recusada')) as get:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get('http://viacep.test/ws/01310100/json/')
+
+    assert get.call_count == 3
+    assert client.breaker.stats()['consecutive_failures'] == 1
+    assert client.breaker.stats()['state'] == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_retries_and_raises_the_real_error():
+    client = _client()
+    client.breaker._state = CircuitBreaker.OPEN
+
+    with mock.patch.object(requests.Session, 'get', side_effect=requests.exceptions.Timeout('lento')) as get:
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get('http://viacep.test/ws/01310100/json/')
+
+    assert get.call_count == 3
+    assert client.breaker.rejected == 0
+
+
+def test_retry_success_resets_failures():
+    client = _client()
+    ok = mock.Mock(status_code=200)
+    with mock.patch.object(requests.Session, 'get', side_effect=[requests.exceptions.Timeout('lento'), ok]):
+        assert client.get('http://viacep.test/ws/01310100/json/') is ok
+
+    assert client.breaker.stats()['consecutive_failures'] == 0
+
+
+def test_async_failed_call_counts_as_one_failure():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def run():
+        client = _client(AsyncResilientHTTPClient)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get('http://viacep.test/ws/01310100/json/')
+        await client.close()
+        return client
+
+    client = asyncio.run(run())
+    assert len(calls) == 3
+    assert client.breaker.stats()['consecutive_failures'] == 1
+
+
+def test_circuit_opens_after_threshold_calls():
+    client = _client()
+    client.breaker.reset_timeout = 60
+    with mock.patch.object(requests.Session, 'get', side_effect=requests.exceptions.ConnectionError('recusada')):
+        for _ in range(3):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.get('http://viacep.test/ws/01310100/json/')
+        with pytest.raises(CircuitOpenError):
+            client.get('http://viacep.test/ws/01310100/json/')
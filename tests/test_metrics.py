@@ -0,0 +1,102 @@
+"""
+Testes das métricas: soma entre processos, cache da outbox e listeners por engine
+"""
+import os
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import metrics
+from app.config import TestingConfig
+from app.database import db
+from app.services.outbox_service import OutboxService
+
+
+@pytest.fixture
+def multiproc_app(tmp_path, monkeypatch, request):
+    directory = tmp_path / 'metrics'
+    monkeypatch.setattr(TestingConfig, 'METRICS_MULTIPROC_DIR', str(directory), raising=False)
+    monkeypatch.setattr(TestingConfig, 'METRICS_FLUSH_INTERVAL', 60.0, raising=False)
+    app = request.getfixturevalue('app')
+    yield app, directory
+
+    # O registro é global: os outros testes voltam ao modo por processo
+    metrics.registry.directory = None
+
+
+def _sample(body, name, **labels):
+    """Valor de uma amostra no texto de exposição (None se ausente)"""
+    expected = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{name}\{{{re.escape(expected)}\}} (\S+)$', body, re.M)
+    return float(match.group(1)) if match else None
+
+
+def _fork_worker(requests):
+    """Processo filho que registra `requests` requisições, grava suas métricas e termina"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            for _ in range(requests):
+                metrics.http_requests_total.inc('tests.fork', 'GET', '200')
+                metrics.http_request_duration_seconds.observe(0.01, 'tests.fork')
+            metrics.registry.flush()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    return pid
+
+
+def test_metrics_are_summed_across_processes(multiproc_app):
+    app, directory = multiproc_app
+    first = _fork_worker(3)
+    second = _fork_worker(4)
+    assert (directory / f"{first}.json").exists() and (directory / f"{second}.json").exists()
+
+    client = app.test_client()
+    body = client.get('/metrics').get_data(as_text=True)
+    assert _sample(body, 'http_requests_total', endpoint='tests.fork', method='GET', status='200') == 7
+    assert _sample(body, 'http_request_duration_seconds_count', endpoint='tests.fork') == 7
+
+    # Worker reciclado: os contadores continuam no total (archive.json)
+    metrics.mark_process_dead(str(directory), first)
+    assert not (directory / f"{first}.json").exists()
+    body = client.get('/metrics').get_data(as_text=True)
+    assert _sample(body, 'http_requests_total', endpoint='tests.fork', method='GET', status='200') == 7
+
+    metrics.clear_multiprocess_dir(str(directory))
+    assert list(directory.glob('*.json')) == []
+
+
+def test_forked_process_starts_without_parent_values(multiproc_app):
+    app, directory = multiproc_app
+    metrics.http_requests_total.inc('tests.parent', 'GET', '200')
+    child = _fork_worker(1)
+
+    data = metrics._read_json(str(directory / f"{child}.json"))
+    assert ['tests.parent', 'GET', '200'] not in [labels for labels, _ in data['http_requests_total']['values']]
+
+
+def test_outbox_stats_are_cached_between_scrapes(app, client, monkeypatch):
+    calls = []
+
+    def stats():
+        calls.append(1)
+        return {}
+
+    monkeypatch.setattr(OutboxService, 'stats', staticmethod(stats))
+    app.config['METRICS_OUTBOX_CACHE_SECONDS'] = 0
+    client.get('/metrics')
+    client.get('/metrics')
+    assert len(calls) == 2
+
+    app.config['METRICS_OUTBOX_CACHE_SECONDS'] = 60
+    client.get('/metrics')
+    client.get('/metrics')
+    client.get('/metrics')
+    assert len(calls) == 3
+
+
+def test_listeners_are_registered_on_the_app_engine(app):
+    with app.app_context():
+        assert event.contains(db.engine, 'before_cursor_execute', metrics._before_cursor_execute)
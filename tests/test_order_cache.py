@@ -0,0 +1,100 @@
+"""
+Testes do cache de detalhe de pedidos (ETag derivado de updated_at)
+"""
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import db
+from app.models.order import Order
+from app.query_counter import QueryCounter
+from app.services.order_cache_service import OrderCacheService
+from app.services.viacep_service import ViaCEPService
+
+from conftest import order_payload
+
+VALID_CEP = {
+    'valid': True, 'cep': '01310-100', 'street': 'Avenida Paulista',
+    'neighborhood': 'Bela Vista', 'city': 'São Paulo', 'state': 'SP'
+}
+
+
+@pytest.fixture
+def order(client):
+    with mock.patch.object(ViaCEPService, 'validate_and_get_address', return_value=VALID_CEP):
+        response = client.post('/api/orders', json=order_payload(items=2))
+    assert response.status_code == 201
+    return response.get_json()['order']
+
+
+def _update_from_other_process(app, order_id, status):
+    """Altera o pedido por outra conexão, sem passar pela sessão (e invalidação) deste processo"""
+    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+    with engine.begin() as connection:
+        connection.execute(
+            text('UPDATE orders SET status = :status, updated_at = :updated_at WHERE id = :id'),
+            {'status': status, 'updated_at': datetime.utcnow() + timedelta(seconds=1), 'id': order_id}
+        )
+    engine.dispose()
+
+
+def _get(app, client, order_id, **headers):
+    """GET do detalhe contando as queries"""
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get(f"/api/orders/{order_id}", headers=headers)
+    return response, counter.count
+
+
+def test_cached_detail_is_revalidated_against_database(app, client, order):
+    first = client.get(f"/api/orders/{order['id']}")
+    assert first.status_code == 200
+    with app.app_context():
+        assert OrderCacheService.get_cache().get(order['id']) is not None
+
+    _update_from_other_process(app, order['id'], 'shipped')
+
+    # Dentro da janela de revalidação: corpo do cache, sem queries
+    cached, queries = _get(app, client, order['id'])
+    assert queries == 0
+    assert cached.headers['ETag'] == first.headers['ETag']
+
+    # Janela expirada: a versão é conferida e a alteração aparece
+    app.config['ORDER_CACHE_REVALIDATE_SECONDS'] = 0
+    second, _ = _get(app, client, order['id'])
+    assert second.get_json()['order']['status'] == 'shipped'
+    assert second.headers['ETag'] != first.headers['ETag']
+
+
+def test_if_none_match_returns_304_until_order_changes(app, client, order):
+    etag = client.get(f"/api/orders/{order['id']}").headers['ETag']
+
+    response, queries = _get(app, client, order['id'], **{'If-None-Match': etag})
+    assert response.status_code == 304
+    assert queries == 0
+
+    _update_from_other_process(app, order['id'], 'confirmed')
+    app.config['ORDER_CACHE_REVALIDATE_SECONDS'] = 0
+
+    response, queries = _get(app, client, order['id'], **{'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['order']['status'] == 'confirmed'
+
+    # Entrada nova, conferida a cada consulta: uma query pela chave primária
+    response, queries = _get(app, client, order['id'], **{'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert queries == 1
+
+
+def test_address_change_bumps_order_version(app, order):
+    with app.app_context():
+        loaded = db.session.get(Order, order['id'])
+        before = loaded.updated_at
+
+        loaded.address.complement = 'Apto 12'
+        db.session.commit()
+
+        assert OrderCacheService.current_version(order['id']) > before
@@ -0,0 +1,115 @@
+"""
+Testes de unicidade dos alocadores de número de pedido sob concorrência
+"""
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import order_numbers
+from app.order_numbers import BlockOrderNumberAllocator, TimeOrderNumberAllocator
+
+
+def _allocate_in_threads(allocator, threads, count):
+    """Gera `threads * count` números em threads simultâneas"""
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        batches = executor.map(lambda _: [allocator.allocate() for _ in range(count)], range(threads))
+        return [number for batch in batches for number in batch]
+
+
+def _allocate_in_process(node_id, threads, count, queue):
+    queue.put(_allocate_in_threads(TimeOrderNumberAllocator(node_id), threads, count))
+
+
+class FakeClock:
+    """Relógio controlado: o segundo só avança quando o alocador dorme"""
+
+    def __init__(self, second):
+        self.second = second
+
+    def now(self):
+        return date(2024, 1, 15), self.second
+
+    def sleep(self, _):
+        self.second += 1
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = FakeClock(36000)
+    monkeypatch.setattr(TimeOrderNumberAllocator, '_clock', staticmethod(clock.now))
+    monkeypatch.setattr(order_numbers.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_time_allocator_threads_never_repeat():
+    numbers = _allocate_in_threads(TimeOrderNumberAllocator(node_id=3), threads=8, count=100)
+
+    assert len(numbers) == 800
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_time_allocator_processes_with_distinct_nodes_never_repeat():
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [
+        context.Process(target=_allocate_in_process, args=(node_id, 4, 100, queue))
+        for node_id in range(4)
+    ]
+    for process in processes:
+        process.start()
+    numbers = [number for _ in processes for number in queue.get(timeout=60)]
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert len(numbers) == 1600
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_time_allocator_replacement_on_same_node_does_not_repeat(fake_clock):
+    # Worker anterior: começa no segundo seguinte à criação e gera números nele
+    previous = TimeOrderNumberAllocator(node_id=7)
+    first = [previous.allocate() for _ in range(20)]
+
+    # Substituto criado no mesmo segundo, na mesma posição (mesmo nó)
+    replacement = TimeOrderNumberAllocator(node_id=7)
+    second = [replacement.allocate() for _ in range(20)]
+
+    assert not set(first) & set(second)
+    assert len(set(first + second)) == 40
+
+
+def test_time_allocator_waits_when_sequence_is_exhausted(fake_clock):
+    allocator = TimeOrderNumberAllocator(node_id=0)
+    numbers = [allocator.allocate() for _ in range(TimeOrderNumberAllocator.MAX_SEQUENCE * 2 + 10)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert numbers == sorted(numbers)
+
+
+def test_time_allocator_rejects_node_out_of_range():
+    with pytest.raises(ValueError):
+        TimeOrderNumberAllocator(node_id=TimeOrderNumberAllocator.MAX_NODE_ID + 1)
+
+
+def test_block_allocator_instances_sharing_database_never_repeat(tmp_path):
+    from app.models.order_number_sequence import OrderNumberSequence
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'sequences.db'}", connect_args={'timeout': 30})
+    OrderNumberSequence.__table__.create(engine)
+
+    # Duas instâncias simulam processos distintos reservando blocos da mesma sequência
+    allocators = [BlockOrderNumberAllocator(engine, block_size=25) for _ in range(2)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        batches = executor.map(
+            lambda index: [allocators[index % 2].allocate() for _ in range(100)],
+            range(8)
+        )
+        numbers = [number for batch in batches for number in batch]
+
+    assert len(numbers) == 800
+    assert len(set(numbers)) == len(numbers)
+    assert sum(allocator.blocks_reserved for allocator in allocators) == 800 // 25
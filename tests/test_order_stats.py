@@ -0,0 +1,45 @@
+"""
+Testes do resumo incremental de pedidos (order_daily_stats)
+"""
+from unittest import mock
+
+from app.services.address_enrichment_service import AddressEnrichmentService
+from app.services.order_stats_service import DIMENSIONS, OrderStatsService
+from app.services.viacep_service import ViaCEPService
+
+from conftest import order_payload
+
+VALID_CEP = {
+    'valid': True, 'cep': '01310-100', 'street': 'Avenida Paulista',
+    'neighborhood': 'Bela Vista', 'city': 'São Paulo', 'state': 'SP'
+}
+
+
+def test_incremental_stats_match_rebuild(app, client, monkeypatch):
+    monkeypatch.setattr(ViaCEPService, 'validate_many', staticmethod(lambda ceps: {cep: VALID_CEP for cep in ceps}))
+
+    with mock.patch.object(ViaCEPService, 'validate_and_get_address', return_value=VALID_CEP):
+        created = [client.post('/api/orders', json=order_payload(items=items)).get_json()['order'] for items in (1, 2, 3)]
+
+    assert client.put(f"/api/orders/{created[0]['id']}", json={'status': 'shipped'}).status_code == 200
+    assert client.put(f"/api/orders/{created[1]['id']}", json={'status': 'cancelled'}).status_code == 200
+    assert client.delete(f"/api/orders/{created[2]['id']}").status_code == 204
+
+    bulk = client.post('/api/orders/bulk', json={'orders': [order_payload(items=items) for items in (1, 4, 2)]})
+    assert bulk.status_code == 200
+
+    # Validação adiada: um pedido cancelado antes do worker e outro liberado por ele
+    app.config['ORDER_ADDRESS_VALIDATION'] = 'deferred'
+    monkeypatch.setattr(ViaCEPService, 'validate_locally', staticmethod(lambda cep: None))
+    deferred = [client.post('/api/orders', json=order_payload(items=2)).get_json()['order'] for _ in range(2)]
+    assert client.put(f"/api/orders/{deferred[0]['id']}", json={'status': 'cancelled'}).status_code == 200
+
+    with app.app_context():
+        assert AddressEnrichmentService.create_worker(app).run_once() == 2
+
+        incremental = OrderStatsService.query(group_by=DIMENSIONS)
+        OrderStatsService.rebuild()
+        rebuilt = OrderStatsService.query(group_by=DIMENSIONS)
+
+    assert incremental['totals']['orders'] == 7
+    assert incremental == rebuilt
@@ -0,0 +1,155 @@
+"""
+Testes das rotas de pedidos (/api/orders)
+"""
+from unittest import mock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import TestingConfig
+from app.database import db
+from app.query_counter import QueryCounter
+from app.services.order_cache_service import OrderCacheService
+from app.services.viacep_service import ViaCEPService
+from app.sql_profiler import SQLProfiler
+
+from conftest import order_payload
+
+VALID_CEP = {
+    'valid': True, 'cep': '01310-100', 'street': 'Avenida Paulista',
+    'neighborhood': 'Bela Vista', 'city': 'São Paulo', 'state': 'SP'
+}
+
+
+@pytest.fixture
+def orders(client):
+    """Cria três pedidos com 1, 2 e 3 itens"""
+    with mock.patch.object(ViaCEPService, 'validate_and_get_address', return_value=VALID_CEP):
+        created = []
+        for items in (1, 2, 3):
+            response = client.post('/api/orders', json=order_payload(items=items))
+            assert response.status_code == 201
+            created.append(response.get_json()['order'])
+    return created
+
+
+@pytest.mark.parametrize('limit, expected', [(0, 1), (-5, 1), (2, 2), (1000, 3)])
+def test_list_orders_clamps_limit(client, orders, limit, expected):
+    response = client.get('/api/orders', query_string={'limit': limit, 'offset': -3})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['limit'] == min(max(limit, 1), 100)
+    assert len(body['orders']) == expected
+
+
+def _count_queries(app, request):
+    """Executa a requisição e devolve (resposta, QueryCounter)"""
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = request()
+    return response, counter
+
+
+def test_list_with_details_uses_constant_queries(app, client, orders):
+    _, small = _count_queries(app, lambda: client.get('/api/orders?include_details=true&limit=100'))
+
+    with mock.patch.object(ViaCEPService, 'validate_and_get_address', return_value=VALID_CEP):
+        for _ in range(7):
+            assert client.post('/api/orders', json=order_payload(items=4)).status_code == 201
+
+    response, large = _count_queries(app, lambda: client.get('/api/orders?include_details=true&limit=100'))
+    body = response.get_json()
+    assert response.status_code == 200
+    assert len(body['orders']) == 10
+    assert all(order['address'] and order['items'] for order in body['orders'])
+
+    # Pedidos, endereços e itens: o número de queries não cresce com a página
+    assert large.count == small.count
+    large.assert_at_most(4)
+    large.assert_no_repeated()
+
+
+def test_order_detail_loads_address_and_items_in_budget(app, client, orders):
+    order_id = orders[2]['id']
+    with app.app_context():
+        OrderCacheService.invalidate([order_id])
+
+    response, counter = _count_queries(app, lambda: client.get(f"/api/orders/{order_id}"))
+    body = response.get_json()['order']
+    assert response.status_code == 200
+    assert body['address']['cep'] and len(body['items']) == 3
+    counter.assert_at_most(3)
+    counter.assert_no_repeated()
+
+
+@pytest.fixture
+def profiled_client(monkeypatch, request):
+    """Cliente com o profiler de SQL falhando em N+1 ou limite estourado"""
+    monkeypatch.setattr(TestingConfig, 'SQL_PROFILER_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'SQL_PROFILER_RAISE', True)
+    return request.getfixturevalue('client')
+
+
+@pytest.mark.parametrize('items', [1, 30])
+def test_create_order_stays_within_query_budget(profiled_client, items):
+    with mock.patch.object(ViaCEPService, 'validate_and_get_address', return_value=VALID_CEP):
+        response = profiled_client.post('/api/orders', json=order_payload(items=items))
+
+    assert response.status_code == 201
+    count = int(response.headers['X-SQL-Queries'].split(';')[0].split('=')[1])
+    assert count <= 13 + items
+
+
+def test_profiler_listens_on_the_app_engine_only(profiled_client):
+    with profiled_client.application.app_context():
+        assert event.contains(db.engine, 'before_cursor_execute', SQLProfiler._before_cursor_execute)
+    assert not event.contains(Engine, 'before_cursor_execute', SQLProfiler._before_cursor_execute)
+
+
+def test_bulk_chunk_failure_reports_only_the_bad_orders(app, client, monkeypatch):
+    from sqlalchemy.exc import DataError
+
+    from app.services.order_ingestion_service import OrderIngestionService
+
+    insert_chunk = OrderIngestionService._insert_chunk
+
+    def failing_insert(chunk):
+        # Simula um valor rejeitado pelo banco (ex.: maior que a coluna)
+        if any(order_row['customer_name'] == 'Cliente Rejeitado' for _, order_row, _, _ in chunk):
+            raise DataError('INSERT INTO orders', {}, Exception('Data too long for column customer_name'))
+        return insert_chunk(chunk)
+
+    monkeypatch.setattr(OrderIngestionService, '_insert_chunk', staticmethod(failing_insert))
+    app.config['ORDERS_BULK_CHUNK_SIZE'] = 8
+
+    payloads = [order_payload(items=1) for _ in range(10)]
+    payloads[3]['customer_name'] = 'Cliente Rejeitado'
+    with mock.patch.object(ViaCEPService, 'validate_many', side_effect=lambda ceps: {cep: VALID_CEP for cep in ceps}):
+        response = client.post('/api/orders/bulk', json={'orders': payloads})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['created'], body['failed']) == (9, 1)
+    assert [result['index'] for result in body['results'] if not result['success']] == [3]
+    assert client.get('/api/orders?include_total=true').get_json()['total'] == 9
+
+
+def test_name_prefix_pattern_index_is_created_only_on_postgresql(app):
+    from sqlalchemy import inspect
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateIndex
+
+    from app.models import Order
+
+    index = next(index for index in Order.__table__.indexes if index.name == 'ix_orders_customer_name_pattern_id')
+    assert str(CreateIndex(index).compile(dialect=postgresql.dialect())) == (
+        'CREATE INDEX ix_orders_customer_name_pattern_id ON orders (customer_name varchar_pattern_ops, id)'
+    )
+
+    with app.app_context():
+        names = {index['name'] for index in inspect(db.engine).get_indexes('orders')}
+    assert 'ix_orders_customer_name_id' in names
+    assert 'ix_orders_customer_name_pattern_id' not in names
@@ -0,0 +1,88 @@
+"""
+Testes da outbox de enriquecimento de endereços (ORDER_ADDRESS_VALIDATION=deferred)
+"""
+import pytest
+
+from app.database import db
+from app.models.order import Order
+from app.models.outbox_job import OutboxJob
+from app.services.address_enrichment_service import AddressEnrichmentService
+from app.services.outbox_service import DONE, LEASE_LOST, OutboxService
+from app.services.viacep_service import ViaCEPService
+
+from conftest import order_payload
+
+VALID_CEP = {
+    'valid': True, 'cep': '01310-100', 'street': 'Avenida Paulista',
+    'neighborhood': 'Bela Vista', 'city': 'São Paulo', 'state': 'SP'
+}
+
+
+@pytest.fixture
+def deferred_order(app, client, monkeypatch):
+    app.config['ORDER_ADDRESS_VALIDATION'] = 'deferred'
+    monkeypatch.setattr(ViaCEPService, 'validate_locally', staticmethod(lambda cep: None))
+
+    response = client.post('/api/orders', json=order_payload(items=2))
+    assert response.status_code == 202
+    return response.get_json()['order']
+
+
+def test_worker_releases_deferred_order(app, deferred_order, monkeypatch):
+    monkeypatch.setattr(ViaCEPService, 'validate_many', staticmethod(lambda ceps: {cep: VALID_CEP for cep in ceps}))
+
+    with app.app_context():
+        assert AddressEnrichmentService.create_worker(app).run_once() == 1
+
+        order = db.session.get(Order, deferred_order['id'])
+        assert order.status == AddressEnrichmentService.READY_STATUS
+        assert order.address.state == 'SP'
+        assert float(order.shipping_cost) > 0
+        assert OutboxJob.query.count() == 0
+
+
+def test_finish_does_not_overwrite_job_reclaimed_after_lease_expired(app, deferred_order):
+    with app.app_context():
+        # Lease de 0 s: a tarefa volta a ficar disponível imediatamente
+        expired = OutboxService.claim(AddressEnrichmentService.KIND, 10, lease_seconds=0)
+        expired_tokens = {job.id: job.claim_token for job in expired}
+
+        reclaimed = OutboxService.claim(AddressEnrichmentService.KIND, 10, lease_seconds=60)
+        assert [job.id for job in reclaimed] == list(expired_tokens)
+
+        finished = OutboxService.finish(
+            expired, {job_id: (DONE, None) for job_id in expired_tokens}, expired_tokens,
+            max_attempts=8, backoff=5.0, backoff_max=600.0
+        )
+        assert finished == [(job_id, LEASE_LOST) for job_id in expired_tokens]
+        db.session.rollback()
+
+        job = db.session.get(OutboxJob, reclaimed[0].id)
+        assert job is not None
+        assert job.claim_token == reclaimed[0].claim_token
+
+
+def test_client_cannot_confirm_order_awaiting_address(client, deferred_order):
+    response = client.put(f"/api/orders/{deferred_order['id']}", json={'status': 'confirmed'})
+    assert response.status_code == 409
+
+    response = client.get(f"/api/orders/{deferred_order['id']}")
+    assert response.get_json()['order']['status'] == AddressEnrichmentService.PENDING_STATUS
+
+    response = client.put(f"/api/orders/{deferred_order['id']}", json={'status': 'cancelled'})
+    assert response.status_code == 200
+    assert response.get_json()['order']['status'] == 'cancelled'
+
+
+def test_worker_keeps_prices_of_order_cancelled_while_pending(app, client, deferred_order, monkeypatch):
+    monkeypatch.setattr(ViaCEPService, 'validate_many', staticmethod(lambda ceps: {cep: VALID_CEP for cep in ceps}))
+    assert client.put(f"/api/orders/{deferred_order['id']}", json={'status': 'cancelled'}).status_code == 200
+
+    with app.app_context():
+        assert AddressEnrichmentService.create_worker(app).run_once() == 1
+
+        order = db.session.get(Order, deferred_order['id'])
+        assert order.status == 'cancelled'
+        assert order.address.state == 'SP'
+        assert float(order.shipping_cost) == 0
+        assert float(order.total_amount) == deferred_order['total_amount']
@@ -0,0 +1,51 @@
+"""
+Testes do roteamento de leituras para réplicas
+"""
+import time
+
+import pytest
+from flask import g
+
+from app.database import db
+from app.replicas import ReplicaRouter
+
+
+@pytest.fixture
+def router(app, tmp_path):
+    router = ReplicaRouter([f"sqlite:///{tmp_path / 'replica-a.db'}", f"sqlite:///{tmp_path / 'replica-b.db'}"])
+    for replica in router.replicas:
+        replica.healthy = True
+        replica.checked_at = time.monotonic()
+    app.extensions['db_replicas'] = router
+    yield router
+    router.dispose()
+
+
+def _read_binds(app, count):
+    with app.test_request_context():
+        g.use_read_replica = True
+        return [db.session.get_bind() for _ in range(count)]
+
+
+def test_replica_is_pinned_for_the_whole_request(app, router):
+    first = _read_binds(app, 5)
+    second = _read_binds(app, 5)
+
+    assert len(set(first)) == 1 and len(set(second)) == 1
+    assert {first[0], second[0]} == {replica.engine for replica in router.replicas}
+    assert router.replica_reads == 10
+
+
+def test_unhealthy_pinned_replica_falls_back_to_primary(app, router):
+    with app.test_request_context():
+        g.use_read_replica = True
+        replica_engine = db.session.get_bind()
+        pinned = next(replica for replica in router.replicas if replica.engine is replica_engine)
+
+        pinned.healthy = False
+        assert db.session.get_bind() is db.engine
+
+        # O restante da requisição continua no primário, mesmo com a réplica de volta
+        pinned.healthy = True
+        assert db.session.get_bind() is db.engine
+        assert router.primary_fallbacks == 2
@@ -0,0 +1,42 @@
+"""
+Testes da cotação em lote da tabela de frete por faixas de CEP
+"""
+import random
+
+from app.services.shipping_rate_table import ShippingRateTable
+
+
+def _rate(start, end, region, cost=20.0):
+    return {'cep_start': f"{start:08d}", 'cep_end': f"{end:08d}", 'cost': cost, 'days': 5, 'region': region}
+
+
+def test_lookup_many_matches_single_lookups():
+    rng = random.Random(3)
+
+    # Faixas largas por "estado" e sub-faixas sobrepostas
+    bounds = [0] + sorted(rng.sample(range(1, 10 ** 8), 9)) + [10 ** 8]
+    ranges = [_rate(bounds[index], bounds[index + 1] - 1, f"UF{index}") for index in range(10)]
+    for index in range(500):
+        start = rng.randrange(0, 10 ** 8 - 10 ** 6)
+        ranges.append(_rate(start, start + rng.choice((10, 1000, 10 ** 5)), f"R{index}", rng.uniform(5, 80)))
+    table = ShippingRateTable(ranges)
+
+    edges = [int(rate[field]) + delta for rate in ranges for field in ('cep_start', 'cep_end') for delta in (-1, 0, 1)]
+    ceps = [f"{cep:08d}" for cep in edges + [rng.randrange(0, 10 ** 8) for _ in range(2000)] if 0 <= cep < 10 ** 8]
+
+    results = table.lookup_many(ceps + ceps[:100])
+    assert set(results) == set(ceps)
+    assert all(results[cep] == table.lookup(cep) for cep in ceps)
+
+
+def test_lookup_many_outside_ranges():
+    table = ShippingRateTable([
+        _rate(20000000, 20999999, 'RJ', 15),
+        _rate(20040000, 20049999, 'Centro', 9)
+    ])
+
+    results = table.lookup_many(['30000000', '20040001', '01310100', '20050000', '20039999'])
+    assert results['01310100'] is None and results['30000000'] is None
+    assert results['20040001']['region'] == 'Centro'
+    assert results['20039999']['region'] == results['20050000']['region'] == 'RJ'
+    assert table.lookup_many([]) == {}